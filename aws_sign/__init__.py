@@ -48,6 +48,11 @@ class ServiceConstants(object):
     # Minimum required headers for signing requests
     __REQUIRED_HEADERS = {}
 
+    # URI path canonicalization: path segments are encoded twice and dot segments
+    # resolved by every service but S3
+    DOUBLE_ENCODE_PATH = True
+    NORMALIZE_PATH     = True
+
     FORMAT = 'http[s]?://[\w\-\.]+amazonaws.com'
 
     # Parsed by 'from_url' method.  Matched group array is passed as *args list to
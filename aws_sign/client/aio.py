@@ -0,0 +1,619 @@
+"""asyncio native HTTP client (Python 3.7+)
+
+A minimal HTTP/1.1 client over asyncio streams with per-client keep-alive connection
+pooling.  Signing, retries, clock skew correction and rate limiting are shared with the
+tornado clients in `http`; unlike those, clients carry all of their configuration and
+never touch process-wide state.
+"""
+import asyncio
+import ssl
+import time
+
+from collections import deque
+from urllib.parse import urlsplit
+
+from tornado.httpclient import HTTPError
+
+from aws_sign.client import concurrency, offload, ratelimit
+from aws_sign.client.stream import open_target
+from aws_sign.client.http import (AuthMixin, DefaultServiceConstants, HTTP, UnknownCredentialsException,
+                                  _max_connections, _replayable)
+from aws_sign.headers import Headers
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.clock import Clock
+from aws_sign.v4.util import BLOCK_SIZE, iter_blocks, safe_encode
+
+#
+# Constants
+#
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_IDLE_TIMEOUT    = 60
+DEFAULT_CONNECT_TIMEOUT = 20
+DEFAULT_REQUEST_TIMEOUT = 20
+
+# Maximum status line and header line length
+MAX_LINE = 64 * 1024
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class Response(object):
+    """HTTP response, mirroring the tornado HTTPResponse attributes in use"""
+    def __init__(self, url, code, reason, headers, body, request_time):
+        self.effective_url = url
+        self.code          = code
+        self.reason        = reason
+        self.headers       = headers
+        self.body          = body
+        self.request_time  = request_time
+
+    def __repr__(self):
+        return '%s(%s %s)' % (self.__class__.__name__, self.code, self.effective_url)
+
+
+class Connection(object):
+    """Pooled keep-alive connection"""
+    def __init__(self, reader, writer):
+        self.reader    = reader
+        self.writer    = writer
+        self.last_used = time.monotonic()
+        self.requests  = 0
+
+    @property
+    def closed(self):
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool(object):
+    """Keep-alive connections to a single endpoint
+
+    At most `max_connections` connections are open at a time; further requests wait for
+    a connection to be released.  Idle connections are reused most recently used first
+    and dropped once idle for longer than `idle_timeout` seconds.
+    """
+    def __init__(self, scheme, host, port, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, ssl_context=None):
+        """Initializes pool
+
+        Parameters:
+            scheme: 'http' or 'https'
+            host: host name
+            port: port
+            max_connections: maximum number of open connections
+            idle_timeout: seconds an idle connection is kept
+            ssl_context: SSLContext for https, defaults to `ssl.create_default_context()`
+        """
+        self.scheme          = scheme
+        self.host            = host
+        self.port            = port
+        self.max_connections = max_connections
+        self.idle_timeout    = idle_timeout
+        self.ssl_context     = ssl_context
+        self.active          = 0
+        self.__idle          = deque()
+        self.__waiters       = deque()
+
+    @property
+    def idle(self):
+        """Number of idle connections"""
+        return len(self.__idle)
+
+    def _ssl(self):
+        if self.scheme != 'https':
+            return None
+        if self.ssl_context is None:
+            self.ssl_context = ssl.create_default_context()
+        return self.ssl_context
+
+    def _reusable(self):
+        """Pops most recently used live idle connection, closing stale ones"""
+        deadline = time.monotonic() - self.idle_timeout
+        while self.__idle:
+            conn = self.__idle.pop()
+            if not conn.closed and conn.last_used >= deadline:
+                return conn
+            conn.close()
+        return None
+
+    async def acquire(self, connect_timeout=None, fresh=False):
+        """Acquires connection, reusing an idle one unless `fresh`
+
+        Parameters:
+            connect_timeout: connect timeout in seconds
+            fresh: open a new connection
+
+        Returns Connection
+        """
+        while self.active >= self.max_connections:
+            waiter = asyncio.get_running_loop().create_future()
+            self.__waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                if waiter in self.__waiters:
+                    self.__waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Woken but cancelled before running; pass the slot on
+                    self._wake()
+                raise
+        self.active += 1
+
+        try:
+            conn = None if fresh else self._reusable()
+            if conn is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=self._ssl(), limit=MAX_LINE),
+                    connect_timeout)
+                conn = Connection(reader, writer)
+            return conn
+        except BaseException:
+            self._released()
+            raise
+
+    def release(self, conn, reuse=True):
+        """Returns connection to the pool
+
+        Parameters:
+            conn: Connection
+            reuse: keep connection open for later requests
+        """
+        if reuse and not conn.closed:
+            conn.last_used = time.monotonic()
+            self.__idle.append(conn)
+        else:
+            conn.close()
+        self._released()
+
+    def _released(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        while self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def warm_up(self, connections, connect_timeout=None):
+        """Opens idle connections ahead of time
+
+        Parameters:
+            connections: number of connections, capped at `max_connections`
+            connect_timeout: connect timeout in seconds
+        """
+        opened = await asyncio.gather(*[self.acquire(connect_timeout, fresh=True)
+                                        for _ in range(min(connections, self.max_connections))],
+                                      return_exceptions=True)
+        for conn in opened:
+            if isinstance(conn, Connection):
+                self.release(conn)
+
+    def stats(self):
+        """Returns dict of 'active', 'idle' and 'queued' connection counts"""
+        return {'active': self.active, 'idle': self.idle, 'queued': len(self.__waiters)}
+
+    def close(self):
+        """Closes idle connections"""
+        while self.__idle:
+            self.__idle.pop().close()
+
+    def __str__(self):
+        return 'active=%d idle=%d waiting=%d' % (self.active, self.idle, len(self.__waiters))
+
+
+def _content_length(body):
+    try:
+        return memoryview(body).nbytes
+    except TypeError:
+        return None
+
+async def _write_request(writer, method, target, headers, body):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    length = _content_length(body) if body is not None else 0
+    chunked = length is None and 'content-length' not in headers
+    if chunked:
+        headers['transfer-encoding'] = 'chunked'
+    elif length is not None and (length or method not in ('GET', 'HEAD', 'DELETE', 'OPTIONS')):
+        headers['content-length'] = str(length)
+
+    lines = ['%s %s HTTP/1.1' % (method, target)]
+    lines.extend('%s: %s' % (k, v) for k, v in headers.iter_all())
+    writer.write(safe_encode('\r\n'.join(lines) + '\r\n\r\n'))
+
+    for block in iter_blocks(body):
+        if chunked:
+            writer.write(b'%x\r\n' % len(block))
+        writer.write(block)
+        if chunked:
+            writer.write(b'\r\n')
+        await writer.drain()
+    if chunked:
+        writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+async def _iter_body(reader, headers, block_size=BLOCK_SIZE):
+    """Yields body chunks of at most `block_size` bytes as the consumer asks for them"""
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            line = await reader.readline()
+            try:
+                size = int(line.split(b';', 1)[0], 16)
+            except ValueError:
+                # Connection closed or garbled mid-body
+                raise asyncio.IncompleteReadError(line, None)
+            if not size:
+                # Trailers
+                while (await reader.readline()) not in (b'\r\n', b''):
+                    pass
+                return
+            while size:
+                chunk = await reader.readexactly(min(size, block_size))
+                size -= len(chunk)
+                yield chunk
+            await reader.readexactly(2)
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.readexactly(min(remaining, block_size))
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await reader.read(block_size)
+            if not chunk:
+                return
+            yield chunk
+
+def _framed(headers):
+    return 'chunked' in headers.get('transfer-encoding', '').lower() or 'content-length' in headers
+
+def _has_body(method, code):
+    return not (method == 'HEAD' or code in (204, 304) or 100 <= code < 200)
+
+def _keep_alive(version, headers, framed):
+    return framed and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+async def _read_body(reader, headers):
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        return b''.join([chunk async for chunk in _iter_body(reader, headers)]), True
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length'])), True
+    return await reader.read(), False
+
+async def _read_head(reader):
+    """Reads status line and headers, returning (version, code, reason, headers)"""
+    line = await reader.readline()
+    if not line:
+        raise asyncio.IncompleteReadError(line, None)
+    version, code, reason = (line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+    headers = Headers()
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            break
+        if not line:
+            raise asyncio.IncompleteReadError(line, None)
+        k, v = line.decode('latin-1').split(':', 1)
+        headers.add(k.strip(), v.strip())
+    return version, int(code), reason, headers
+
+async def _read_response(reader, method, head=None):
+    """Reads response, returning (code, reason, headers, body, keep alive)
+
+    `head` is the result of `_read_head` if the head was read already.
+    """
+    version, code, reason, headers = head if head else await _read_head(reader)
+
+    if _has_body(method, code):
+        body, framed = await _read_body(reader, headers)
+    else:
+        body, framed = b'', True
+    return code, reason, headers, body, _keep_alive(version, headers, framed)
+
+
+class BodyReader(object):
+    """Streamed response body, read from the connection as the consumer asks for it
+
+    Nothing is read ahead of the consumer beyond the stream's buffer, so a slow consumer
+    holds the connection back through TCP flow control instead of buffering the body.
+    The connection returns to the pool once the body was read to its end, and is closed
+    if the reader is closed early.
+
+    Example:
+      body = await client.stream('/large-object')
+      async for chunk in body:
+          ...
+    """
+    def __init__(self, pool, conn, url, code, reason, headers, chunks, keep_alive, timeout):
+        self.effective_url = url
+        self.code          = code
+        self.reason        = reason
+        self.headers       = headers
+        self.timeout       = timeout
+        # Body bytes read so far
+        self.received      = 0
+        self.__pool        = pool
+        self.__conn        = conn
+        self.__chunks      = chunks
+        self.__keep_alive  = keep_alive
+        if chunks is None:
+            self._release(keep_alive)
+
+    def _release(self, reuse):
+        if self.__conn is not None:
+            self.__pool.release(self.__conn, reuse)
+            self.__conn, self.__chunks = None, None
+
+    async def read(self):
+        """Returns the next body chunk, or b'' at the end
+
+        Raises HTTPError 599 if no data arrives within `timeout` seconds
+        """
+        if self.__chunks is None:
+            return b''
+        try:
+            chunk = await asyncio.wait_for(self.__chunks.__anext__(), self.timeout)
+        except StopAsyncIteration:
+            self._release(self.__keep_alive)
+            return b''
+        except asyncio.TimeoutError:
+            self._release(False)
+            raise HTTPError(599, 'Timeout')
+        except BaseException:
+            self._release(False)
+            raise
+        self.received += len(chunk)
+        return chunk
+
+    def close(self):
+        """Closes connection unless the body was read to its end"""
+        self._release(False)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self.read()
+        if not chunk:
+            raise StopAsyncIteration()
+        return chunk
+
+    def __repr__(self):
+        return '%s(%s %s)' % (self.__class__.__name__, self.code, self.effective_url)
+
+
+class AsyncioHTTP(HTTP):
+    """HTTP client running on a plain asyncio event loop
+
+    Requests are written over pooled keep-alive connections owned by the client.
+    Recognized `defaults` are 'headers', 'connect_timeout', 'request_timeout' and
+    'raise_error'.
+
+    Example:
+      client = aio.get_instance('https://foo.us-west-2.amazonaws.com', Sigv4ServiceConstants,
+                                sign=True, creds=creds)
+      resp = await client.get('/bar')
+      client.close()
+    """
+    def __init__(self, constants, defaults=None, logger=None, retry=None, limiter=None,
+                 concurrency=None, max_connections=None,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, ssl_context=None,
+                 offload_threshold=offload.DEFAULT_THRESHOLD, executor=None):
+        """Initializes client
+
+        Parameters:
+            concurrency: AIMDLimiter adapting the number of in-flight requests
+            max_connections: maximum number of open connections, at least
+                             `concurrency.maximum`, which is the default with a limiter
+            idle_timeout: seconds an idle connection is kept
+            ssl_context: SSLContext for https endpoints
+            offload_threshold: payload size in bytes from which requests are hashed and
+                               signed in `executor`; None signs everything on the loop
+            executor: concurrent.futures executor, defaults to the loop's executor
+            see `HTTP` for other parameters
+        """
+        parts = urlsplit(constants.url)
+        pool  = ConnectionPool(parts.scheme, parts.hostname, parts.port or _DEFAULT_PORTS[parts.scheme],
+                               _max_connections(max_connections, concurrency, DEFAULT_MAX_CONNECTIONS),
+                               idle_timeout, ssl_context)
+        super(AsyncioHTTP, self).__init__(pool, constants, defaults, logger, retry, limiter)
+        self.concurrency       = concurrency
+        self.netloc            = parts.netloc
+        self.offload_threshold = offload_threshold
+        self.executor          = executor
+        # Time the loop spent preparing and signing requests inline
+        self.stalls            = offload.StallStats()
+
+    async def _prepare_args(self, *args):
+        """Prepares request, hashing and signing large payloads off the loop, see `prepare_args`"""
+        if offload.should_offload(args[4], self.offload_threshold):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.prepare_args, *args)
+        with self.stalls.timer():
+            return self.prepare_args(*args)
+
+    async def _send(self, kwargs, payload, streaming=False):
+        """Writes request and reads its response over a pooled connection
+
+        Successful responses are returned as a `BodyReader` holding the connection if
+        `streaming`.
+        """
+        pool    = self.client
+        parts   = urlsplit(kwargs['url'])
+        target  = parts.path + ('?' + parts.query if parts.query else '')
+        method  = kwargs['method']
+        headers = kwargs['headers']
+        if 'host' not in headers:
+            headers['host'] = self.netloc
+
+        start = time.monotonic()
+        for fresh in (False, True):
+            conn = await pool.acquire(kwargs.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT), fresh)
+            reused, conn.requests = conn.requests > 0, conn.requests + 1
+            try:
+                await _write_request(conn.writer, method, target, headers, payload)
+                head = await _read_head(conn.reader)
+                version, code, reason, hdrs = head
+                if streaming and 200 <= code < 300:
+                    has_body = _has_body(method, code)
+                    return BodyReader(pool, conn, kwargs['url'], code, reason, hdrs,
+                                      _iter_body(conn.reader, hdrs) if has_body else None,
+                                      _keep_alive(version, hdrs, _framed(hdrs) or not has_body),
+                                      kwargs.get('request_timeout', DEFAULT_REQUEST_TIMEOUT))
+                code, reason, hdrs, body, keep_alive = await _read_response(conn.reader, method, head)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                pool.release(conn, False)
+                # Server closed idle keep-alive connection; retry once on a new one
+                if reused and _replayable(payload):
+                    continue
+                if isinstance(e, asyncio.IncompleteReadError):
+                    raise ConnectionResetError('Connection closed by server') from e
+                raise
+            except BaseException:
+                pool.release(conn, False)
+                raise
+            pool.release(conn, keep_alive)
+            break
+
+        resp = Response(kwargs['url'], code, reason, hdrs, body, time.monotonic() - start)
+        if kwargs.get('raise_error', True) and not 200 <= code < 300:
+            raise HTTPError(code, reason, resp)
+        return resp
+
+    async def _fetch(self, kwargs, payload, streaming=False):
+        timeout = kwargs.get('request_timeout', DEFAULT_REQUEST_TIMEOUT)
+        limiter = self.concurrency
+        if limiter is not None:
+            await limiter.acquire()
+        start = time.monotonic()
+        try:
+            resp = await asyncio.wait_for(self._send(kwargs, payload, streaming), timeout)
+        except asyncio.TimeoutError:
+            error = HTTPError(599, 'Timeout')
+            if limiter is not None:
+                limiter.release(time.monotonic() - start, True)
+            raise error
+        except Exception as e:
+            if limiter is not None:
+                limiter.release(time.monotonic() - start, concurrency.overloaded(e))
+            raise
+        if limiter is not None:
+            limiter.release(time.monotonic() - start)
+        return resp
+
+    async def request(self, method, path, headers=None, query_args=None, payload=None, content_sha256=None):
+        """Dispatch HTTP request, see `HTTP.request`"""
+        return await self._request(method, path, headers, query_args, payload, content_sha256)
+
+    async def _request(self, method, path, headers, query_args, payload, content_sha256, streaming=False):
+        attempt, resigned = 0, False
+        while True:
+            wait = self._reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            kwargs = await self._prepare_args(method, path, query_args, headers, payload, content_sha256)
+            try:
+                resp = await self._fetch(kwargs, payload, streaming)
+            except (HTTPError, IOError) as e:
+                if not _replayable(payload):
+                    raise
+                if not resigned and isinstance(e, HTTPError) and self._should_resign(e):
+                    resigned = True
+                    continue
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded(attempt)
+            return resp
+
+    async def get(self, path, headers=None, query_args=None):
+        return await self.request('GET', path, headers, query_args)
+
+    async def post(self, path, payload, headers=None, query_args=None, content_sha256=None):
+        return await self.request('POST', path, headers, query_args, payload, content_sha256)
+
+    async def stream(self, path, headers=None, query_args=None, method='GET'):
+        """Streams response body instead of buffering it
+
+        `request_timeout` bounds the wait for the response headers and for each chunk.
+
+        Parameters:
+            path: uri
+            headers: HTTP headers
+            query_args: query arguments dict
+            method: HTTP method
+
+        Returns `BodyReader` once the response headers arrived; raises HTTPError for
+        unsuccessful responses
+        """
+        return await self._request(method, path, headers, query_args, None, None, streaming=True)
+
+    async def download(self, path, target, headers=None, query_args=None, method='GET'):
+        """Writes response body straight to a file
+
+        Parameters:
+            path: uri
+            target: file name or writable binary file object
+            see `stream` for other parameters
+
+        Returns the exhausted `BodyReader` holding code, headers and bytes `received`
+        """
+        body = await self.stream(path, headers, query_args, method)
+        try:
+            with open_target(target) as sink:
+                async for chunk in body:
+                    sink.write(chunk)
+        finally:
+            body.close()
+        return body
+
+    async def warm_up(self, connections=1):
+        """Opens (TLS) connections to the endpoint ahead of time
+
+        Parameters:
+            connections: number of connections, capped at `max_connections`
+        """
+        await self.client.warm_up(connections, self.template.defaults.get('connect_timeout',
+                                                                          DEFAULT_CONNECT_TIMEOUT))
+
+    def pool_stats(self):
+        """Returns dict of 'active', 'idle' and 'queued' connection counts"""
+        return self.client.stats()
+
+    def close(self):
+        """Closes idle pooled connections"""
+        self.client.close()
+
+
+def get_instance(endpoint, constants_cls=DefaultServiceConstants, defaults=None, sign=False, creds=None,
+                 logger=None, clock=None, retry=None, rate=None, burst=None, concurrency=None,
+                 max_connections=None, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 ssl_context=None, offload_threshold=offload.DEFAULT_THRESHOLD):
+    """Create asyncio HTTPClient instance
+
+    Parameters:
+        see `http.get_instance` and `AsyncioHTTP`
+
+    Returns HTTPClient instance
+    """
+    if sign and creds is None:
+        raise UnknownCredentialsException()
+
+    constants = constants_cls.from_url(endpoint)
+
+    limiter = ratelimit.get_limiter(constants.host, rate, burst) if rate else None
+    base    = (AuthMixin, AsyncioHTTP) if sign else (AsyncioHTTP,)
+    attrs   = {'auth': Authorization(constants, creds),
+               'clock': clock if clock else Clock()} if sign else {}
+    return type('HTTPClient', base, attrs)(constants, defaults=defaults, logger=logger, retry=retry,
+                                           limiter=limiter, concurrency=concurrency,
+                                           max_connections=max_connections, idle_timeout=idle_timeout,
+                                           ssl_context=ssl_context, offload_threshold=offload_threshold)
@@ -0,0 +1,120 @@
+import time
+
+from collections import deque
+
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPError
+
+from .retry import _throttled
+
+#
+# Constants
+#
+_monotonic = getattr(time, 'monotonic', time.time)
+
+DEFAULT_INITIAL_LIMIT = 20
+DEFAULT_MIN_LIMIT     = 1
+DEFAULT_MAX_LIMIT     = 200
+DEFAULT_BACKOFF       = 0.9
+
+# Status codes signalling an overloaded service; 599 covers timeouts
+OVERLOAD_STATUS = frozenset((429, 503, 599))
+
+
+def overloaded(error):
+    """Whether request error indicates the service is pushing back.
+
+    Parameters:
+        error: exception raised by request
+
+    Returns bool
+    """
+    if isinstance(error, HTTPError):
+        return error.code in OVERLOAD_STATUS or _throttled(error.response)
+    # Socket errors
+    return isinstance(error, (IOError, OSError))
+
+
+class AIMDLimiter(object):
+    """Adaptive limit on in-flight requests
+
+    Additive increase, multiplicative decrease: every successful request grows the
+    limit by 1 / limit, i.e. by one per window of requests, while throttling responses,
+    timeouts, connection errors and responses slower than `latency` shrink it by
+    `backoff`.  The limit only grows while it's actually used, so idle periods don't
+    inflate it.
+
+    Requests over the limit wait in FIFO order.  Limiters are not thread-safe and must
+    be used from the IOLoop thread.  A client's `max_connections` defaults to, and must
+    be at least, `maximum` so the limiter, not the client queue, bounds concurrency.
+
+    Example:
+      limiter = AIMDLimiter(initial=10, maximum=100, latency=2.0)
+      client = http.AsyncHTTP(constants, concurrency=limiter)
+      ...
+      metrics.gauge('aws.concurrency', limiter.limit)
+    """
+    def __init__(self, initial=DEFAULT_INITIAL_LIMIT, minimum=DEFAULT_MIN_LIMIT,
+                 maximum=DEFAULT_MAX_LIMIT, backoff=DEFAULT_BACKOFF, latency=None):
+        """Initializes limiter
+
+        Parameters:
+            initial: initial limit
+            minimum: minimum limit
+            maximum: maximum limit
+            backoff: factor applied to the limit when the service pushes back
+            latency: response time in seconds treated as pushback, disabled if not set
+        """
+        self.minimum  = minimum
+        self.maximum  = maximum
+        self.backoff  = backoff
+        self.latency  = latency
+        self.inflight = 0
+        self.__limit  = float(min(maximum, max(minimum, initial)))
+        self.__waiters = deque()
+
+    @property
+    def limit(self):
+        """Current in-flight request limit"""
+        return int(self.__limit)
+
+    @property
+    def waiting(self):
+        """Number of requests waiting for a slot"""
+        return len(self.__waiters)
+
+    def acquire(self):
+        """Acquires slot for a request
+
+        Returns Future resolved once the request may be sent
+        """
+        future = Future()
+        if not self.__waiters and self.inflight < self.limit:
+            self.inflight += 1
+            future.set_result(None)
+        else:
+            self.__waiters.append(future)
+        return future
+
+    def release(self, elapsed, dropped=False):
+        """Releases slot and updates limit
+
+        Parameters:
+            elapsed: request duration in seconds
+            dropped: whether the service pushed back, see `overloaded`
+        """
+        self.inflight -= 1
+        if dropped or (self.latency is not None and elapsed > self.latency):
+            self.__limit = max(self.minimum, self.__limit * self.backoff)
+        elif 2 * (self.inflight + 1) >= self.__limit:
+            self.__limit = min(self.maximum, self.__limit + 1.0 / self.__limit)
+
+        while self.__waiters and self.inflight < self.limit:
+            waiter = self.__waiters.popleft()
+            # Cancelled along with the request awaiting it
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def __str__(self):
+        return 'limit=%d inflight=%d waiting=%d' % (self.limit, self.inflight, self.waiting)
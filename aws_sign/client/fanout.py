@@ -0,0 +1,128 @@
+from collections import deque
+
+from six.moves import builtins
+from tornado import gen
+from tornado.concurrent import Future
+
+#
+# Constants
+#
+DEFAULT_CONCURRENCY = 10
+
+_StopAsyncIteration = getattr(builtins, 'StopAsyncIteration', StopIteration)
+
+
+class FetchIterator(object):
+    """Dispatches requests with bounded concurrency, yielding results as they complete
+
+    At most `concurrency` requests are in flight; the next request is taken from the
+    (possibly lazy) request iterable whenever one completes.  Results are
+    (index, response) pairs where index is the request's position in the input.  Failed
+    requests yield their exception in place of the response, unless `fail_fast` is set:
+    then the first error is raised, no further requests are sent and iteration ends.
+
+    Supports `async for` as well as tornado coroutines, in the style of
+    `gen.WaitIterator`.
+
+    Example:
+      async for index, resp in client.fetch_many(requests, concurrency=20, ordered=False):
+          ...
+
+      it = client.fetch_many(requests, concurrency=20, ordered=False)
+      while not it.done():
+          index, resp = yield it.next()
+    """
+    def __init__(self, fetch, requests, concurrency=DEFAULT_CONCURRENCY, fail_fast=False):
+        """Initializes iterator and dispatches the first requests
+
+        Parameters:
+            fetch: callable taking a request and returning a Future
+            requests: iterable of requests
+            concurrency: maximum number of requests in flight
+            fail_fast: raise first error and stop sending requests
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be positive: %s' % concurrency)
+        self.fetch       = fetch
+        self.concurrency = concurrency
+        self.fail_fast   = fail_fast
+        self.pending     = 0
+        self.__requests  = enumerate(requests)
+        self.__exhausted = False
+        self.__stopped   = False
+        self.__results   = deque()
+        self.__waiters   = deque()
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.pending < self.concurrency and not (self.__exhausted or self.__stopped):
+            try:
+                index, request = next(self.__requests)
+            except StopIteration:
+                self.__exhausted = True
+                break
+            self.pending += 1
+            self.fetch(request).add_done_callback(lambda future, index=index: self._completed(index, future))
+
+    def _completed(self, index, future):
+        self.pending -= 1
+        error = future.exception()
+        if self.__stopped:
+            return
+        if error is not None and self.fail_fast:
+            self.__stopped = True
+        self.__results.append((index, future.result() if error is None else error, error))
+        self._dispatch()
+        self._notify()
+
+    def _notify(self):
+        while self.__waiters and self.__results:
+            index, result, error = self.__results.popleft()
+            waiter = self.__waiters.popleft()
+            if error is not None and self.fail_fast:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result((index, result))
+        if self.done():
+            while self.__waiters:
+                self.__waiters.popleft().set_exception(_StopAsyncIteration())
+
+    def done(self):
+        """Whether all results have been consumed"""
+        if self.__results:
+            return False
+        return self.__stopped or (self.__exhausted and not self.pending)
+
+    def next(self):
+        """Returns Future resolving to the next completed (index, response) pair
+
+        Callers should check `done` first.
+        """
+        future = Future()
+        self.__waiters.append(future)
+        self._notify()
+        return future
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if self.done():
+            raise _StopAsyncIteration()
+        return self.next()
+
+
+@gen.coroutine
+def collect(iterator):
+    """Gathers all results of FetchIterator in request order
+
+    Parameters:
+        iterator: FetchIterator
+
+    Returns Future resolving to list of responses (or exceptions)
+    """
+    results = {}
+    while not iterator.done():
+        index, result = yield iterator.next()
+        results[index] = result
+    raise gen.Return([results[i] for i in range(len(results))])
@@ -1,15 +1,23 @@
 import six
 from tornado import gen
-from tornado.httpclient import AsyncHTTPClient, HTTPClient, HTTPRequest
+from tornado.ioloop import IOLoop
+from tornado.httpclient import HTTPClient, HTTPError, HTTPRequest
+from tornado.httputil import HTTPHeaders
+from tornado.util import import_object
 
 from aws_sign import ServiceConstants
+from aws_sign.client import concurrency, fanout, offload, ratelimit, stream
+from aws_sign.headers import Headers
+from aws_sign.v4 import chunked
 from aws_sign.v4.auth import Authorization
-from aws_sign.v4.canonical import ArgumentBuilder
+from aws_sign.v4.canonical import ArgumentBuilder, CONTENT_SHA256_HEADER, UNSIGNED_PAYLOAD, encode_path
+from aws_sign.v4.clock import Clock
+from aws_sign.v4.util import iter_blocks, rewindable, safe_encode
 
-from datetime import datetime
 from copy import deepcopy
 
 import re
+import time
 import logging
 
 #
@@ -20,36 +28,195 @@ TORNADO_IMPL = {
     'simple': 'tornado.simple_httpclient.SimpleAsyncHTTPClient'
 }
 
+# Default maximum number of concurrent connections per client
+DEFAULT_MAX_CONNECTIONS = 10
+
+# Error codes returned for requests signed with a skewed timestamp
+SKEW_ERRORS = (b'RequestTimeTooSkewed', b'RequestExpired', b'SignatureDoesNotMatch',
+               b'InvalidSignatureException')
+
 #
 # Utils
 #
 def _get_logger(name='aws_sign.http'):
     return logging.getLogger(name)
 
-def _lower(source, acc):
-    """Set all dict keys to lowercase format."""
-    for k, v in six.iteritems(source):
-        acc[k.lower()] = _lower(v, {}) if type(v) is dict else v
-    return acc
-
-def _normalize(source):
-    """Creates a uniform format for dict keys."""
-    return _lower(source, {})
-
-def _merge(source, overrides):
-    """Deep merge of dicts."""
-    for ok, ov in six.iteritems(overrides):
-        if ok in source:
-            if type(ov) == type(source[ok]):
-                if type(ov) == dict:
-                    _merge(source[ok], ov)
-                else:
-                    source[ok] = ov
-            else:
-                raise Exception("Mismatched types for key=%s: src=%s ov=%s" % (ok, type(source[ok]), type(ov)))
-        else:
-            source[ok] = ov
-    return source
+def _producer(payload):
+    """Creates tornado body producer streaming payload in blocks."""
+    @gen.coroutine
+    def produce(write):
+        for block in iter_blocks(payload):
+            yield write(block)
+    return produce
+
+def _chunk_producer(signer, source, chunk_size):
+    """Creates tornado body producer streaming signed aws-chunked frames."""
+    @gen.coroutine
+    def produce(write):
+        for frame in signer.frames(source, chunk_size):
+            yield write(frame)
+    return produce
+
+def _http_request(kwargs):
+    """Creates HTTPRequest, sending repeated headers as separate header lines."""
+    hdrs = kwargs.get('headers')
+    if isinstance(hdrs, Headers):
+        tornado_hdrs = HTTPHeaders()
+        for k, v in hdrs.iter_all():
+            tornado_hdrs.add(k, v)
+        kwargs = dict(kwargs, headers=tornado_hdrs)
+    return HTTPRequest(**kwargs)
+
+def _replayable(payload):
+    """Whether payload can be sent again."""
+    return payload is None or isinstance(payload, (six.binary_type, six.text_type))
+
+def _skew_error(response):
+    """Whether error response reports a skewed request timestamp."""
+    if response.code not in (400, 401, 403):
+        return False
+    detail = response.body or b''
+    detail += safe_encode(response.headers.get('x-amzn-ErrorType', ''))
+    return any(code in detail for code in SKEW_ERRORS)
+
+def _tornado_client(impl, max_connections, sync=False):
+    """Creates a tornado client instance owned by a single HTTP client.
+
+    The implementation class is instantiated directly rather than through the
+    process-global `AsyncHTTPClient.configure`.
+    """
+    cls = import_object(TORNADO_IMPL[impl])
+    if sync:
+        client = HTTPClient(cls, force_instance=True, max_clients=max_connections)
+        _limit_host_connections(client._async_client, max_connections)
+    else:
+        client = cls(force_instance=True, max_clients=max_connections)
+        _limit_host_connections(client, max_connections)
+    return client
+
+def _max_connections(max_connections, limiter, default=DEFAULT_MAX_CONNECTIONS):
+    """Resolves connection cap, leaving room for an AIMDLimiter's `maximum`.
+
+    Defaults to `limiter.maximum` if a limiter is given, otherwise to `default`;
+    raises ValueError if the cap would keep the limiter from reaching its maximum.
+    """
+    if limiter is None:
+        return max_connections if max_connections else default
+    if max_connections is None:
+        return limiter.maximum
+    if max_connections < limiter.maximum:
+        raise ValueError('max_connections %d is below the concurrency maximum %d'
+                         % (max_connections, limiter.maximum))
+    return max_connections
+
+def _limit_host_connections(client, max_connections):
+    """Caps connections per host for the curl implementation."""
+    multi = getattr(client, '_multi', None)
+    if multi is not None:
+        import pycurl
+        if hasattr(pycurl, 'M_MAX_HOST_CONNECTIONS'):
+            multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, max_connections)
+
+def _pool_defaults(impl, defaults, idle_timeout):
+    """Adds keep-alive idle timeout to curl request defaults."""
+    if impl != 'curl' or not idle_timeout:
+        return defaults
+    callback = (defaults or {}).get('prepare_curl_callback')
+
+    def prepare(curl):
+        import pycurl
+        if hasattr(pycurl, 'MAXAGE_CONN'):
+            curl.setopt(pycurl.MAXAGE_CONN, int(idle_timeout))
+        if callback:
+            callback(curl)
+    return dict(defaults or {}, prepare_curl_callback=prepare)
+
+def _pool_stats(client):
+    """Returns connection statistics of tornado client."""
+    # curl: free handles keep their connections alive
+    if hasattr(client, '_curls'):
+        idle = len(client._free_list)
+        return {'active': len(client._curls) - idle, 'idle': idle, 'queued': len(client._requests)}
+    # simple: connections aren't reused
+    return {'active': len(client.active), 'idle': 0, 'queued': len(client.queue)}
+
+@gen.coroutine
+def _warm_up(client, kwargs, connections, logger):
+    """Opens connections with concurrent requests, logging failures."""
+    @gen.coroutine
+    def fetch():
+        try:
+            yield client.fetch(_http_request(kwargs), raise_error=False)
+        except Exception as e:
+            logger.warning('Connection warm-up failed: %s' % e)
+    yield [fetch() for _ in range(connections)]
+
+def _body(payload):
+    """Maps payload to HTTPRequest body arguments.
+
+    Strings are sent as is; buffers, file-like objects and iterables are streamed
+    with a body producer (not supported by the curl implementation).
+    """
+    if payload is None or isinstance(payload, (six.binary_type, six.text_type)):
+        return {'body': payload}
+    return {'body_producer': _producer(payload)}
+
+def _length_header(payload):
+    """Content-Length header for streamed payloads of known size.
+
+    Without it tornado sends producer bodies with chunked transfer encoding, which
+    services such as S3 reject.
+    """
+    if payload is None or isinstance(payload, (six.binary_type, six.text_type)):
+        return None
+    size = offload.payload_size(payload)
+    return {'content-length': str(size)} if size is not None else None
+
+
+class RequestTemplate(object):
+    """Compiled HTTPRequest defaults
+
+    Defaults are copied and their header names lowercased once when the template is
+    built; rendering a request only copies the top level and applies request deltas.
+    Request headers are rendered as a single `Headers` container.
+    """
+    def __init__(self, url, defaults=None):
+        """Compiles template
+
+        Parameters:
+            url: service url prefix, e.g. https://foo.us-west-2.amazonaws.com
+            defaults: keyword dict of default HTTPRequest parameters
+        """
+        defaults = deepcopy(defaults) if defaults else {}
+        self.prefix   = url
+        self.headers  = Headers(defaults.pop('headers', {}))
+        self.defaults = defaults
+
+    def url(self, path, qs):
+        """Creates request url from decoded path and canonical querystring"""
+        return self.prefix + encode_path(path) + ('?%s' % qs if qs else '')
+
+    def render(self, url, method, *headers, **kwargs):
+        """Creates HTTPRequest keyword arguments
+
+        Parameters:
+            url: request url
+            method: HTTP method
+            headers: Headers or dicts applied over default headers in order
+            kwargs: additional HTTPRequest parameters
+
+        Returns dict of HTTPRequest arguments
+        """
+        hdrs = self.headers.copy()
+        for h in headers:
+            if h:
+                hdrs.update(h)
+        ret = dict(self.defaults)
+        ret.update(kwargs)
+        ret['url'] = url
+        ret['method'] = method
+        ret['headers'] = hdrs
+        return ret
 
 
 class UnknownCredentialsException(Exception):
@@ -80,26 +247,15 @@ class DefaultServiceConstants(ServiceConstants):
 
 
 class AuthMixin(object):
-    def _amzdate(self, dt):
-        """Convert datetime into Amazon timestamp format
-        
-        Parameter:
-            dt: datetime
-            
-        Returns timestamp string
-        """
-        return dt.strftime('%Y%m%dT%H%M%SZ')
+    # Timestamp source; clients without one get their own Clock, as skew correction
+    # adjusts it per endpoint
+    clock = None
 
-    def _datestamp(self, dt):
-        """Convert datetime into Amazon date format
-        
-        Parameters:
-            dt: datetime
+    def __init__(self, *args, **kwargs):
+        super(AuthMixin, self).__init__(*args, **kwargs)
+        if self.clock is None:
+            self.clock = Clock()
 
-        Returns date string
-        """
-        return dt.strftime('%Y%m%d')
-    
     def sign(self, path, method, headers=None, qs='', payload=None):
         """Generate all headers required for signed request
         
@@ -110,20 +266,58 @@ class AuthMixin(object):
             qs: url querystring
             payload: HTTP payload
             
-        Returns request signing headers
+        Returns request signing headers; raises ValueError for one-shot payloads
+        (iterables, pipes) without a precomputed hash, as hashing would consume them
         """
-        now     = datetime.utcnow()
-        amzdate = self._amzdate(now)
-        amz_hdr = {'x-amz-date': amzdate}
-        return self._merge(amz_hdr, 
-                           self.auth.headers(amzdate=amzdate,
-                                             datestamp=self._datestamp(now),
-                                             uri=path,
-                                             method=method,
-                                             qs=qs,
-                                             headers=self._merge(amz_hdr, headers),
-                                             payload=payload if payload else ''))
-    
+        if not rewindable(payload) and not Headers(headers or {}).get(CONTENT_SHA256_HEADER):
+            raise ValueError('One-shot payloads require content_sha256, e.g. %s' % UNSIGNED_PAYLOAD)
+        amzdate, datestamp = self.clock.timestamps()
+        ret = self.auth.headers(amzdate=amzdate,
+                                datestamp=datestamp,
+                                uri=path,
+                                method=method,
+                                qs=qs,
+                                headers=headers,
+                                payload=payload if payload else '')
+        ret['x-amz-date'] = amzdate
+        return ret
+
+    def sign_upload(self, path, method, headers, qs, length, chunk_size):
+        """Generate seed request headers and chunk signer for aws-chunked upload
+
+        Parameters:
+            path: uri
+            method: HTTP method
+            headers: HTTP headers
+            qs: url querystring
+            length: decoded payload length
+            chunk_size: chunk size in bytes
+
+        Returns tuple of (request signing headers, ChunkSigner)
+        """
+        amzdate, datestamp = self.clock.timestamps()
+        return chunked.seed(self.auth, amzdate, datestamp,
+                            path, method, qs, headers, length, chunk_size)
+
+    def _should_resign(self, error):
+        """Corrects clock skew reported by error response
+
+        The clock offset is estimated from the response 'Date' header; requests are
+        re-signed only if the offset changed, so genuine signature mismatches fail fast.
+
+        Parameters:
+            error: tornado HTTPError
+
+        Returns True if request should be re-signed and sent again
+        """
+        response = error.response
+        if response is None or not _skew_error(response):
+            return False
+        if not self.clock.correct(response.headers.get('Date')):
+            return False
+        self.logger.warning('Corrected clock offset to %ds after %d response' % (self.clock.offset, response.code))
+        return True
+
   
 class HTTP(object):
     """Base HTTP client
@@ -131,7 +325,7 @@ class HTTP(object):
     Contains interfaces necessary for AWS signature signing support.  Subclasses should mixin
     behavior for signature support.
     """
-    def __init__(self, client, constants, defaults=None, logger=None):
+    def __init__(self, client, constants, defaults=None, logger=None, retry=None, limiter=None):
         """ Initialize instance with tornado client implemenation
         
         Parameters:
@@ -139,31 +333,30 @@ class HTTP(object):
             constants: ServiceConstants object
             defaults: keyword dict of default HTTPRequest parameters
             logger: logger
+            retry: RetryPolicy; requests are sent once if not set
+            limiter: TokenBucket pacing requests, see `ratelimit.get_limiter`
         """
         self.client    = client
         self.constants = constants
-        self.defaults  = defaults
+        self.defaults  = defaults if defaults is not None else {}
         self.logger    = logger if logger else _get_logger()
-
-    def _merge(self, base, overrides):
-        """
-        Applies overrides to base dict
-         
-        Parameters:
-            base: base dict 
-            overrides: applies overrides to base dict, if provided
-
-        Returns dict
-        """
-        return _merge(deepcopy(base), overrides) if overrides else base
+        self.retry     = retry
+        self.limiter   = limiter
+        self.template  = RequestTemplate(constants.url, self.defaults)
 
     def _path(self, path):
         return path if path[0] == '/' else '/%s' % path
 
     def _url(self, path, qs):
-        return self.constants.url + path + ('?%s' % qs if qs else '')
+        return self.template.url(path, qs)
+
+    def close(self):
+        """Closes underlying client and its connections"""
+        self.client.close()
 
     def _log_request(self, params):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug('HTTPRequest')
         self.logger.debug('-----------')
         for k, v in six.iteritems(params):
@@ -187,7 +380,47 @@ class HTTP(object):
         self.logger.debug('Default signing')
         return headers
 
-    def prepare_args(self, method, path, query_args=None, headers=None, payload=None):
+    def sign_upload(self, path, method, headers, qs, length, chunk_size):
+        """Implements aws-chunked seed signing
+
+        Subclasses should override this method with a specific signing
+        implementation; unsigned clients can't produce chunk signatures.
+
+        Returns tuple of (signed HTTP headers, ChunkSigner)
+        """
+        raise UnknownCredentialsException()
+
+    def _should_resign(self, error):
+        """Decides whether failed request is re-signed and sent again
+
+        Subclasses with signing support override this method; unsigned requests are
+        never re-sent.
+
+        Parameters:
+            error: tornado HTTPError
+
+        Returns bool
+        """
+        return False
+
+    def _retry_delay(self, error, attempt):
+        """Returns delay in seconds before retrying failed attempt or None if error is final"""
+        if self.retry is None:
+            return None
+        delay = self.retry.delay(error, attempt)
+        if delay is not None:
+            self.logger.warning('Retrying in %.3fs after attempt %d failed: %s' % (delay, attempt + 1, error))
+        return delay
+
+    def _reserve(self):
+        """Returns seconds to wait for rate limiter before sending request"""
+        return self.limiter.reserve() if self.limiter is not None else 0
+
+    def _succeeded(self, attempt):
+        if self.retry is not None:
+            self.retry.succeeded(attempt)
+
+    def prepare_args(self, method, path, query_args=None, headers=None, payload=None, content_sha256=None):
         """Preformats arguments for request 
         
         Parameters:
@@ -196,29 +429,87 @@ class HTTP(object):
             headers: HTTP headers
             query_args: query arguments dict
             payload: HTTP payload
+            content_sha256: precomputed payload hex digest or 'UNSIGNED-PAYLOAD'
 
         Returns dict of prepped arguments
         """
         headers = headers if headers else {}
+        if content_sha256:
+            headers = dict(headers, **{CONTENT_SHA256_HEADER: content_sha256})
 
-        # Like headers can vary due to case insensitivity so we must normalize names for proper merging 
-        # between defaults and input headers.
-        if 'headers' in self.defaults:
-            self.defaults['headers'] = _normalize(self.defaults['headers'])
+        qs     = ArgumentBuilder.canonical_query_string(query_args)
+        path   = self._path(path)
+        url    = self._url(path, qs)
+        signed = self.sign(path, method, headers, qs, payload)
+
+        # Like headers can vary due to case insensitivity so names are normalized for proper
+        # merging between defaults, signing and input headers.
+        kwargs = self.template.render(url, method, _length_header(payload), signed, headers, **_body(payload))
+
+        self._log_request(kwargs)
+        return kwargs
+
+    def prepare_upload_args(self, method, path, source, length, query_args=None, headers=None,
+                            chunk_size=chunked.DEFAULT_CHUNK_SIZE):
+        """Preformats arguments for aws-chunked streaming upload
+
+        The seed request is signed up front; each chunk is signed as the body producer
+        reads it from `source`, so the payload is never held in memory as a whole.
+
+        Parameters:
+            method: HTTP method
+            path: uri
+            source: payload accepted by `util.iter_blocks`
+            length: payload length in bytes
+            query_args: query arguments dict
+            headers: HTTP headers
+            chunk_size: chunk size in bytes
+
+        Returns dict of prepped arguments
+        """
+        headers = headers if headers else {}
+
+        qs     = ArgumentBuilder.canonical_query_string(query_args)
+        path   = self._path(path)
+        url    = self._url(path, qs)
+        signed, signer = self.sign_upload(path, method, headers, qs, length, chunk_size)
+        kwargs = self.template.render(url, method, signed, headers,
+                                      body_producer=_chunk_producer(signer, source, chunk_size))
 
-        qs      = ArgumentBuilder.canonical_query_string(query_args)
-        path    = self._path(path)
-        url     = self._url(path, qs)
-        headers = self._merge(self.sign(path, method, headers, qs, payload), headers)        
-        kwargs  = self._merge(self.defaults, {'url': url, 'method': method, 'headers': _normalize(headers), 'body': payload})
-        
         self._log_request(kwargs)
         return kwargs
 
-    def request(self, method, path, headers=None, query_args=None, payload=None):
-        """Disptach HTTP request """
-        kwargs = self.prepare_args(method, path, query_args, headers, payload)
-        return self.client.fetch(HTTPRequest(**kwargs))
+    def request(self, method, path, headers=None, query_args=None, payload=None, content_sha256=None):
+        """Disptach HTTP request
+
+        Requests failing due to clock skew are re-signed and sent once more, see
+        `_should_resign`; other failures are retried according to the retry policy.
+        Every attempt is signed with a fresh timestamp.  Streamed payloads are sent
+        once.
+        """
+        attempt, resigned = 0, False
+        while True:
+            wait = self._reserve()
+            if wait:
+                time.sleep(wait)
+            kwargs = self.prepare_args(method, path, query_args, headers, payload, content_sha256)
+            try:
+                resp = self.client.fetch(_http_request(kwargs))
+            # Socket errors are IOErrors
+            except (HTTPError, IOError) as e:
+                if not _replayable(payload):
+                    raise
+                if not resigned and isinstance(e, HTTPError) and self._should_resign(e):
+                    resigned = True
+                    continue
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._succeeded(attempt)
+            return resp
 
     def get(self, path, headers=None, query_args=None):
         """ GET request
@@ -233,7 +524,7 @@ class HTTP(object):
         """
         return self.request('GET', path, headers, query_args)
     
-    def post(self, path, payload, headers=None, query_args=None):
+    def post(self, path, payload, headers=None, query_args=None, content_sha256=None):
         """ POST request
         
         Parameters:
@@ -241,29 +532,260 @@ class HTTP(object):
             payload: request body
             headers: HTTP headers
             query_args: query arguments dict
+            content_sha256: precomputed payload hex digest or 'UNSIGNED-PAYLOAD'; skips
+                            hashing the payload
             kwargs: passthru keywargs arguments for HTTPRequest
 
         Returns HTTP response object
         """
-        return self.request('POST', path, headers, query_args, payload)
+        return self.request('POST', path, headers, query_args, payload, content_sha256)
+
+    def upload(self, path, source, length, headers=None, query_args=None, method='PUT',
+               chunk_size=chunked.DEFAULT_CHUNK_SIZE):
+        """ aws-chunked streaming upload (STREAMING-AWS4-HMAC-SHA256-PAYLOAD)
+
+        Requires the 'simple' tornado implementation; curl doesn't support body producers.
+
+        Parameters:
+            path: uri
+            source: file-like object, buffer or iterable of chunks
+            length: payload length in bytes
+            headers: HTTP headers
+            query_args: query arguments dict
+            method: HTTP method
+            chunk_size: chunk size in bytes
+
+        Returns HTTP response object
+        """
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        kwargs = self.prepare_upload_args(method, path, source, length, query_args, headers, chunk_size)
+        return self.client.fetch(_http_request(kwargs))
+
+    @gen.coroutine
+    def _stream(self, fetch, method, path, headers, query_args, max_buffer, sink=None):
+        """Sends request, streaming its body into a `stream.BodyStream`
+
+        Failures before the response headers arrive are re-signed and retried like
+        `request`; once the body streams the request isn't repeated.  The transfer has
+        no overall timeout unless `request_timeout` is set in the client defaults;
+        closing the stream aborts it with the simple client only.
+
+        Parameters:
+            fetch: callable taking request kwargs and returning a Future of the response
+            sink: writable file object receiving the body
+            see `stream` for other parameters
+
+        Returns Future resolving to BodyStream once the response headers arrived
+        """
+        attempt, resigned = 0, False
+        while True:
+            wait = self._reserve()
+            if wait:
+                yield gen.sleep(wait)
+            kwargs = self.prepare_args(method, path, query_args, headers)
+            body   = stream.BodyStream(max_buffer, sink, abort=self.impl == 'simple')
+            kwargs.update(header_callback=body.header_callback, streaming_callback=body.streaming_callback)
+            kwargs.setdefault('request_timeout', stream.STREAM_REQUEST_TIMEOUT)
+            body.attach(fetch(kwargs))
+            try:
+                yield body.ready
+            except (HTTPError, IOError) as e:
+                if not resigned and isinstance(e, HTTPError) and self._should_resign(e):
+                    resigned = True
+                    continue
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                yield gen.sleep(delay)
+                continue
+            self._succeeded(attempt)
+            raise gen.Return(body)
+
+    @gen.coroutine
+    def _download(self, fetch, path, target, headers, query_args, method):
+        with stream.open_target(target) as sink:
+            body = yield self._stream(fetch, method, path, headers, query_args, None, sink)
+            yield body.join()
+        raise gen.Return(body)
 
 
 class SyncHTTP(HTTP):
-    def __init__(self, constants, impl='curl', defaults=None, logger=None):
-        AsyncHTTPClient.configure(TORNADO_IMPL[impl])
-        super(SyncHTTP, self).__init__(HTTPClient(), constants, defaults, logger)
+    def __init__(self, constants, impl='curl', defaults=None, logger=None, retry=None, limiter=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, idle_timeout=None):
+        """Initializes client
+
+        Parameters:
+            impl: tornado implementation, 'curl' or 'simple'
+            max_connections: maximum number of concurrent connections
+            idle_timeout: seconds idle keep-alive connections are reused (curl only)
+            see `HTTP` for other parameters
+        """
+        max_connections = _max_connections(max_connections, None)
+        super(SyncHTTP, self).__init__(_tornado_client(impl, max_connections, sync=True), constants,
+                                       _pool_defaults(impl, defaults, idle_timeout), logger, retry, limiter)
+        self.impl = impl
+
+    def warm_up(self, connections=1):
+        """Opens connections to the endpoint ahead of time
+
+        Concurrent 'HEAD' requests are sent to the service url so later requests find
+        established (TLS) connections.  Only the curl implementation keeps connections
+        alive.
+
+        Parameters:
+            connections: number of connections
+        """
+        kwargs = self.template.render(self.constants.url + '/', 'HEAD')
+        self.client._io_loop.run_sync(lambda: _warm_up(self.client._async_client, kwargs, connections,
+                                                       self.logger))
+
+    def pool_stats(self):
+        """Returns dict of 'active', 'idle' and 'queued' connection counts"""
+        return _pool_stats(self.client._async_client)
+
+    def _async_fetch(self, kwargs):
+        return self.client._async_client.fetch(_http_request(kwargs))
+
+    def stream(self, path, headers=None, query_args=None, method='GET', max_buffer=stream.DEFAULT_MAX_BUFFER):
+        """Generator of response body chunks as they arrive
+
+        The client's IOLoop only runs while the next chunk is requested, so a slow
+        consumer stops reading from the connection rather than buffering the body.
+        The transfer has no overall timeout unless `request_timeout` is set in the
+        client defaults.
+
+        Parameters:
+            path: uri
+            headers: HTTP headers
+            query_args: query arguments dict
+            method: HTTP method
+            max_buffer: maximum number of bytes buffered, see `stream.BodyStream`
+
+        Yields body chunks; raises HTTPError for unsuccessful responses
+        """
+        run  = self.client._io_loop.run_sync
+        body = run(lambda: self._stream(self._async_fetch, method, path, headers, query_args, max_buffer))
+        try:
+            while True:
+                chunk = run(body.read)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            body.close()
+
+    def download(self, path, target, headers=None, query_args=None, method='GET'):
+        """Writes response body straight to a file
+
+        Parameters:
+            path: uri
+            target: file name or writable binary file object
+            headers: HTTP headers
+            query_args: query arguments dict
+            method: HTTP method
+
+        Returns completed `stream.BodyStream` holding code, headers and bytes `received`
+        """
+        return self.client._io_loop.run_sync(
+            lambda: self._download(self._async_fetch, path, target, headers, query_args, method))
 
 
 class AsyncHTTP(HTTP):
-    def __init__(self, constants, impl='curl', defaults=None, logger=None):
-        AsyncHTTPClient.configure(TORNADO_IMPL[impl])
-        super(AsyncHTTP, self).__init__(AsyncHTTPClient(), constants, defaults, logger)
+    def __init__(self, constants, impl='curl', defaults=None, logger=None, retry=None, limiter=None,
+                 concurrency=None, max_connections=None, idle_timeout=None,
+                 offload_threshold=offload.DEFAULT_THRESHOLD, executor=None):
+        """Initializes client
+
+        Parameters:
+            impl: tornado implementation, 'curl' or 'simple'
+            concurrency: AIMDLimiter adapting the number of in-flight requests, unlimited
+                         if not set
+            max_connections: maximum number of concurrent connections, at least
+                             `concurrency.maximum`, which is the default with a limiter
+            idle_timeout: seconds idle keep-alive connections are reused (curl only)
+            offload_threshold: payload size in bytes from which requests are hashed and
+                               signed in `executor`; None signs everything on the IOLoop
+            executor: concurrent.futures executor, defaults to the IOLoop's executor
+            see `HTTP` for other parameters
+        """
+        max_connections = _max_connections(max_connections, concurrency)
+        super(AsyncHTTP, self).__init__(_tornado_client(impl, max_connections), constants,
+                                        _pool_defaults(impl, defaults, idle_timeout), logger, retry, limiter)
+        self.impl              = impl
+        self.concurrency       = concurrency
+        self.offload_threshold = offload_threshold
+        self.executor          = executor
+        # Time the IOLoop spent preparing and signing requests inline
+        self.stalls            = offload.StallStats()
+
+    @gen.coroutine
+    def _prepare_args(self, method, path, query_args, headers, payload, content_sha256):
+        """Prepares request, hashing and signing large payloads off the IOLoop"""
+        args = (method, path, query_args, headers, payload, content_sha256)
+        if offload.should_offload(payload, self.offload_threshold):
+            kwargs = yield IOLoop.current().run_in_executor(self.executor, self.prepare_args, *args)
+        else:
+            with self.stalls.timer():
+                kwargs = self.prepare_args(*args)
+        raise gen.Return(kwargs)
+
+    def warm_up(self, connections=1):
+        """Opens connections to the endpoint ahead of time, see `SyncHTTP.warm_up`
+
+        Returns Future resolved once the connections are established
+        """
+        kwargs = self.template.render(self.constants.url + '/', 'HEAD')
+        return _warm_up(self.client, kwargs, connections, self.logger)
+
+    def pool_stats(self):
+        """Returns dict of 'active', 'idle' and 'queued' connection counts"""
+        return _pool_stats(self.client)
 
     @gen.coroutine
-    def request(self, method, path, headers=None, query_args=None, payload=None):
-        kwargs = self.prepare_args(method, path, query_args, headers, payload)
-        resp = yield self.client.fetch(HTTPRequest(**kwargs))
+    def _fetch(self, kwargs):
+        """Sends request within the concurrency limit, feeding its outcome back"""
+        limiter = self.concurrency
+        if limiter is None:
+            resp = yield self.client.fetch(_http_request(kwargs))
+            raise gen.Return(resp)
+
+        yield limiter.acquire()
+        start = concurrency._monotonic()
+        try:
+            resp = yield self.client.fetch(_http_request(kwargs))
+        except Exception as e:
+            limiter.release(concurrency._monotonic() - start, concurrency.overloaded(e))
+            raise
+        limiter.release(concurrency._monotonic() - start)
         raise gen.Return(resp)
+
+    @gen.coroutine
+    def request(self, method, path, headers=None, query_args=None, payload=None, content_sha256=None):
+        attempt, resigned = 0, False
+        while True:
+            wait = self._reserve()
+            if wait:
+                yield gen.sleep(wait)
+            kwargs = yield self._prepare_args(method, path, query_args, headers, payload, content_sha256)
+            try:
+                resp = yield self._fetch(kwargs)
+            except (HTTPError, IOError) as e:
+                if not _replayable(payload):
+                    raise
+                if not resigned and isinstance(e, HTTPError) and self._should_resign(e):
+                    resigned = True
+                    continue
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                yield gen.sleep(delay)
+                continue
+            self._succeeded(attempt)
+            raise gen.Return(resp)
     
     @gen.coroutine
     def get(self, path, headers=None, query_args=None):
@@ -271,8 +793,64 @@ class AsyncHTTP(HTTP):
         raise gen.Return(resp)
     
     @gen.coroutine
-    def post(self, path, payload, headers=None, query_args=None):
-        resp = yield self.request('POST', path, headers, query_args, payload)
+    def post(self, path, payload, headers=None, query_args=None, content_sha256=None):
+        resp = yield self.request('POST', path, headers, query_args, payload, content_sha256)
+        raise gen.Return(resp)
+
+    def fetch_many(self, requests, concurrency=fanout.DEFAULT_CONCURRENCY, ordered=True, fail_fast=False):
+        """Signs and dispatches many requests with bounded concurrency
+
+        Requests are signed just before they are sent, so long-running fan-outs don't send
+        stale timestamps.
+
+        Parameters:
+            requests: iterable of `request` argument tuples, e.g. ('GET', '/foo'), or
+                      keyword argument dicts
+            concurrency: maximum number of requests in flight
+            ordered: gather results in request order, otherwise iterate them as they complete
+            fail_fast: raise first error and stop sending requests; otherwise errors are
+                       returned in place of responses
+
+        Returns Future resolving to list of responses if `ordered`, otherwise a
+        `fanout.FetchIterator` of (index, response) pairs
+        """
+        def fetch(args):
+            return self.request(**args) if isinstance(args, dict) else self.request(*args)
+
+        iterator = fanout.FetchIterator(fetch, requests, concurrency, fail_fast)
+        return fanout.collect(iterator) if ordered else iterator
+
+    def stream(self, path, headers=None, query_args=None, method='GET', max_buffer=stream.DEFAULT_MAX_BUFFER):
+        """Streams response body instead of buffering it
+
+        Tornado can't pause a connection, so the body is buffered up to `max_buffer`
+        bytes for a consumer slower than the network; beyond that reads fail with
+        `stream.StreamBufferExceeded`.  Consumers that can't keep up, e.g. large
+        downloads, should use `download` or the asyncio client, whose `stream` applies
+        backpressure.
+
+        Parameters:
+            see `SyncHTTP.stream`
+
+        Returns Future resolving to `stream.BodyStream` once the response headers arrived
+        """
+        return self._stream(self._fetch, method, path, headers, query_args, max_buffer)
+
+    def download(self, path, target, headers=None, query_args=None, method='GET'):
+        """Writes response body straight to a file, see `SyncHTTP.download`
+
+        Returns Future resolving to the completed `stream.BodyStream`
+        """
+        return self._download(self._fetch, path, target, headers, query_args, method)
+
+    @gen.coroutine
+    def upload(self, path, source, length, headers=None, query_args=None, method='PUT',
+               chunk_size=chunked.DEFAULT_CHUNK_SIZE):
+        wait = self._reserve()
+        if wait:
+            yield gen.sleep(wait)
+        kwargs = self.prepare_upload_args(method, path, source, length, query_args, headers, chunk_size)
+        resp = yield self._fetch(kwargs)
         raise gen.Return(resp)
 
 
@@ -281,7 +859,10 @@ def _get_base_cls(asynch=False, sign=True):
     return (AuthMixin,) + impl if sign else impl 
 
 def get_instance(endpoint, constants_cls=DefaultServiceConstants, defaults=None, 
-                 asynch=True, sign=False, creds=None, logger=None):
+                 asynch=True, sign=False, creds=None, logger=None, clock=None, retry=None,
+                 rate=None, burst=None, concurrency=None, impl='curl',
+                 max_connections=None, idle_timeout=None, warm_up=0,
+                 offload_threshold=offload.DEFAULT_THRESHOLD):
     """Create HTTPClient instance
     
     An HTTPClient instance is dynamically assembled based on ``asynch`` and ``sign``
@@ -294,6 +875,19 @@ def get_instance(endpoint, constants_cls=DefaultServiceConstants, defaults=None,
         asynch: bool that determines if underlying client is asynchronous or synchronous
         sign: bool that determines if requests are signed
         creds: AWS Credentials
+        clock: signing timestamp source, see `Clock`
+        retry: RetryPolicy, see `retry` module
+        rate: requests per second shared by all clients of the endpoint host; unlimited
+              if not set
+        burst: maximum request burst, see `ratelimit.TokenBucket`
+        concurrency: AIMDLimiter for asynchronous clients, see `concurrency` module
+        impl: tornado implementation, 'curl' or 'simple'
+        max_connections: maximum number of concurrent connections of this client,
+                         defaults to `concurrency.maximum` with a limiter
+        idle_timeout: seconds idle keep-alive connections are reused (curl only)
+        warm_up: number of connections opened ahead of time, see `SyncHTTP.warm_up`;
+                 asynchronous clients warm up in the background
+        offload_threshold: payload size from which asynchronous clients sign in an executor
        
     Returns HTTPClient instance
     """
@@ -303,6 +897,14 @@ def get_instance(endpoint, constants_cls=DefaultServiceConstants, defaults=None,
     constants = constants_cls.from_url(endpoint)
 
     defaults = defaults if defaults else {}
+    limiter  = ratelimit.get_limiter(constants.host, rate, burst) if rate else None
     base     = _get_base_cls(asynch, sign)
-    attrs    = {'auth': Authorization(constants, creds)} if sign else {}
-    return type('HTTPClient', base, attrs)(constants, defaults=defaults, logger=logger)
+    attrs    = {'auth': Authorization(constants, creds),
+                'clock': clock if clock else Clock()} if sign else {}
+    kwargs   = {'concurrency': concurrency, 'offload_threshold': offload_threshold} if asynch else {}
+    client   = type('HTTPClient', base, attrs)(constants, impl=impl, defaults=defaults, logger=logger,
+                                               retry=retry, limiter=limiter, max_connections=max_connections,
+                                               idle_timeout=idle_timeout, **kwargs)
+    if warm_up:
+        client.warm_up(warm_up)
+    return client
@@ -0,0 +1,103 @@
+import io
+import os
+import threading
+import time
+
+import six
+
+from aws_sign.v4.util import rewindable, safe_encode
+
+#
+# Constants
+#
+_monotonic = getattr(time, 'monotonic', time.time)
+
+# Payloads of at least this many bytes are hashed and signed off the event loop
+DEFAULT_THRESHOLD = 1024 * 1024
+
+
+def payload_size(payload):
+    """Determines payload size without reading it
+
+    Parameters:
+        payload: request payload
+
+    Returns size in bytes or None if unknown (iterables, pipes)
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, six.text_type):
+        # Sent UTF-8 encoded
+        return len(safe_encode(payload))
+    try:
+        return memoryview(payload).nbytes
+    except TypeError:
+        pass
+    if not rewindable(payload):
+        return None
+    try:
+        return os.fstat(payload.fileno()).st_size - payload.tell()
+    except (AttributeError, OSError, IOError, io.UnsupportedOperation):
+        pass
+    # In-memory files
+    pos = payload.tell()
+    try:
+        return payload.seek(0, io.SEEK_END) - pos
+    finally:
+        payload.seek(pos)
+
+def should_offload(payload, threshold):
+    """Whether signing payload should run in an executor
+
+    Payloads of unknown size are offloaded as hashing them may block on I/O too.
+
+    Parameters:
+        payload: request payload
+        threshold: size threshold in bytes; None disables offloading
+
+    Returns bool
+    """
+    if threshold is None:
+        return False
+    size = payload_size(payload)
+    return size is None or size >= threshold
+
+
+class StallStats(object):
+    """Accumulates time the event loop was blocked signing requests
+
+    Thread-safe.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max   = 0.0
+        self.__lock = threading.Lock()
+
+    def record(self, elapsed):
+        """Records a stall of `elapsed` seconds"""
+        with self.__lock:
+            self.count += 1
+            self.total += elapsed
+            if elapsed > self.max:
+                self.max = elapsed
+
+    def timer(self):
+        """Returns context manager recording the duration of its block"""
+        return _Timer(self)
+
+    def __str__(self):
+        return 'count=%d total=%.6fs max=%.6fs' % (self.count, self.total, self.max)
+
+
+class _Timer(object):
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = _monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.record(_monotonic() - self.start)
+        return False
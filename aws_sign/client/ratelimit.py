@@ -0,0 +1,80 @@
+import threading
+import time
+
+#
+# Constants
+#
+_monotonic = getattr(time, 'monotonic', time.time)
+
+# Limiters shared by clients of the same endpoint, keyed by host
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """Reservation-based token bucket rate limiter
+
+    Tokens accrue at `rate` per second up to `burst`.  Callers reserve a token and are
+    told how long to wait for it instead of polling; tokens may be reserved ahead of
+    time, driving the balance negative, so waiting callers are served in FIFO order.
+    Buckets are thread-safe.
+
+    Example:
+      bucket = TokenBucket(rate=10, burst=20)
+      time.sleep(bucket.reserve())
+    """
+    def __init__(self, rate, burst=None, now=_monotonic):
+        """Initializes bucket
+
+        Parameters:
+            rate: tokens per second
+            burst: bucket capacity, defaults to one second worth of tokens
+            now: monotonic time callable in seconds
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive: %s' % rate)
+        self.rate    = float(rate)
+        self.burst   = float(burst if burst else max(1, rate))
+        self.now     = now
+        self.tokens  = self.burst
+        self.__stamp = now()
+        self.__lock  = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Reserves tokens
+
+        Parameters:
+            tokens: number of tokens
+
+        Returns seconds to wait before the reservation may be used
+        """
+        with self.__lock:
+            now = self.now()
+            self.tokens = min(self.burst, self.tokens + (now - self.__stamp) * self.rate)
+            self.__stamp = now
+            self.tokens -= tokens
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def __str__(self):
+        return 'rate=%s burst=%s tokens=%s' % (self.rate, self.burst, self.tokens)
+
+
+def get_limiter(key, rate, burst=None):
+    """Returns shared TokenBucket for key, creating it on first use
+
+    Parameters:
+        key: limiter key, e.g. endpoint host
+        rate: requests per second
+        burst: maximum burst, see TokenBucket
+
+    Returns TokenBucket; raises ValueError if the key's limiter has different settings
+    """
+    with _limiters_lock:
+        try:
+            ret = _limiters[key]
+        except KeyError:
+            ret = _limiters[key] = TokenBucket(rate, burst)
+            return ret
+    if ret.rate != float(rate) or ret.burst != float(burst if burst else max(1, rate)):
+        raise ValueError('Limiter for %s already exists with rate=%s burst=%s' % (key, ret.rate, ret.burst))
+    return ret
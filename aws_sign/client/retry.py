@@ -0,0 +1,151 @@
+import random
+import threading
+
+from tornado.httpclient import HTTPError
+
+#
+# Constants
+#
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY   = 0.05
+DEFAULT_MAX_DELAY    = 20
+
+# Retry budget accounting; a full budget allows 100 retries before successes refill it
+DEFAULT_BUDGET  = 500
+RETRY_COST      = 5
+TIMEOUT_COST    = 10
+SUCCESS_REFUND  = 1
+
+# 599 is tornado's status for timeouts and connection failures
+RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504, 599))
+
+THROTTLING_ERRORS = (b'Throttling', b'ThrottlingException', b'ThrottledException',
+                     b'RequestThrottledException', b'TooManyRequestsException',
+                     b'ProvisionedThroughputExceededException', b'RequestLimitExceeded',
+                     b'BandwidthLimitExceeded', b'LimitExceededException', b'RequestThrottled',
+                     b'SlowDown', b'PriorRequestNotComplete', b'EC2ThrottledException')
+
+
+def _throttled(response):
+    """Whether error response body reports throttling."""
+    body = response.body if response is not None else None
+    return bool(body) and any(code in body for code in THROTTLING_ERRORS)
+
+
+class RetryBudget(object):
+    """Token bucket limiting retries across requests
+
+    Every retry withdraws tokens and every successful request refunds some, so retries
+    stop once most requests fail instead of multiplying load on a struggling service.
+    Budgets are thread-safe and may be shared among clients.
+    """
+    def __init__(self, capacity=DEFAULT_BUDGET):
+        """Initializes budget
+
+        Parameters:
+            capacity: maximum number of tokens
+        """
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.__lock   = threading.Lock()
+
+    def withdraw(self, cost):
+        """Withdraws tokens for a retry
+
+        Parameters:
+            cost: number of tokens
+
+        Returns True if retry is allowed
+        """
+        with self.__lock:
+            if cost > self.tokens:
+                return False
+            self.tokens -= cost
+            return True
+
+    def deposit(self, amount):
+        """Refunds tokens, up to capacity"""
+        with self.__lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def __str__(self):
+        return 'tokens=%d capacity=%d' % (self.tokens, self.capacity)
+
+
+class RetryPolicy(object):
+    """Retry policy with capped exponential backoff and full jitter
+
+    Throttling responses, 5xx responses, timeouts and connection errors are retried up
+    to `max_attempts` attempts in total.  The delay before attempt n is drawn uniformly
+    from [0, min(max_delay, base_delay * 2 ** n)), which spreads retries of concurrent
+    callers apart.  Retries draw from a `RetryBudget`.
+
+    Requests are signed again for every attempt.
+
+    Example:
+      client = http.get_instance(endpoint, sign=True, creds=creds,
+                                 retry=RetryPolicy(max_attempts=5))
+    """
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, budget=None, random=random.random):
+        """Initializes policy
+
+        Parameters:
+            max_attempts: maximum number of attempts, including the first
+            base_delay: backoff base in seconds
+            max_delay: maximum backoff in seconds
+            budget: RetryBudget, a new budget by default
+            random: callable returning floats in [0, 1)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay   = base_delay
+        self.max_delay    = max_delay
+        self.budget       = budget if budget is not None else RetryBudget()
+        self.random       = random
+
+    def cost(self, error):
+        """Classifies error
+
+        Parameters:
+            error: exception raised by request
+
+        Returns retry cost in budget tokens or None if error isn't retryable
+        """
+        if isinstance(error, HTTPError):
+            if error.code == 599:
+                return TIMEOUT_COST
+            if error.code in RETRYABLE_STATUS or _throttled(error.response):
+                return RETRY_COST
+            return None
+        # Socket errors
+        if isinstance(error, (IOError, OSError)):
+            return TIMEOUT_COST
+        return None
+
+    def backoff(self, attempt):
+        """Returns jittered delay in seconds before retrying `attempt` (0 based)"""
+        return self.random() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def delay(self, error, attempt):
+        """Decides whether failed attempt is retried
+
+        Parameters:
+            error: exception raised by attempt
+            attempt: failed attempt number, 0 based
+
+        Returns delay in seconds before next attempt or None if error is final
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        cost = self.cost(error)
+        if cost is None or not self.budget.withdraw(cost):
+            return None
+        return self.backoff(attempt)
+
+    def succeeded(self, attempt):
+        """Records successful attempt, refunding the budget
+
+        Parameters:
+            attempt: successful attempt number, 0 based
+        """
+        self.budget.deposit(RETRY_COST if attempt else SUCCESS_REFUND)
@@ -0,0 +1,259 @@
+"""Streamed response bodies for the tornado clients
+
+`BodyStream` hooks a request's `header_callback` and `streaming_callback` so body chunks
+are handed to the caller, or written to a file, as they arrive instead of being
+buffered into `HTTPResponse.body`.
+
+Tornado's callbacks can't pause the connection, so within a running IOLoop a consumer
+slower than the network is bounded by `max_buffer`: once that many bytes are waiting,
+the stream fails with `StreamBufferExceeded`.  Slow consumers should use `download`,
+which writes chunks as they arrive, `SyncHTTP.stream`, whose IOLoop only runs while
+the consumer asks for the next chunk, or the asyncio client's `aio.BodyReader`, which
+reads from the connection on demand.
+
+Streamed requests aren't bounded by tornado's default 20 second `request_timeout`,
+which covers the whole transfer; a `request_timeout` in the client defaults still
+applies.  Closing a stream early aborts the transfer with the simple client.  Curl
+transfers can't be interrupted and drain in the background, so curl clients streaming
+large bodies should set `request_timeout`.
+"""
+import contextlib
+import io
+
+from collections import deque
+
+import six
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPError, HTTPResponse
+from tornado.httputil import HTTPHeaders, parse_response_start_line
+
+from aws_sign.client.fanout import _StopAsyncIteration
+
+#
+# Constants
+#
+DEFAULT_MAX_BUFFER = 16 * 1024 * 1024
+
+# request_timeout of streamed requests; tornado treats 0 as no timeout
+STREAM_REQUEST_TIMEOUT = 0
+
+
+class StreamClosed(Exception):
+    def __init__(self):
+        super(StreamClosed, self).__init__('Response body stream closed; aborting transfer')
+
+
+class StreamBufferExceeded(Exception):
+    def __init__(self, max_buffer):
+        super(StreamBufferExceeded, self).__init__(
+            'More than %d bytes of response body buffered; consumer too slow' % max_buffer)
+
+
+def _ok(code):
+    return code is not None and 200 <= code < 300
+
+def _with_body(error, body):
+    """Returns copy of HTTPError whose response carries the streamed error body"""
+    resp = error.response
+    if resp is None or not body:
+        return error
+    resp = HTTPResponse(resp.request, resp.code, headers=resp.headers, buffer=io.BytesIO(body),
+                        effective_url=resp.effective_url, reason=resp.reason,
+                        request_time=resp.request_time)
+    return HTTPError(error.code, error.message, resp)
+
+@contextlib.contextmanager
+def open_target(target):
+    """Opens download target
+
+    Parameters:
+        target: file name or writable binary file object, which is left open
+    """
+    if isinstance(target, six.string_types):
+        with open(target, 'wb') as f:
+            yield f
+    else:
+        yield target
+
+
+class BodyStream(object):
+    """Response body read in chunks as it arrives
+
+    `ready` resolves once a successful (2xx) response's headers arrived, exposing
+    `code`, `reason` and `headers`; error responses are read whole and fail `ready`
+    with their HTTPError.  Chunks are then read with `read` or `async for`, or written
+    to `sink` as they arrive.  Streams are single-consumer and must be used from the
+    IOLoop thread.
+
+    Example:
+      body = yield client.stream('/large-object')
+      while True:
+          chunk = yield body.read()
+          if not chunk:
+              break
+          ...
+
+      async for chunk in (await client.stream('/large-object')):
+          ...
+    """
+    def __init__(self, max_buffer=DEFAULT_MAX_BUFFER, sink=None, abort=True):
+        """Initializes stream
+
+        Parameters:
+            max_buffer: maximum number of bytes buffered for the consumer
+            sink: writable file object receiving the body instead of the consumer
+            abort: raise `StreamClosed` from `streaming_callback` once closed, which
+                   makes the simple client close the connection
+        """
+        self.max_buffer    = max_buffer
+        self.sink          = sink
+        self.abort         = abort
+        self.code          = None
+        self.reason        = None
+        self.headers       = HTTPHeaders()
+        self.effective_url = None
+        # Body bytes received and buffered for the consumer
+        self.received      = 0
+        self.buffered      = 0
+        self.ready         = Future()
+        self.__chunks      = deque()
+        self.__errors      = []
+        self.__waiter      = None
+        self.__joiners     = []
+        self.__error       = None
+        self.__finished    = False
+        self.__closed      = False
+
+    def header_callback(self, line):
+        """`HTTPRequest.header_callback`, called once per header line"""
+        if line.startswith('HTTP/'):
+            # Status line, repeated for redirects and interim responses
+            start = parse_response_start_line(line.strip())
+            self.code, self.reason = start.code, start.reason
+            self.headers = HTTPHeaders()
+        elif line.strip():
+            self.headers.parse_line(line)
+        elif _ok(self.code) and not self.ready.done():
+            self.ready.set_result(self)
+
+    def streaming_callback(self, chunk):
+        """`HTTPRequest.streaming_callback`, called with every body chunk"""
+        if not _ok(self.code):
+            self.__errors.append(chunk)
+            return
+        if self.__closed:
+            if self.abort:
+                raise StreamClosed()
+            return
+        self.received += len(chunk)
+        if self.sink is not None:
+            self.sink.write(chunk)
+            return
+        if self.buffered + len(chunk) > self.max_buffer:
+            self._fail(StreamBufferExceeded(self.max_buffer))
+            return
+        self.buffered += len(chunk)
+        self.__chunks.append(chunk)
+        self._notify()
+
+    def attach(self, future):
+        """Completes stream with the outcome of the request `future`"""
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        error = future.exception()
+        if isinstance(error, HTTPError):
+            error = _with_body(error, b''.join(self.__errors))
+        elif error is None:
+            self.effective_url = future.result().effective_url
+        if not self.ready.done():
+            if error is None:
+                self.ready.set_result(self)
+            else:
+                self.ready.set_exception(error)
+        self.__finished = True
+        if error is not None:
+            self._fail(error)
+        self._notify()
+
+    def _fail(self, error):
+        if self.__error is None:
+            self.__error = error
+            self.__closed = True
+            self.__chunks.clear()
+            self.buffered = 0
+        self._notify()
+
+    def _notify(self):
+        waiter = self.__waiter
+        if waiter is not None and (self.__chunks or self.__error is not None or self.__finished):
+            self.__waiter = None
+            self._resolve(waiter)
+        if self.__finished:
+            while self.__joiners:
+                future = self.__joiners.pop()
+                if self.__error is not None:
+                    future.set_exception(self.__error)
+                else:
+                    future.set_result(self)
+
+    def _resolve(self, future):
+        if self.__chunks:
+            chunk = self.__chunks.popleft()
+            self.buffered -= len(chunk)
+            future.set_result(chunk)
+        elif self.__error is not None:
+            future.set_exception(self.__error)
+        else:
+            future.set_result(b'')
+
+    def read(self):
+        """Returns Future resolving to the next body chunk, or b'' at the end"""
+        if self.__waiter is not None:
+            raise RuntimeError('BodyStream.read called while another read is pending')
+        future = Future()
+        if self.__chunks or self.__error is not None or self.__finished:
+            self._resolve(future)
+        else:
+            self.__waiter = future
+        return future
+
+    def join(self):
+        """Returns Future resolved once the whole body was received"""
+        future = Future()
+        self.__joiners.append(future)
+        self._notify()
+        return future
+
+    def close(self):
+        """Discards the rest of the body
+
+        With `abort` the next chunk aborts the transfer, failing the request with
+        HTTPError 599 (tornado logs the `StreamClosed` raised to do so).  Otherwise the
+        connection drains in the background until the body ends or `request_timeout`
+        expires.
+        """
+        self.__closed = True
+        self.__chunks.clear()
+        self.buffered = 0
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = Future()
+
+        def done(read):
+            error = read.exception()
+            if error is not None:
+                future.set_exception(error)
+            elif read.result():
+                future.set_result(read.result())
+            else:
+                future.set_exception(_StopAsyncIteration())
+
+        self.read().add_done_callback(done)
+        return future
+
+    def __str__(self):
+        return 'code=%s received=%d buffered=%d' % (self.code, self.received, self.buffered)
@@ -0,0 +1,182 @@
+"""Thread-safe blocking HTTP client for multi-threaded workers
+
+Clients hand requests to one IOLoop running in a daemon thread and block the calling
+thread until the response arrives.  Each client wraps a single tornado `AsyncHTTP`
+client, so its connection pool, rate and concurrency limits and retry budget are
+shared by every calling thread instead of being rebuilt per thread.
+"""
+import threading
+
+from concurrent import futures
+
+from tornado.concurrent import chain_future, is_future
+from tornado.ioloop import IOLoop
+
+from aws_sign.client import fanout, http, stream
+from aws_sign.v4 import chunked
+
+#
+# Constants
+#
+THREAD_NAME = 'aws-sign-ioloop'
+
+# Loop shared by all clients, started on first use
+_loop = None
+_loop_lock = threading.Lock()
+
+
+class BackgroundLoop(object):
+    """IOLoop running in a daemon thread
+
+    Example:
+      loop = BackgroundLoop()
+      resp = loop.call(async_client.get, '/foo')
+    """
+    def __init__(self, name=THREAD_NAME):
+        """Starts loop thread
+
+        Parameters:
+            name: thread name
+        """
+        started = threading.Event()
+        self.io_loop = None
+        self.thread  = threading.Thread(target=self._run, args=(started,), name=name)
+        self.thread.daemon = True
+        self.thread.start()
+        started.wait()
+
+    def _run(self, started):
+        self.io_loop = IOLoop()
+        self.io_loop.add_callback(started.set)
+        self.io_loop.start()
+        self.io_loop.close()
+
+    def call(self, fn, *args, **kwargs):
+        """Runs fn on the loop thread and blocks for its result
+
+        Parameters:
+            fn: callable returning a value or a Future
+
+        Returns result of fn, raising its exception on failure
+        """
+        if threading.current_thread() is self.thread:
+            raise RuntimeError('BackgroundLoop.call would block its own IOLoop')
+
+        result = futures.Future()
+
+        def run():
+            try:
+                ret = fn(*args, **kwargs)
+            except Exception as e:
+                result.set_exception(e)
+                return
+            if is_future(ret):
+                chain_future(ret, result)
+            else:
+                result.set_result(ret)
+
+        self.io_loop.add_callback(run)
+        return result.result()
+
+    def stop(self):
+        """Stops the loop and waits for its thread to exit"""
+        self.io_loop.add_callback(self.io_loop.stop)
+        self.thread.join()
+
+
+def get_loop():
+    """Returns BackgroundLoop shared by all clients, starting it on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = BackgroundLoop()
+        return _loop
+
+
+class ThreadedHTTP(object):
+    """Blocking client safe to share between threads
+
+    Requests run on the background loop, so a client never needs more than one
+    connection pool however many threads call it.  Calling it from the loop thread
+    itself raises RuntimeError; coroutines there should use `client` directly.
+    """
+    def __init__(self, factory, loop=None):
+        """Initializes client
+
+        Parameters:
+            factory: callable returning an `AsyncHTTP` client, invoked on the loop thread
+            loop: BackgroundLoop, defaults to the shared loop
+        """
+        self.loop   = loop if loop else get_loop()
+        self.client = self.loop.call(factory)
+
+    def request(self, method, path, headers=None, query_args=None, payload=None, content_sha256=None):
+        return self.loop.call(self.client.request, method, path, headers, query_args, payload,
+                              content_sha256)
+
+    def get(self, path, headers=None, query_args=None):
+        return self.request('GET', path, headers, query_args)
+
+    def post(self, path, payload, headers=None, query_args=None, content_sha256=None):
+        return self.request('POST', path, headers, query_args, payload, content_sha256)
+
+    def upload(self, path, source, length, headers=None, query_args=None, method='PUT',
+               chunk_size=chunked.DEFAULT_CHUNK_SIZE):
+        return self.loop.call(self.client.upload, path, source, length, headers, query_args, method,
+                              chunk_size)
+
+    def fetch_many(self, requests, concurrency=fanout.DEFAULT_CONCURRENCY, fail_fast=False):
+        """Sends many requests with bounded concurrency, see `AsyncHTTP.fetch_many`
+
+        Returns list of responses (or exceptions) in request order
+        """
+        return self.loop.call(self.client.fetch_many, requests, concurrency, True, fail_fast)
+
+    def stream(self, path, headers=None, query_args=None, method='GET', max_buffer=stream.DEFAULT_MAX_BUFFER):
+        """Generator of response body chunks, see `AsyncHTTP.stream`
+
+        The loop keeps reading while the calling thread processes a chunk, so up to
+        `max_buffer` bytes are buffered for it before the stream fails; slow consumers
+        should use `download` instead.
+        """
+        body = self.loop.call(self.client.stream, path, headers, query_args, method, max_buffer)
+        try:
+            while True:
+                chunk = self.loop.call(body.read)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.loop.call(body.close)
+
+    def download(self, path, target, headers=None, query_args=None, method='GET'):
+        """Writes response body straight to a file, see `SyncHTTP.download`"""
+        return self.loop.call(self.client.download, path, target, headers, query_args, method)
+
+    def warm_up(self, connections=1):
+        """Opens connections to the endpoint ahead of time, see `SyncHTTP.warm_up`"""
+        self.loop.call(self.client.warm_up, connections)
+
+    def pool_stats(self):
+        """Returns dict of 'active', 'idle' and 'queued' connection counts"""
+        return self.loop.call(self.client.pool_stats)
+
+    def close(self):
+        """Closes the underlying client; the shared loop keeps running"""
+        self.loop.call(self.client.close)
+
+
+def get_instance(endpoint, loop=None, **kwargs):
+    """Create thread-safe blocking HTTPClient instance
+
+    Parameters:
+        endpoint: service endpoint
+        loop: BackgroundLoop, defaults to the shared loop
+        see `http.get_instance` for other parameters; `asynch` is implied
+
+    Returns ThreadedHTTP instance
+    """
+    kwargs['asynch'] = True
+    if kwargs.get('sign') and kwargs.get('creds') is None:
+        raise http.UnknownCredentialsException()
+    return ThreadedHTTP(lambda: http.get_instance(endpoint, **kwargs), loop)
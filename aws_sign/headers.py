@@ -0,0 +1,128 @@
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+import six
+
+
+class Headers(MutableMapping):
+    """Case-insensitive HTTP header container
+
+    Header names are lowercased once on insertion and kept in insertion order (on
+    Python 3.7+, where dicts are ordered).  Repeated headers are kept as
+    separate values; item access returns them comma-joined, which is equivalent on
+    the wire and matches the Signature Version 4 canonical form.
+
+    Example:
+      h = Headers({'Content-Type': 'text/plain'})
+      h.add('X-Amz-Meta-Foo', 'a')
+      h.add('x-amz-meta-foo', ' b   c ')
+
+      # h['X-AMZ-META-FOO'] -> 'a, b   c '
+      # h.canonical()      -> [('content-type', 'text/plain'), ('x-amz-meta-foo', 'a,b c')]
+    """
+    __slots__ = ('_store',)
+
+    def __init__(self, *sources):
+        """Initializes headers
+
+        Parameters:
+            sources: dicts, Headers or iterables of (name, value) pairs applied in order
+        """
+        self._store = {}
+        for source in sources:
+            self.update(source)
+
+    def add(self, name, value):
+        """Appends value, keeping any existing values for name"""
+        k = name.lower()
+        self._store[k] = self._store.get(k, ()) + (value,)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def get_list(self, name):
+        """Returns list of all values for name"""
+        return list(self._store.get(name.lower(), ()))
+
+    def iter_all(self):
+        """Returns generator of (name, value) pairs, one per value"""
+        for k, values in six.iteritems(self._store):
+            for v in values:
+                yield k, v
+
+    def update(self, *args, **kwargs):
+        """Replaces values for every name in the given headers"""
+        store = self._store
+        for source in args:
+            if isinstance(source, Headers):
+                store.update(source._store)
+                continue
+            for k, v in (six.iteritems(source) if hasattr(source, 'keys') else source):
+                store[k.lower()] = (v,)
+        for k, v in six.iteritems(kwargs):
+            store[k.lower()] = (v,)
+
+    def copy(self):
+        ret = Headers()
+        ret._store = self._store.copy()
+        return ret
+
+    def canonical(self):
+        """Returns sorted list of (name, canonical value) pairs for signing
+
+        Values are trimmed, sequential whitespace collapsed and repeated values
+        comma-joined.
+        """
+        store = self._store
+        ret = []
+        for k in sorted(store):
+            values = store[k]
+            if len(values) == 1:
+                ret.append((k, ' '.join(('%s' % values[0]).split())))
+            else:
+                ret.append((k, ','.join([' '.join(('%s' % v).split()) for v in values])))
+        return ret
+
+    def names(self):
+        """Returns sorted list of header names"""
+        return sorted(self._store)
+
+    def __getitem__(self, name):
+        values = self._store[name.lower()]
+        return values[0] if len(values) == 1 else ', '.join(['%s' % v for v in values])
+
+    def __setitem__(self, name, value):
+        self._store[name.lower()] = (value,)
+
+    def __delitem__(self, name):
+        del self._store[name.lower()]
+
+    def __contains__(self, name):
+        return name.lower() in self._store
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __eq__(self, other):
+        if isinstance(other, Headers):
+            return self._store == other._store
+        if isinstance(other, dict):
+            return dict(self.items()) == dict((k.lower(), v) for k, v in six.iteritems(other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        ret = self.__eq__(other)
+        return ret if ret is NotImplemented else not ret
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self.iter_all()))
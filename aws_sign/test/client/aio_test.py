@@ -0,0 +1,216 @@
+import asyncio
+import io
+
+from urllib.parse import unquote
+
+from aws_sign.client import aio, concurrency, http
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.canonical import UNSIGNED_PAYLOAD
+from nose import tools
+from tornado import gen, testing, web
+
+
+class Credentials(object):
+    access_key = 'foo'
+    secret_key = 'bar'
+    token      = None
+
+
+class EchoHandler(web.RequestHandler):
+    """Verifies signature and echoes the request body"""
+    def initialize(self, auth, state):
+        self.auth  = auth
+        self.state = state
+
+    async def _handle(self):
+        self.state['connections'].add(id(self.request.connection.stream))
+        self.state['inflight'] += 1
+        self.state['peak'] = max(self.state['peak'], self.state['inflight'])
+        await gen.sleep(0.01)
+        self.state['inflight'] -= 1
+
+        amzdate = self.request.headers['x-amz-date']
+        expected = self.auth.header(amzdate, amzdate[:8], unquote(self.request.path), self.request.method,
+                                    self.request.query, payload=self.request.body,
+                                    content_sha256=self.request.headers.get('x-amz-content-sha256'))
+        if self.request.headers['Authorization'] != expected:
+            raise web.HTTPError(403)
+        if self.request.path == '/missing':
+            raise web.HTTPError(404)
+        self.finish(self.request.body or b'empty')
+
+    get  = _handle
+    post = _handle
+
+
+class BigHandler(web.RequestHandler):
+    """Writes 64 blocks of 1 KiB, chunked unless a length is requested"""
+    async def get(self):
+        if self.get_argument('length', None):
+            self.set_header('Content-Length', 64 * 1024)
+        for i in range(64):
+            self.write(bytes([i]) * 1024)
+            await self.flush()
+
+
+class TestAsyncioHTTP(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.constants = Sigv4ServiceConstants('http', 'localhost:%d' % self.get_http_port(), 'foo', 'us-east-1')
+        self.state = {'connections': set(), 'inflight': 0, 'peak': 0}
+        auth = Authorization(self.constants, Credentials())
+        return web.Application([(r'/big', BigHandler),
+                                (r'/.*', EchoHandler, {'auth': auth, 'state': self.state})])
+
+    def get_client(self, **kwargs):
+        attrs = {'auth': Authorization(self.constants, Credentials())}
+        return type('HTTPClient', (http.AuthMixin, aio.AsyncioHTTP), attrs)(self.constants, **kwargs)
+
+    @testing.gen_test
+    async def test_request(self):
+        client = self.get_client()
+
+        resp = await client.get('/foo bar', query_args={'a': 'b c'})
+        tools.assert_equal((resp.code, resp.body), (200, b'empty'))
+
+        resp = await client.post('/foo', 'payload')
+        tools.assert_equal(resp.body, b'payload')
+
+        # Streamed with a length
+        resp = await client.post('/foo', io.BytesIO(b'streamed payload'))
+        tools.assert_equal(resp.body, b'streamed payload')
+
+        # One-shot payloads need a precomputed hash and are sent with chunked transfer encoding
+        with tools.assert_raises(ValueError):
+            await client.post('/foo', iter([b'one-shot']))
+        resp = await client.post('/foo', iter([b'one-shot']), content_sha256=UNSIGNED_PAYLOAD)
+        tools.assert_equal(resp.body, b'one-shot')
+
+    @testing.gen_test
+    async def test_keep_alive(self):
+        client = self.get_client()
+
+        for _ in range(3):
+            resp = await client.get('/foo')
+            tools.assert_equal(resp.body, b'empty')
+        tools.assert_equal(len(self.state['connections']), 1)
+        tools.assert_equal(client.client.idle, 1)
+
+        client.close()
+        tools.assert_equal(client.client.idle, 0)
+
+    @testing.gen_test
+    async def test_max_connections(self):
+        client = self.get_client(max_connections=2)
+
+        resps = await asyncio.gather(*[client.post('/foo', str(i)) for i in range(6)])
+        tools.assert_equal([r.body for r in resps], [str(i).encode('ascii') for i in range(6)])
+        tools.assert_equal(self.state['peak'], 2)
+        tools.assert_equal(len(self.state['connections']), 2)
+
+    @testing.gen_test
+    async def test_error(self):
+        client = self.get_client()
+
+        with tools.assert_raises(aio.HTTPError) as ctx:
+            await client.get('/missing')
+        tools.assert_equal(ctx.exception.code, 404)
+        tools.assert_equal(ctx.exception.response.body, b'<html><title>404: Not Found</title>'
+                                                        b'<body>404: Not Found</body></html>')
+
+        # Connection is still reusable after an error response
+        resp = await client.get('/foo')
+        tools.assert_equal(resp.code, 200)
+        tools.assert_equal(len(self.state['connections']), 1)
+
+    @testing.gen_test
+    async def test_warm_up(self):
+        client = self.get_client(max_connections=3)
+
+        await client.warm_up(5)
+        tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 3, 'queued': 0})
+
+        await client.get('/foo')
+        tools.assert_equal(len(self.state['connections']), 1)
+        tools.assert_equal(client.pool_stats()['idle'], 3)
+        client.close()
+
+    @testing.gen_test
+    async def test_cancelled_waiter(self):
+        pool = aio.ConnectionPool('http', 'localhost', self.get_http_port(), max_connections=1)
+        conn = await pool.acquire()
+        woken, queued = asyncio.ensure_future(pool.acquire()), asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        tools.assert_equal(pool.stats()['queued'], 2)
+
+        # Waiter cancelled after being woken passes the connection on
+        pool.release(conn)
+        woken.cancel()
+        conn = await asyncio.wait_for(queued, 1)
+        tools.assert_equal(pool.stats(), {'active': 1, 'idle': 0, 'queued': 0})
+        pool.release(conn)
+        pool.close()
+
+    @testing.gen_test
+    async def test_truncated_chunked_body(self):
+        headers = aio.Headers({'transfer-encoding': 'chunked'})
+        for data in (b'5\r\nhello\r\n', b'5\r\nhello\r\nzz\r\n'):
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            chunks = aio._iter_body(reader, headers)
+
+            tools.assert_equal(await chunks.__anext__(), b'hello')
+            with tools.assert_raises(asyncio.IncompleteReadError):
+                await chunks.__anext__()
+
+    def test_per_client_pools(self):
+        tools.assert_is_not(self.get_client().client, self.get_client().client)
+        tools.assert_equal(self.get_client(max_connections=3).client.max_connections, 3)
+
+    def test_concurrency_connections(self):
+        client = self.get_client(concurrency=concurrency.AIMDLimiter(maximum=50))
+        tools.assert_equal(client.client.max_connections, 50)
+
+        with tools.assert_raises(ValueError):
+            self.get_client(concurrency=concurrency.AIMDLimiter(), max_connections=10)
+
+    @testing.gen_test
+    async def test_stream(self):
+        client = self.get_client()
+        expected = b''.join(bytes([i]) * 1024 for i in range(64))
+
+        for query_args in (None, {'length': '1'}):
+            body = await client.stream('/big', query_args=query_args)
+            tools.assert_equal(body.code, 200)
+            tools.assert_equal(client.pool_stats()['active'], 1)
+
+            chunks = [chunk async for chunk in body]
+            tools.assert_equal(b''.join(chunks), expected)
+            tools.assert_equal(body.received, len(expected))
+            tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 1, 'queued': 0})
+
+        with tools.assert_raises(aio.HTTPError) as ctx:
+            await client.stream('/missing')
+        tools.assert_equal(ctx.exception.code, 404)
+
+    @testing.gen_test
+    async def test_stream_close(self):
+        client = self.get_client()
+
+        body = await client.stream('/big')
+        chunk = await body.read()
+        tools.assert_true(chunk)
+        body.close()
+        tools.assert_equal(await body.read(), b'')
+        tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 0, 'queued': 0})
+
+    @testing.gen_test
+    async def test_download(self):
+        client = self.get_client()
+        target = io.BytesIO()
+
+        body = await client.download('/big', target)
+        tools.assert_equal(target.getvalue(), b''.join(bytes([i]) * 1024 for i in range(64)))
+        tools.assert_equal(body.received, 64 * 1024)
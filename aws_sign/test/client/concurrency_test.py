@@ -0,0 +1,156 @@
+import io
+import socket
+
+from aws_sign.client import http
+from aws_sign.client.concurrency import AIMDLimiter, overloaded
+from nose import tools
+from tornado import gen, testing, web
+from tornado.httpclient import HTTPRequest, HTTPResponse
+
+
+def http_error(code, body=b''):
+    response = HTTPResponse(HTTPRequest('http://localhost'), code, buffer=io.BytesIO(body))
+    return http.HTTPError(code, response=response)
+
+
+class TestAIMDLimiter(testing.AsyncTestCase):
+
+    def test_acquire(self):
+        limiter = AIMDLimiter(initial=2)
+
+        first, second, third, fourth = [limiter.acquire() for _ in range(4)]
+        tools.assert_true(first.done() and second.done())
+        tools.assert_false(third.done() or fourth.done())
+        tools.assert_equal((limiter.inflight, limiter.waiting), (2, 2))
+
+        # Waiters are served in order
+        limiter.release(0.1)
+        tools.assert_true(third.done())
+        tools.assert_false(fourth.done())
+
+    def test_cancelled_waiter(self):
+        limiter = AIMDLimiter(initial=1)
+
+        limiter.acquire()
+        cancelled, waiting = limiter.acquire(), limiter.acquire()
+        cancelled.cancel()
+
+        # Cancelled waiter is skipped without taking a slot
+        limiter.release(0.1)
+        tools.assert_true(waiting.done())
+        tools.assert_equal((limiter.inflight, limiter.waiting), (1, 0))
+        limiter.release(0.1)
+        tools.assert_equal(limiter.inflight, 0)
+
+    def test_additive_increase(self):
+        limiter = AIMDLimiter(initial=4, maximum=5)
+
+        # Limit grows by one per window of successful requests at the limit
+        for _ in range(4):
+            limiter.acquire()
+        for _ in range(4):
+            limiter.release(0.1)
+            limiter.acquire()
+        tools.assert_equal(limiter.limit, 4)
+        limiter.release(0.1)
+        tools.assert_equal(limiter.limit, 5)
+
+        # Capped at maximum
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(0.1)
+        tools.assert_equal(limiter.limit, 5)
+
+    def test_idle(self):
+        limiter = AIMDLimiter(initial=10)
+
+        # Unused capacity isn't grown
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.1)
+        tools.assert_equal(limiter.limit, 10)
+
+    def test_multiplicative_decrease(self):
+        limiter = AIMDLimiter(initial=10, minimum=2, backoff=0.5, latency=1.0)
+
+        limiter.acquire()
+        limiter.release(0.1, dropped=True)
+        tools.assert_equal(limiter.limit, 5)
+
+        # Slow responses count as pushback
+        limiter.acquire()
+        limiter.release(1.5)
+        tools.assert_equal(limiter.limit, 2)
+
+        limiter.acquire()
+        limiter.release(0.1, dropped=True)
+        tools.assert_equal(limiter.limit, 2)
+
+    def test_overloaded(self):
+        tools.assert_true(overloaded(http_error(429)))
+        tools.assert_true(overloaded(http_error(503)))
+        tools.assert_true(overloaded(http_error(599)))
+        tools.assert_true(overloaded(http_error(400, b'<Code>SlowDown</Code>')))
+        tools.assert_true(overloaded(socket.error()))
+
+        tools.assert_false(overloaded(http_error(404)))
+        tools.assert_false(overloaded(http_error(500)))
+        tools.assert_false(overloaded(ValueError()))
+
+
+class SlowHandler(web.RequestHandler):
+    def initialize(self, state):
+        self.state = state
+
+    @gen.coroutine
+    def get(self):
+        self.state['inflight'] += 1
+        self.state['peak'] = max(self.state['peak'], self.state['inflight'])
+        yield gen.sleep(0.01)
+        self.state['inflight'] -= 1
+        if self.request.path == '/throttled':
+            raise web.HTTPError(429)
+        self.finish('ok')
+
+
+class TestConcurrency(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.state = {'inflight': 0, 'peak': 0}
+        return web.Application([(r'/.*', SlowHandler, {'state': self.state})])
+
+    def get_client(self, limiter):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        return http.AsyncHTTP(consts, impl='simple', defaults={}, concurrency=limiter)
+
+    @testing.gen_test
+    def test_limited(self):
+        limiter = AIMDLimiter(initial=3, maximum=3)
+        client = self.get_client(limiter)
+
+        resps = yield [client.get('/') for _ in range(12)]
+        tools.assert_equal([r.body for r in resps], [b'ok'] * 12)
+        tools.assert_equal(self.state['peak'], 3)
+        tools.assert_equal(limiter.inflight, 0)
+
+    def test_max_connections(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+
+        client = http.AsyncHTTP(consts, impl='simple', concurrency=AIMDLimiter(maximum=50))
+        tools.assert_equal(client.client.max_clients, 50)
+        tools.assert_equal(http.AsyncHTTP(consts, impl='simple').client.max_clients,
+                           http.DEFAULT_MAX_CONNECTIONS)
+
+        # Connection cap below the limiter maximum would hide its limit
+        with tools.assert_raises(ValueError):
+            http.AsyncHTTP(consts, impl='simple', concurrency=AIMDLimiter(), max_connections=10)
+
+    @testing.gen_test
+    def test_throttled(self):
+        limiter = AIMDLimiter(initial=8, backoff=0.5)
+        client = self.get_client(limiter)
+
+        with tools.assert_raises(http.HTTPError):
+            yield client.get('/throttled')
+        tools.assert_equal(limiter.limit, 4)
+        tools.assert_equal(limiter.inflight, 0)
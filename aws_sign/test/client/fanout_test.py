@@ -0,0 +1,85 @@
+from aws_sign.client import http
+from nose import tools
+from tornado import gen, testing, web
+
+
+class DelayHandler(web.RequestHandler):
+    """Responds after `delay` milliseconds, failing for negative delays"""
+    def initialize(self, state):
+        self.state = state
+
+    @gen.coroutine
+    def get(self, delay):
+        delay = int(delay)
+        self.state['inflight'] += 1
+        self.state['peak'] = max(self.state['peak'], self.state['inflight'])
+        self.state['count'] += 1
+        yield gen.sleep(abs(delay) / 1000.0)
+        self.state['inflight'] -= 1
+        if delay < 0:
+            raise web.HTTPError(404)
+        self.finish(str(delay))
+
+
+class TestFetchMany(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.state = {'inflight': 0, 'peak': 0, 'count': 0}
+        return web.Application([(r'/(-?\d+)', DelayHandler, {'state': self.state})])
+
+    def get_client(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        return http.AsyncHTTP(consts, impl='simple', defaults={})
+
+    @testing.gen_test
+    def test_ordered(self):
+        client = self.get_client()
+        delays = [30, 10, 20, 0, 15, 5, 25, 10]
+
+        resps = yield client.fetch_many((('GET', '/%d' % d) for d in delays), concurrency=3)
+        tools.assert_equal([int(r.body) for r in resps], delays)
+        tools.assert_equal(self.state['peak'], 3)
+
+    @testing.gen_test
+    def test_unordered(self):
+        client = self.get_client()
+
+        it = client.fetch_many([{'method': 'GET', 'path': '/50'}, ('GET', '/0')], concurrency=2, ordered=False)
+        results = []
+        while not it.done():
+            index, resp = yield it.next()
+            results.append((index, int(resp.body)))
+        tools.assert_equal(results, [(1, 0), (0, 50)])
+
+    @testing.gen_test
+    def test_async_iterator(self):
+        client = self.get_client()
+
+        it = client.fetch_many([('GET', '/0')], ordered=False)
+        tools.assert_is(it.__aiter__(), it)
+        index, resp = yield it.__anext__()
+        tools.assert_equal(index, 0)
+        tools.assert_raises(StopAsyncIteration, it.__anext__)
+
+    @testing.gen_test
+    def test_errors(self):
+        client = self.get_client()
+
+        resps = yield client.fetch_many([('GET', '/0'), ('GET', '/-1'), ('GET', '/0')])
+        tools.assert_equal(resps[0].body, b'0')
+        tools.assert_is_instance(resps[1], http.HTTPError)
+        tools.assert_equal(resps[2].body, b'0')
+
+    @testing.gen_test
+    def test_fail_fast(self):
+        client = self.get_client()
+        requests = [('GET', '/-1')] + [('GET', '/10')] * 10
+
+        with tools.assert_raises(http.HTTPError):
+            yield client.fetch_many(requests, concurrency=2, fail_fast=True)
+
+        # Remaining requests aren't sent
+        tools.assert_equal(self.state['count'], 2)
+
+    def test_concurrency(self):
+        tools.assert_raises(ValueError, self.get_client().fetch_many, [], concurrency=0)
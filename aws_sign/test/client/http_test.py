@@ -1,65 +1,33 @@
+import io
+import os
+import tempfile
+
 from aws_sign import URLParseException
 from aws_sign.client import http
-from copy import deepcopy
+from aws_sign.headers import Headers
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.canonical import UNSIGNED_PAYLOAD
+from aws_sign.v4.clock import Clock
 from nose import tools
+from tornado import testing, web
+from tornado.httpclient import HTTPResponse
+from tornado.httputil import HTTPHeaders
+
 
-_merge = http._merge
-_normalize = http._normalize
+class Credentials(object):
+    access_key = 'foo'
+    secret_key = 'bar'
+    token      = None
 
 
 class TestHTTP(object):
     
-    def test_normalize(self):
-        a = {'Foo': 1, 'BAR': {'Foo-Bar': {'foo-baz': 4}}}
-        expected = {'foo': 1, 'bar': {'foo-bar': { 'foo-baz': 4}}} 
-        tools.assert_equal(_normalize(a), expected)
-
-
-    def test_merge(self):
-        a = {'foo': 1, 'bar': {'foobar': 'baz' }}
-        b = {'foo': 1, 'bar': {'foobar': 'foo' }, 'baz': 'foo'}
-        
-        expected = {'foo': 1, 'bar': {'foobar':'foo'}, 'baz':'foo'} 
-        tools.assert_equal(_merge(deepcopy(a), b), expected)
-
-        expected = {'foo': 1, 'bar': {'foobar':'baz'}, 'baz':'foo'}
-        tools.assert_equal(_merge(deepcopy(b), a), expected)
-
-        c = {'foo': 'bar'}
-        d = {'foo': 'bar'}
-        tools.assert_equal(_merge(deepcopy(c), d), c)
-        
-        e = {1: {2: {3: {4: {'foo': 'bar'}}}}, 5: 'baz'}
-        f = {0: 'foo', 1: {2: {3: {4: {'foo': 'foobar'}}}}}
-        
-        expected = {0: 'foo', 1: {2: {3: {4: {'foo': 'foobar'}}}}, 5: 'baz'}
-        tools.assert_equal(_merge(deepcopy(e), f), expected)
-
-        expected = {0: 'foo', 1: {2: {3: {4: {'foo': 'bar'}}}}, 5: 'baz'}
-        tools.assert_equal(_merge(deepcopy(f), e), expected)
-        
-             
     @tools.raises(http.UnknownCredentialsException)
     def test_raise_unknown_creds(self):
         http.get_instance('https://mock-service.us-west-2.amazonaws.com', sign=True)
 
 
-    def test_normalized_merged(self):
-        # Test for merging headers -- headers are case insensitive and can be 
-        # set in multiple places.  This allows for possible mismatched headers.
-        # Normalizing before merges assures that like headers get overridden
-        # appropriately
-        a = {'Foo': 'bar'}
-        b = {'foo': 'bar'}
-        ret  = _merge(_normalize(deepcopy(a)), _normalize(b))
-        tools.assert_equal(ret, b)
-
-        c = {'Foo': {'baR': 1, 'baz': { 'foo-bar': 2 }}}
-        d = {'foO': {'Bar': 1, 'baz': { 'Foo-baR': 22222 }}}
-        ret  = _merge(_normalize(deepcopy(c)), _normalize(d))
-        tools.assert_equal(ret, {'foo': {'bar': 1, 'baz': { 'foo-bar': 22222 }}})
-        
-
     def test_default_service_constants(self):
         endpoint = 'http://localhost:8888'
         const = http.DefaultServiceConstants.from_url(endpoint)
@@ -80,3 +48,167 @@ class TestHTTP(object):
     def test_bad_port(self):
         foo = http.DefaultServiceConstants.from_url('http://localhost:888P')
         
+
+
+    def test_request_template(self):
+        defaults = {'headers': {'Content-Type': 'text/plain', 'X-Foo': 'foo'}, 'connect_timeout': 5}
+        template = http.RequestTemplate('https://localhost', defaults)
+
+        # Defaults are compiled once and never mutated
+        kwargs = template.render('https://localhost/foo', 'GET', {'X-Amz-Date': 'bar'}, {'x-foo': 'baz'},
+                                 body=None)
+        tools.assert_equal(kwargs, {'url': 'https://localhost/foo',
+                                    'method': 'GET',
+                                    'body': None,
+                                    'connect_timeout': 5,
+                                    'headers': {'content-type': 'text/plain',
+                                                'x-amz-date': 'bar',
+                                                'x-foo': 'baz'}})
+        tools.assert_equal(template.headers, {'content-type': 'text/plain', 'x-foo': 'foo'})
+        tools.assert_equal(defaults['headers'], {'Content-Type': 'text/plain', 'X-Foo': 'foo'})
+
+        # Paths are encoded for the request line
+        tools.assert_equal(template.url('/foo bar/baz', 'a=b'), 'https://localhost/foo%20bar/baz?a=b')
+
+        tools.assert_equal(template.url('/foo', ''), 'https://localhost/foo')
+        tools.assert_equal(template.url('/foo', 'a=1'), 'https://localhost/foo?a=1')
+
+    def test_prepare_args(self):
+        defaults = {'headers': {'Content-Type': 'text/plain'}}
+        client = http.HTTP(None, http.DefaultServiceConstants.from_url('http://localhost:8888'), defaults)
+
+        kwargs = client.prepare_args('GET', 'foo', {'a': 1}, {'X-Foo': 'foo'})
+        tools.assert_equal(kwargs['url'], 'http://localhost:8888/foo?a=1')
+        tools.assert_equal(kwargs['headers'], {'content-type': 'text/plain', 'x-foo': 'foo'})
+        tools.assert_equal(defaults, {'headers': {'Content-Type': 'text/plain'}})
+
+    def test_http_request_headers(self):
+        headers = Headers({'Content-Type': 'text/plain'})
+        headers.add('X-Amz-Meta-Foo', 'a')
+        headers.add('X-Amz-Meta-Foo', 'b')
+
+        request = http._http_request({'url': 'http://localhost', 'method': 'GET', 'headers': headers})
+        tools.assert_equal(request.headers.get_list('x-amz-meta-foo'), ['a', 'b'])
+        tools.assert_equal(request.headers['content-type'], 'text/plain')
+
+    def test_signing_clock(self):
+        creds = type('Credentials', (object,), {'access_key': 'foo', 'secret_key': 'bar', 'token': None})()
+        clock = Clock(now=lambda: 1451606400.5)
+        consts = Sigv4ServiceConstants.from_url('https://mock-service.us-west-2.amazonaws.com')
+        attrs = {'auth': Authorization(consts, creds), 'clock': clock}
+        client = type('HTTPClient', (http.AuthMixin, http.HTTP), attrs)(None, consts)
+
+        headers = client.sign('/', 'GET')
+        tools.assert_equal(headers['x-amz-date'], '20160101T000000Z')
+        tools.assert_in('Credential=foo/20160101/us-west-2/mock-service/aws4_request', headers['Authorization'])
+
+        # One-shot payloads need a precomputed hash, with or without headers
+        with tools.assert_raises(ValueError):
+            client.sign('/', 'POST', payload=iter([b'foo']))
+        headers = client.sign('/', 'POST', {'x-amz-content-sha256': UNSIGNED_PAYLOAD}, payload=iter([b'foo']))
+        tools.assert_equal(headers['x-amz-date'], '20160101T000000Z')
+
+    def test_clock_per_client(self):
+        consts = Sigv4ServiceConstants.from_url('https://mock-service.us-west-2.amazonaws.com')
+        cls = type('HTTPClient', (http.AuthMixin, http.HTTP), {'auth': Authorization(consts, Credentials())})
+        first, second = cls(None, consts), cls(None, consts)
+
+        tools.assert_is_instance(first.clock, Clock)
+        tools.assert_is_not(first.clock, second.clock)
+
+        first.clock.offset = 3600
+        tools.assert_equal(second.clock.offset, 0)
+
+    def test_resign_skewed(self):
+        class Client(object):
+            def __init__(self):
+                self.requests = []
+
+            def fetch(self, request):
+                self.requests.append(request)
+                if len(self.requests) == 1:
+                    response = HTTPResponse(request, 403, HTTPHeaders({'Date': 'Fri, 01 Jan 2016 01:00:00 GMT'}),
+                                            io.BytesIO(b'<Code>RequestTimeTooSkewed</Code>'))
+                    raise http.HTTPError(403, response=response)
+                return 'ok'
+
+        creds = type('Credentials', (object,), {'access_key': 'foo', 'secret_key': 'bar', 'token': None})()
+        consts = Sigv4ServiceConstants.from_url('https://mock-service.us-west-2.amazonaws.com')
+        attrs = {'auth': Authorization(consts, creds), 'clock': Clock(now=lambda: 1451606400)}
+        client = type('HTTPClient', (http.AuthMixin, http.HTTP), attrs)(Client(), consts)
+
+        tools.assert_equal(client.get('/'), 'ok')
+        tools.assert_equal([r.headers['x-amz-date'] for r in client.client.requests],
+                           ['20160101T000000Z', '20160101T010000Z'])
+
+
+class EchoHandler(web.RequestHandler):
+    """Verifies signature against the received body and echoes it"""
+    def initialize(self, auth, requests):
+        self.auth     = auth
+        self.requests = requests
+
+    def post(self):
+        self.requests.append(self.request)
+        amzdate = self.request.headers['x-amz-date']
+        expected = self.auth.header(amzdate, amzdate[:8], self.request.path, 'POST', self.request.query,
+                                    payload=self.request.body,
+                                    content_sha256=self.request.headers.get('x-amz-content-sha256'))
+        if self.request.headers['Authorization'] != expected:
+            raise web.HTTPError(403)
+        self.finish(self.request.body)
+
+
+class TestStreamedPayload(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.constants = Sigv4ServiceConstants('http', 'localhost:%d' % self.get_http_port(), 'foo', 'us-east-1')
+        self.requests  = []
+        auth = Authorization(self.constants, Credentials())
+        return web.Application([(r'/.*', EchoHandler, {'auth': auth, 'requests': self.requests})])
+
+    def get_client(self):
+        attrs = {'auth': Authorization(self.constants, Credentials())}
+        return type('HTTPClient', (http.AuthMixin, http.AsyncHTTP), attrs)(self.constants, impl='simple')
+
+    @testing.gen_test
+    def test_file(self):
+        client = self.get_client()
+        payload = b'foo-bar' * 20000
+
+        with tempfile.TemporaryFile() as f:
+            f.write(payload)
+            f.seek(0)
+            resp = yield client.post('/x', f)
+        tools.assert_equal(resp.body, payload)
+
+        resp = yield client.post('/x', io.BytesIO(payload))
+        tools.assert_equal(resp.body, payload)
+
+        # Sent with a length rather than chunked transfer encoding
+        for request in self.requests:
+            tools.assert_equal(request.headers['Content-Length'], str(len(payload)))
+            tools.assert_not_in('Transfer-Encoding', request.headers)
+
+    @testing.gen_test
+    def test_one_shot(self):
+        client = self.get_client()
+
+        def chunks():
+            yield b'foo'
+            yield b'bar'
+
+        # Hashing would consume the payload before it is sent
+        with tools.assert_raises(ValueError):
+            yield client.post('/x', chunks())
+        tools.assert_equal(self.requests, [])
+
+        resp = yield client.post('/x', chunks(), content_sha256=UNSIGNED_PAYLOAD)
+        tools.assert_equal(resp.body, b'foobar')
+
+        r, w = os.pipe()
+        os.write(w, b'piped')
+        os.close(w)
+        with os.fdopen(r, 'rb') as pipe:
+            resp = yield client.post('/x', pipe, content_sha256=UNSIGNED_PAYLOAD)
+        tools.assert_equal(resp.body, b'piped')
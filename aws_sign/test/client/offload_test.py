@@ -0,0 +1,84 @@
+import io
+import os
+import tempfile
+import threading
+
+from aws_sign.client import http, offload
+from aws_sign.client.offload import StallStats
+from nose import tools
+from tornado import testing, web
+
+
+class TestOffload(object):
+
+    def test_payload_size(self):
+        tools.assert_equal(offload.payload_size(None), 0)
+        tools.assert_equal(offload.payload_size('foo'), 3)
+        tools.assert_equal(offload.payload_size(u'f\u00f6\u00f6'), 5)
+        tools.assert_equal(offload.payload_size(b'foo'), 3)
+        tools.assert_equal(offload.payload_size(bytearray(10)), 10)
+        tools.assert_is_none(offload.payload_size(iter([b'foo'])))
+        tools.assert_equal(offload.payload_size(io.BytesIO(b'foo')), 3)
+
+        r, w = os.pipe()
+        os.close(w)
+        with os.fdopen(r, 'rb') as pipe:
+            tools.assert_is_none(offload.payload_size(pipe))
+
+        with tempfile.TemporaryFile() as f:
+            f.write(b'0123456789')
+            f.seek(4)
+            tools.assert_equal(offload.payload_size(f), 6)
+
+    def test_should_offload(self):
+        tools.assert_false(offload.should_offload(b'x' * 100, None))
+        tools.assert_false(offload.should_offload(b'x' * 99, 100))
+        tools.assert_true(offload.should_offload(b'x' * 100, 100))
+        tools.assert_true(offload.should_offload(iter([b'x']), 100))
+
+    def test_stall_stats(self):
+        stats = StallStats()
+        stats.record(0.5)
+        stats.record(0.25)
+        with stats.timer():
+            pass
+
+        tools.assert_equal(stats.count, 3)
+        tools.assert_true(0.75 <= stats.total < 0.8)
+        tools.assert_equal(stats.max, 0.5)
+
+
+class EchoHandler(web.RequestHandler):
+    def post(self):
+        self.finish(self.request.body)
+
+
+class TestOffloadedSigning(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        return web.Application([(r'/.*', EchoHandler)])
+
+    def get_client(self):
+        threads = self.threads = []
+
+        class Client(http.AsyncHTTP):
+            def sign(self, *args):
+                threads.append(threading.current_thread())
+                return super(Client, self).sign(*args)
+
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        return Client(consts, impl='simple', defaults={}, offload_threshold=1000)
+
+    @testing.gen_test
+    def test_offload(self):
+        client = self.get_client()
+
+        resp = yield client.post('/', b'x' * 10)
+        tools.assert_equal(resp.body, b'x' * 10)
+        tools.assert_is(self.threads[-1], threading.current_thread())
+        tools.assert_equal(client.stalls.count, 1)
+
+        resp = yield client.post('/', b'x' * 1000)
+        tools.assert_equal(resp.body, b'x' * 1000)
+        tools.assert_is_not(self.threads[-1], threading.current_thread())
+        tools.assert_equal(client.stalls.count, 1)
@@ -0,0 +1,74 @@
+from aws_sign.client import http
+from nose import tools
+from tornado import gen, testing, web
+from tornado.httpclient import AsyncHTTPClient
+
+
+class SlowHandler(web.RequestHandler):
+    def initialize(self, methods):
+        self.methods = methods
+
+    @gen.coroutine
+    def get(self):
+        self.methods.append('GET')
+        yield gen.sleep(0.02)
+        self.finish('ok')
+
+    def head(self):
+        self.methods.append('HEAD')
+
+
+class TestPool(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.methods = []
+        return web.Application([(r'/.*', SlowHandler, {'methods': self.methods})])
+
+    def get_client(self, **kwargs):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        return http.AsyncHTTP(consts, impl='simple', defaults={}, **kwargs)
+
+    @testing.gen_test
+    def test_max_connections(self):
+        client = self.get_client(max_connections=2)
+
+        futures = [client.get('/') for _ in range(5)]
+        yield gen.moment
+        tools.assert_equal(client.pool_stats(), {'active': 2, 'idle': 0, 'queued': 3})
+
+        yield futures
+        tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 0, 'queued': 0})
+
+    @testing.gen_test
+    def test_warm_up(self):
+        client = self.get_client()
+
+        yield client.warm_up(3)
+        tools.assert_equal(self.methods, ['HEAD'] * 3)
+
+    def test_per_client_instance(self):
+        configured = AsyncHTTPClient.configured_class()
+        first, second = self.get_client(max_connections=3), self.get_client(max_connections=5)
+
+        tools.assert_is_not(first.client, second.client)
+        tools.assert_equal((first.client.max_clients, second.client.max_clients), (3, 5))
+        tools.assert_is(AsyncHTTPClient.configured_class(), configured)
+
+        first.close()
+        second.close()
+
+    def test_sync(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        client = http.SyncHTTP(consts, impl='simple', max_connections=4)
+
+        tools.assert_equal(client.client._async_client.max_clients, 4)
+        tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 0, 'queued': 0})
+        client.close()
+
+    def test_idle_timeout_defaults(self):
+        tools.assert_equal(http._pool_defaults('simple', {'a': 1}, 30), {'a': 1})
+        tools.assert_equal(http._pool_defaults('curl', {'a': 1}, None), {'a': 1})
+
+        defaults = http._pool_defaults('curl', {'a': 1}, 30)
+        tools.assert_equal(defaults['a'], 1)
+        tools.assert_true(callable(defaults['prepare_curl_callback']))
@@ -0,0 +1,77 @@
+import time
+
+from aws_sign.client import http, ratelimit
+from aws_sign.client.ratelimit import TokenBucket
+from nose import tools
+from tornado import testing, web
+
+
+class FakeTime(object):
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(object):
+
+    def test_reserve(self):
+        now = FakeTime()
+        bucket = TokenBucket(10, burst=2, now=now)
+
+        # Burst is available immediately
+        tools.assert_equal(bucket.reserve(), 0)
+        tools.assert_equal(bucket.reserve(), 0)
+
+        # Later callers queue behind earlier reservations
+        tools.assert_almost_equal(bucket.reserve(), 0.1)
+        tools.assert_almost_equal(bucket.reserve(), 0.2)
+        tools.assert_almost_equal(bucket.reserve(), 0.3)
+
+        now.now = 0.3
+        tools.assert_almost_equal(bucket.reserve(), 0.1)
+
+        # Refill is capped at burst
+        now.now = 10
+        tools.assert_equal(bucket.reserve(), 0)
+        tools.assert_equal(bucket.reserve(), 0)
+        tools.assert_almost_equal(bucket.reserve(), 0.1)
+
+    def test_defaults(self):
+        tools.assert_equal(TokenBucket(5).burst, 5)
+        tools.assert_equal(TokenBucket(0.5).burst, 1)
+        tools.assert_raises(ValueError, TokenBucket, 0)
+
+    def test_get_limiter(self):
+        limiter = ratelimit.get_limiter('ratelimit-test.example.com', 10)
+        tools.assert_is(ratelimit.get_limiter('ratelimit-test.example.com', 10), limiter)
+        tools.assert_is_not(ratelimit.get_limiter('ratelimit-other.example.com', 10), limiter)
+        tools.assert_is(ratelimit.get_limiter('ratelimit-test.example.com', 10, 10), limiter)
+
+        # Conflicting settings for the same host
+        tools.assert_raises(ValueError, ratelimit.get_limiter, 'ratelimit-test.example.com', 1000, 2000)
+        tools.assert_raises(ValueError, ratelimit.get_limiter, 'ratelimit-test.example.com', 10, 20)
+
+
+class OkHandler(web.RequestHandler):
+    def get(self):
+        self.finish('ok')
+
+
+class TestRateLimit(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        return web.Application([(r'/.*', OkHandler)])
+
+    @testing.gen_test
+    def test_paced(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        client = http.AsyncHTTP(consts, impl='simple', defaults={}, limiter=TokenBucket(20, burst=1))
+
+        start = time.time()
+        resps = yield [client.get('/') for _ in range(5)]
+        tools.assert_equal([r.body for r in resps], [b'ok'] * 5)
+
+        # One request immediately, then one every 50ms
+        tools.assert_true(time.time() - start >= 0.19)
@@ -0,0 +1,131 @@
+import io
+import itertools
+import socket
+
+from aws_sign.client import http
+from aws_sign.client.retry import RetryBudget, RetryPolicy, RETRY_COST, TIMEOUT_COST
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.clock import Clock
+from nose import tools
+from tornado import testing, web
+from tornado.httpclient import HTTPRequest, HTTPResponse
+
+
+class Credentials(object):
+    access_key = 'foo'
+    secret_key = 'bar'
+    token      = None
+
+
+def http_error(code, body=b''):
+    response = HTTPResponse(HTTPRequest('http://localhost'), code, buffer=io.BytesIO(body))
+    return http.HTTPError(code, response=response)
+
+
+class TestRetryPolicy(object):
+
+    def test_cost(self):
+        policy = RetryPolicy()
+
+        tools.assert_equal(policy.cost(http_error(503)), RETRY_COST)
+        tools.assert_equal(policy.cost(http_error(429)), RETRY_COST)
+        tools.assert_equal(policy.cost(http_error(400, b'{"__type": "ThrottlingException"}')), RETRY_COST)
+        tools.assert_equal(policy.cost(http_error(599)), TIMEOUT_COST)
+        tools.assert_equal(policy.cost(socket.error()), TIMEOUT_COST)
+
+        tools.assert_is_none(policy.cost(http_error(400, b'{"__type": "ValidationException"}')))
+        tools.assert_is_none(policy.cost(http_error(404)))
+        tools.assert_is_none(policy.cost(ValueError()))
+
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5, random=lambda: 0.5)
+
+        tools.assert_equal([policy.backoff(i) for i in range(5)], [0.5, 1, 2, 2.5, 2.5])
+
+        policy = RetryPolicy(random=lambda: 0)
+        tools.assert_equal(policy.backoff(10), 0)
+
+    def test_delay(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=1, random=lambda: 1)
+
+        tools.assert_equal(policy.delay(http_error(503), 0), 1)
+        tools.assert_equal(policy.delay(http_error(503), 1), 2)
+        tools.assert_is_none(policy.delay(http_error(503), 2))
+        tools.assert_is_none(policy.delay(http_error(403), 0))
+
+    def test_budget(self):
+        budget = RetryBudget(capacity=2 * RETRY_COST)
+        policy = RetryPolicy(max_attempts=10, budget=budget)
+
+        tools.assert_is_not_none(policy.delay(http_error(500), 0))
+        tools.assert_is_not_none(policy.delay(http_error(500), 0))
+
+        # Exhausted budget stops retries
+        tools.assert_is_none(policy.delay(http_error(500), 0))
+        tools.assert_equal(budget.tokens, 0)
+
+        # Successes refill it
+        policy.succeeded(1)
+        tools.assert_equal(budget.tokens, RETRY_COST)
+        policy.succeeded(0)
+        tools.assert_equal(budget.tokens, RETRY_COST + 1)
+        for _ in range(100):
+            policy.succeeded(1)
+        tools.assert_equal(budget.tokens, budget.capacity)
+
+
+class FlakyHandler(web.RequestHandler):
+    """Fails the first `failures` requests with 503"""
+    def initialize(self, requests, failures):
+        self.requests = requests
+        self.failures = failures
+
+    def get(self):
+        self.requests.append(self.request.headers['x-amz-date'])
+        if len(self.requests) <= self.failures:
+            raise web.HTTPError(503)
+        self.finish('ok')
+
+
+class TestRetry(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.requests = []
+        return web.Application([(r'/flaky', FlakyHandler, {'requests': self.requests, 'failures': 2}),
+                                (r'/broken', FlakyHandler, {'requests': self.requests, 'failures': 100})])
+
+    def get_client(self, retry):
+        consts = Sigv4ServiceConstants('http', 'localhost:%d' % self.get_http_port(), 'foo', 'us-east-1')
+        # Clock advances a second per signature
+        seconds = itertools.count(1451606400)
+        attrs = {'auth': Authorization(consts, Credentials()), 'clock': Clock(now=lambda: next(seconds))}
+        return type('HTTPClient', (http.AuthMixin, http.AsyncHTTP), attrs)(consts, impl='simple', defaults={},
+                                                                          retry=retry)
+
+    @testing.gen_test
+    def test_retry(self):
+        client = self.get_client(RetryPolicy(random=lambda: 0))
+
+        resp = yield client.get('/flaky')
+        tools.assert_equal(resp.body, b'ok')
+
+        # Every attempt is signed again
+        tools.assert_equal(self.requests, ['20160101T000000Z', '20160101T000001Z', '20160101T000002Z'])
+
+    @testing.gen_test
+    def test_max_attempts(self):
+        client = self.get_client(RetryPolicy(max_attempts=4, random=lambda: 0))
+
+        with tools.assert_raises(http.HTTPError) as ctx:
+            yield client.get('/broken')
+        tools.assert_equal(ctx.exception.code, 503)
+        tools.assert_equal(len(self.requests), 4)
+
+    @testing.gen_test
+    def test_no_retry(self):
+        client = self.get_client(None)
+
+        with tools.assert_raises(http.HTTPError):
+            yield client.get('/flaky')
+        tools.assert_equal(len(self.requests), 1)
@@ -0,0 +1,102 @@
+import re
+import time
+
+from aws_sign.client import http
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.canonical import UNSIGNED_PAYLOAD
+from aws_sign.v4.clock import Clock
+from nose import tools
+from tornado import httputil, testing, web
+
+# Server clock runs an hour ahead of the client
+SKEW = 3600
+
+# Maximum timestamp difference accepted by the server
+TOLERANCE = 300
+
+
+class Credentials(object):
+    access_key = 'foo'
+    secret_key = 'bar'
+    token      = None
+
+
+class SkewedHandler(web.RequestHandler):
+    """Stand-in for AWS rejecting requests with skewed timestamps"""
+    SIGNATURE = re.compile(r'Signature=(\w+)$')
+
+    def initialize(self, requests, error):
+        self.requests = requests
+        self.error    = error
+
+    def _fail(self, error):
+        self.set_status(403)
+        self.finish('<Error><Code>%s</Code></Error>' % error)
+
+    def _handle(self):
+        now = time.time() + SKEW
+        self.set_header('Date', httputil.format_timestamp(now))
+        self.requests.append(self.request.headers['x-amz-date'])
+
+        if self.request.path == '/invalid' or not self.SIGNATURE.search(self.request.headers['Authorization']):
+            return self._fail('SignatureDoesNotMatch')
+        amzdate = time.mktime(time.strptime(self.request.headers['x-amz-date'], '%Y%m%dT%H%M%SZ'))
+        if abs(amzdate - time.mktime(time.gmtime(now))) > TOLERANCE:
+            return self._fail(self.error)
+        self.finish('ok')
+
+    get  = _handle
+    post = _handle
+
+
+class TestClockSkew(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.requests = []
+        self.error    = 'RequestTimeTooSkewed'
+        return web.Application([(r'/.*', SkewedHandler, {'requests': self.requests, 'error': self.error})])
+
+    def get_client(self, clock):
+        consts = Sigv4ServiceConstants('http', 'localhost:%d' % self.get_http_port(), 'foo', 'us-east-1')
+        attrs = {'auth': Authorization(consts, Credentials()), 'clock': clock}
+        return type('HTTPClient', (http.AuthMixin, http.AsyncHTTP), attrs)(consts, impl='simple', defaults={})
+
+    @testing.gen_test
+    def test_resign(self):
+        clock = Clock()
+        client = self.get_client(clock)
+
+        resp = yield client.post('/foo', 'payload')
+        tools.assert_equal(resp.body, b'ok')
+        tools.assert_equal(len(self.requests), 2)
+        tools.assert_true(abs(clock.offset - SKEW) <= 2)
+
+        # Corrected clock is used from then on
+        resp = yield client.get('/foo')
+        tools.assert_equal(resp.body, b'ok')
+        tools.assert_equal(len(self.requests), 3)
+
+    @testing.gen_test
+    def test_resign_once(self):
+        clock = Clock()
+        client = self.get_client(clock)
+
+        with tools.assert_raises(http.HTTPError) as ctx:
+            yield client.get('/invalid')
+        tools.assert_equal(ctx.exception.code, 403)
+        tools.assert_equal(len(self.requests), 2)
+
+        # Genuine signature mismatches aren't re-sent once the clock is correct
+        with tools.assert_raises(http.HTTPError):
+            yield client.get('/invalid')
+        tools.assert_equal(len(self.requests), 3)
+
+    @testing.gen_test
+    def test_streamed_payload(self):
+        # Consumed payloads can't be sent again
+        client = self.get_client(Clock())
+
+        with tools.assert_raises(http.HTTPError):
+            yield client.post('/foo', iter([b'payload']), content_sha256=UNSIGNED_PAYLOAD)
+        tools.assert_equal(len(self.requests), 1)
@@ -0,0 +1,213 @@
+import io
+import os
+import tempfile
+
+from aws_sign.client import http, stream, threaded
+from nose import tools
+from tornado import gen, testing, web
+from tornado.httpclient import HTTPError
+from tornado.httpserver import HTTPServer
+
+BODY = b''.join(bytes(bytearray([i])) * 1024 for i in range(64))
+
+
+class BigHandler(web.RequestHandler):
+    @gen.coroutine
+    def get(self):
+        if self.request.path == '/missing':
+            self.set_status(404)
+            self.finish(b'NoSuchKey')
+            return
+        if self.request.path == '/huge':
+            for _ in range(64):
+                self.write(BODY)
+                yield self.flush()
+            return
+        for i in range(64):
+            self.write(BODY[i * 1024:(i + 1) * 1024])
+            yield self.flush()
+
+
+def get_app():
+    return web.Application([(r'/.*', BigHandler)])
+
+
+class TestBodyStream(testing.AsyncTestCase):
+
+    def test_header_callback(self):
+        body = stream.BodyStream()
+        for line in ('HTTP/1.1 302 Found\r\n', 'Location: /foo\r\n', '\r\n',
+                     'HTTP/1.1 200 OK\r\n', 'Content-Length: 3\r\n', '\r\n'):
+            body.header_callback(line)
+
+        tools.assert_equal((body.code, body.reason), (200, 'OK'))
+        tools.assert_equal(list(body.headers.get_all()), [('Content-Length', '3')])
+        tools.assert_is(body.ready.result(), body)
+
+    def test_error_body(self):
+        body = stream.BodyStream()
+        body.header_callback('HTTP/1.1 403 Forbidden\r\n')
+        body.header_callback('\r\n')
+        body.streaming_callback(b'RequestTimeTooSkewed')
+
+        tools.assert_false(body.ready.done())
+        tools.assert_equal(body.received, 0)
+
+
+class TestStream(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        return get_app()
+
+    def get_client(self, **kwargs):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        return http.AsyncHTTP(consts, impl='simple', defaults={}, **kwargs)
+
+    @testing.gen_test
+    def test_read(self):
+        client = self.get_client()
+
+        body = yield client.stream('/big')
+        tools.assert_equal(body.code, 200)
+        chunks = []
+        while True:
+            chunk = yield body.read()
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        tools.assert_equal(b''.join(chunks), BODY)
+        tools.assert_equal((body.received, body.buffered), (len(BODY), 0))
+
+    @testing.gen_test
+    async def test_async_for(self):
+        client = self.get_client()
+
+        body = await client.stream('/big')
+        tools.assert_equal(b''.join([chunk async for chunk in body]), BODY)
+
+    @testing.gen_test
+    def test_buffer_exceeded(self):
+        client = self.get_client()
+
+        body = yield client.stream('/big', max_buffer=4096)
+        with tools.assert_raises(stream.StreamBufferExceeded):
+            yield body.join()
+        with tools.assert_raises(stream.StreamBufferExceeded):
+            yield body.read()
+        tools.assert_equal(body.buffered, 0)
+
+    @testing.gen_test
+    def test_close(self):
+        client = self.get_client()
+
+        body = yield client.stream('/huge')
+        yield body.read()
+        body.close()
+
+        # Next chunk aborts the transfer instead of draining the body
+        with tools.assert_raises(HTTPError) as ctx:
+            yield body.join()
+        tools.assert_equal(ctx.exception.code, 599)
+        tools.assert_equal(client.client.active, {})
+
+    def test_close_drain(self):
+        body = stream.BodyStream(abort=False)
+        body.header_callback('HTTP/1.1 200 OK\r\n')
+        body.header_callback('\r\n')
+        body.close()
+        body.streaming_callback(b'ignored')
+        tools.assert_equal((body.received, body.buffered), (0, 0))
+
+        body = stream.BodyStream()
+        body.header_callback('HTTP/1.1 200 OK\r\n')
+        body.header_callback('\r\n')
+        body.close()
+        with tools.assert_raises(stream.StreamClosed):
+            body.streaming_callback(b'aborted')
+
+    @testing.gen_test
+    def test_request_timeout(self):
+        for defaults, expected in (({}, 0), ({'request_timeout': 60}, 60)):
+            consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+            client = http.AsyncHTTP(consts, impl='simple', defaults=defaults)
+            requests = []
+
+            def fetch(kwargs):
+                requests.append(kwargs)
+                return client._fetch(kwargs)
+
+            body = yield client._stream(fetch, 'GET', '/big', None, None, stream.DEFAULT_MAX_BUFFER)
+            yield body.join()
+            tools.assert_equal(requests[0]['request_timeout'], expected)
+
+    @testing.gen_test
+    def test_error(self):
+        client = self.get_client()
+
+        with tools.assert_raises(HTTPError) as ctx:
+            yield client.stream('/missing')
+        tools.assert_equal(ctx.exception.code, 404)
+        tools.assert_equal(ctx.exception.response.body, b'NoSuchKey')
+
+    @testing.gen_test
+    def test_download(self):
+        client = self.get_client()
+        target = io.BytesIO()
+
+        body = yield client.download('/big', target)
+        tools.assert_equal(target.getvalue(), BODY)
+        tools.assert_equal(body.received, len(BODY))
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            yield client.download('/big', path)
+            with open(path, 'rb') as f:
+                tools.assert_equal(f.read(), BODY)
+        finally:
+            os.remove(path)
+
+
+class TestBlockingStream(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = threaded.BackgroundLoop('test-server')
+        sock, port = testing.bind_unused_port()
+
+        def listen():
+            server = HTTPServer(get_app())
+            server.add_sockets([sock])
+            return server
+
+        cls.http_server = cls.server.call(listen)
+        cls.url = 'http://127.0.0.1:%d' % port
+
+    @classmethod
+    def teardown_class(cls):
+        cls.server.call(cls.http_server.stop)
+        cls.server.stop()
+
+    def test_sync(self):
+        client = http.SyncHTTP(http.DefaultServiceConstants.from_url(self.url), impl='simple', defaults={})
+
+        tools.assert_equal(b''.join(client.stream('/big')), BODY)
+
+        target = io.BytesIO()
+        tools.assert_equal(client.download('/big', target).received, len(BODY))
+        tools.assert_equal(target.getvalue(), BODY)
+
+        with tools.assert_raises(HTTPError):
+            next(client.stream('/missing'))
+        client.close()
+
+    def test_threaded(self):
+        client = threaded.get_instance(self.url, impl='simple')
+
+        tools.assert_equal(b''.join(client.stream('/big')), BODY)
+
+        target = io.BytesIO()
+        client.download('/big', target)
+        tools.assert_equal(target.getvalue(), BODY)
+        client.close()
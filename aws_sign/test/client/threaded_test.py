@@ -0,0 +1,98 @@
+import threading
+
+from aws_sign.client import threaded
+from nose import tools
+from tornado import gen, web
+from tornado.httpclient import HTTPError
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+
+
+class SlowHandler(web.RequestHandler):
+    def initialize(self, stats):
+        self.stats = stats
+
+    @gen.coroutine
+    def get(self):
+        self.stats['active'] += 1
+        self.stats['peak'] = max(self.stats['peak'], self.stats['active'])
+        yield gen.sleep(0.05)
+        self.stats['active'] -= 1
+        self.finish(self.request.path)
+
+    def post(self):
+        self.finish(self.request.body)
+
+
+class TestThreadedHTTP(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.stats  = {'active': 0, 'peak': 0}
+        cls.server = threaded.BackgroundLoop('test-server')
+        sock, port = bind_unused_port()
+
+        def listen():
+            app = web.Application([(r'/ok/.*', SlowHandler, {'stats': cls.stats})])
+            server = HTTPServer(app)
+            server.add_sockets([sock])
+            return server
+
+        cls.http_server = cls.server.call(listen)
+        cls.url = 'http://127.0.0.1:%d' % port
+
+    @classmethod
+    def teardown_class(cls):
+        cls.server.call(cls.http_server.stop)
+        cls.server.stop()
+
+    def get_client(self, **kwargs):
+        return threaded.get_instance(self.url, impl='simple', **kwargs)
+
+    def test_concurrent_threads(self):
+        self.stats['peak'] = 0
+        client = self.get_client(max_connections=3)
+        results = {}
+
+        def worker(i):
+            results[i] = client.get('/ok/%d' % i).body
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        tools.assert_equal(results, dict((i, ('/ok/%d' % i).encode()) for i in range(8)))
+        tools.assert_equal(self.stats['peak'], 3)
+        tools.assert_equal(client.pool_stats(), {'active': 0, 'idle': 0, 'queued': 0})
+        client.close()
+
+    def test_shared_loop(self):
+        first, second = self.get_client(), self.get_client()
+
+        tools.assert_is(first.loop, threaded.get_loop())
+        tools.assert_is(first.loop, second.loop)
+        tools.assert_is_not(first.client, second.client)
+        tools.assert_equal(first.post('/ok/', b'foo').body, b'foo')
+
+        first.close()
+        second.close()
+
+    def test_errors(self):
+        client = self.get_client()
+
+        with tools.assert_raises(HTTPError) as ctx:
+            client.get('/missing')
+        tools.assert_equal(ctx.exception.code, 404)
+
+        with tools.assert_raises(RuntimeError):
+            client.loop.call(client.loop.call, client.pool_stats)
+        client.close()
+
+    def test_fetch_many(self):
+        client = self.get_client(max_connections=4)
+
+        resps = client.fetch_many([('GET', '/ok/%d' % i) for i in range(6)])
+        tools.assert_equal([r.body for r in resps], [('/ok/%d' % i).encode() for i in range(6)])
+        client.close()
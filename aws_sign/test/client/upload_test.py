@@ -0,0 +1,87 @@
+import hashlib
+import hmac
+import io
+import re
+
+from aws_sign.client import http
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4.auth import Authorization
+from aws_sign.v4.chunked import CHUNK_ALGORITHM, EMPTY_HASH
+from nose import tools
+from tornado import testing, web
+
+ACCESS_KEY = 'foo'
+SECRET_KEY = 'bar'
+PAYLOAD    = b'0123456789' * 2000
+
+
+class Credentials(object):
+    access_key = ACCESS_KEY
+    secret_key = SECRET_KEY
+    token      = None
+
+
+class ChunkedHandler(web.RequestHandler):
+    """Stand-in for S3 verifying aws-chunked uploads"""
+    SIGNATURE = re.compile(r'Credential=[^/]+/([^,]+), .*Signature=(\w+)$')
+
+    def initialize(self, auth):
+        self.auth = auth
+
+    def put(self):
+        headers = self.request.headers
+        amzdate = headers['x-amz-date']
+        scope, previous = self.SIGNATURE.search(headers['Authorization']).groups()
+        key = self.auth.signature_key(scope.split('/')[0])
+
+        body, decoded = self.request.body, b''
+        while True:
+            line, body = body.split(b'\r\n', 1)
+            size, signature = line.decode('ascii').split(';chunk-signature=')
+            size = int(size, 16)
+            chunk, body = body[:size], body[size + 2:]
+
+            string_to_sign = '\n'.join((CHUNK_ALGORITHM, amzdate, scope, previous, EMPTY_HASH,
+                                        hashlib.sha256(chunk).hexdigest()))
+            expected = hmac.new(key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+            if signature != expected:
+                raise web.HTTPError(403)
+
+            previous = signature
+            decoded += chunk
+            if not size:
+                break
+
+        if len(decoded) != int(headers['x-amz-decoded-content-length']):
+            raise web.HTTPError(400)
+        self.write(hashlib.sha256(decoded).hexdigest())
+
+
+class TestUpload(testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.constants = Sigv4ServiceConstants('http', 'localhost', 's3', 'us-east-1')
+        self.auth = Authorization(self.constants, Credentials())
+        return web.Application([(r'/.*', ChunkedHandler, {'auth': self.auth})])
+
+    def get_client(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        cls = type('HTTPClient', (http.AuthMixin, http.AsyncHTTP), {'auth': self.auth})
+        return cls(consts, impl='simple', defaults={})
+
+    @testing.gen_test
+    def test_upload(self):
+        client = self.get_client()
+
+        resp = yield client.upload('/bucket/key', io.BytesIO(PAYLOAD), len(PAYLOAD), chunk_size=8192)
+        tools.assert_equal(resp.body.decode('ascii'), hashlib.sha256(PAYLOAD).hexdigest())
+
+        chunks = (PAYLOAD[i:i + 1000] for i in range(0, len(PAYLOAD), 1000))
+        resp = yield client.upload('/bucket/key', chunks, len(PAYLOAD), chunk_size=8192)
+        tools.assert_equal(resp.body.decode('ascii'), hashlib.sha256(PAYLOAD).hexdigest())
+
+    def test_unsigned_upload(self):
+        consts = http.DefaultServiceConstants.from_url(self.get_url(''))
+        client = http.AsyncHTTP(consts, impl='simple', defaults={})
+        tools.assert_raises(http.UnknownCredentialsException, client.prepare_upload_args,
+                            'PUT', '/bucket/key', PAYLOAD, len(PAYLOAD))
@@ -0,0 +1,57 @@
+from aws_sign.headers import Headers
+from nose import tools
+
+
+class TestHeaders(object):
+
+    def test_case_insensitive(self):
+        h = Headers({'Content-Type': 'text/plain'})
+        tools.assert_equal(h['content-type'], 'text/plain')
+        tools.assert_equal(h['CONTENT-TYPE'], 'text/plain')
+        tools.assert_true('Content-type' in h)
+
+        h['CONTENT-TYPE'] = 'application/json'
+        tools.assert_equal(list(h), ['content-type'])
+        tools.assert_equal(h['content-type'], 'application/json')
+
+        del h['Content-Type']
+        tools.assert_equal(len(h), 0)
+
+    def test_multi_value(self):
+        h = Headers()
+        h.add('X-Amz-Meta-Foo', 'a')
+        h.add('x-amz-meta-foo', 'b')
+
+        tools.assert_equal(h['x-amz-meta-foo'], 'a, b')
+        tools.assert_equal(h.get_list('X-Amz-Meta-Foo'), ['a', 'b'])
+        tools.assert_equal(list(h.iter_all()), [('x-amz-meta-foo', 'a'), ('x-amz-meta-foo', 'b')])
+
+        # Replacing drops repeated values
+        h['x-amz-meta-foo'] = 'c'
+        tools.assert_equal(h.get_list('x-amz-meta-foo'), ['c'])
+
+    def test_insertion_order(self):
+        h = Headers([('B', 1), ('a', 2)], {'C': 3})
+        tools.assert_equal(list(h), ['b', 'a', 'c'])
+        tools.assert_equal(h.names(), ['a', 'b', 'c'])
+
+    def test_canonical(self):
+        h = Headers({'Host': 'foo', 'X-Amz-Foo': '  a   b  '})
+        h.add('x-amz-bar', ' c ')
+        h.add('X-Amz-Bar', 'd\t e')
+        tools.assert_equal(h.canonical(), [('host', 'foo'),
+                                           ('x-amz-bar', 'c,d e'),
+                                           ('x-amz-foo', 'a b')])
+
+    def test_copy(self):
+        a = Headers({'foo': 'bar'})
+        b = a.copy()
+        b.add('foo', 'baz')
+        tools.assert_equal(a.get_list('foo'), ['bar'])
+        tools.assert_equal(b.get_list('foo'), ['bar', 'baz'])
+
+    def test_equality(self):
+        tools.assert_equal(Headers({'Foo': 'bar'}), {'foo': 'bar'})
+        tools.assert_equal(Headers({'Foo': 'bar'}), Headers({'FOO': 'bar'}))
+        tools.assert_not_equal(Headers({'Foo': 'bar'}), {'foo': 'baz'})
+        tools.assert_equal(Headers().get('foo', 'default'), 'default')
@@ -78,3 +78,77 @@ class TestAuthorization(object):
             'SignedHeaders=host;x-amz-date, ' + \
             'Signature=68c1d68a71091e8b93ce4d06b08c1cd35c9688b02d50be1f2ef394a45e1b6bfa'
         tools.assert_equal(header, expected)
+
+    def test_sign_string_to_sign(self):
+        consts = get_constants()
+        creds  = get_creds()
+        awth   = get_auth(consts, creds)
+
+        signature = awth.sign_string_to_sign('20160101', b'foo')
+        tools.assert_equal(signature, 'c74cca597d58548aa5e340535f11dcfa93c3652ada09885426bfb08346b229df')
+
+        # Shared keyed HMAC must not be mutated by signing
+        tools.assert_equal(awth.sign_string_to_sign('20160101', b'foo'), signature)
+        tools.assert_equal(awth.keyed_hmac('20160101').digest(),
+                           auth.Authorization.sign(awth.signature_key('20160101'), b''))
+
+    def test_string_to_sign_canonical_request(self):
+        consts = get_constants()
+        awth   = get_auth(consts, get_creds())
+
+        amzdate = '20160101T000000Z'
+        request = awth.canonical_builder.build(amzdate, '/', 'GET', '')
+        tools.assert_equal(awth.string_to_sign(amzdate, 'foo-scope', request),
+                           awth.string_to_sign(amzdate, 'foo-scope', request.string))
+
+    def test_header_incremental(self):
+        consts = get_constants()
+        creds  = get_creds()
+        awth   = auth.Authorization(consts, creds, incremental=True)
+
+        header = awth.header('20160101T000000Z', '20160101', '/', 'GET', '', {}, '')
+        tools.assert_equal(header, get_auth(consts, creds).header('20160101T000000Z', '20160101', '/'))
+
+    def test_headers_content_sha256(self):
+        consts = get_constants()
+        creds  = get_creds()
+        creds.token = None
+        awth   = get_auth(consts, creds)
+
+        digest  = 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+        headers = awth.headers('20160101T000000Z', '20160101', '/', content_sha256=digest)
+        tools.assert_equal(headers['x-amz-content-sha256'], digest)
+        tools.assert_true('SignedHeaders=host;x-amz-content-sha256;x-amz-date,' in headers['Authorization'])
+
+        # Equivalent to signing the header explicitly
+        tools.assert_equal(headers['Authorization'],
+                           awth.header('20160101T000000Z', '20160101', '/',
+                                       headers={'x-amz-content-sha256': digest}))
+
+    def test_sign_batch(self):
+        consts = get_constants()
+        creds  = get_creds()
+        creds.token = 'foo-token'
+        awth   = get_auth(consts, creds)
+
+        amzdate  = '20160101T000000Z'
+        requests = [('GET', '/', '', None, None),
+                    ('GET', '/foo', 'a=1', {'X-Amz-Foo': 'foo'}, ''),
+                    ('POST', '/bar', '', {}, b'payload')]
+        headers  = awth.sign_batch(requests, amzdate)
+
+        tools.assert_equal(len(headers), 3)
+        for (method, uri, qs, hdrs, payload), signed in zip(requests, headers):
+            tools.assert_equal(signed['x-amz-date'], amzdate)
+            tools.assert_equal(signed['X-Amz-Security-Token'], 'foo-token')
+            tools.assert_equal(signed['Authorization'],
+                               awth.header(amzdate, '20160101', uri, method, qs, hdrs, payload or ''))
+
+    def test_sign_batch_now(self):
+        awth    = get_auth(get_constants(), get_creds())
+        creds   = awth.creds
+        creds.token = None
+        headers = awth.sign_batch([('GET', '/', '', None, None)] * 2)
+        tools.assert_equal(headers[0], headers[1])
+        tools.assert_true(headers[0]['Authorization'].startswith(
+            'AWS4-HMAC-SHA256 Credential=foo/%s/' % headers[0]['x-amz-date'][:8]))
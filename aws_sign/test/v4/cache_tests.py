@@ -0,0 +1,74 @@
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4 import auth
+from aws_sign.v4.cache import SigningKeyCache, fingerprint
+from nose import tools
+
+class Credentials(object):
+    def __init__(self, access, secret):
+        self.access_key = access
+        self.secret_key = secret
+
+def get_constants():
+    return Sigv4ServiceConstants.from_url('https://foo-service.bar-region.amazonaws.com')
+
+def derive(datestamp):
+    return ('key-%s' % datestamp).encode('utf-8')
+
+
+class TestSigningKeyCache(object):
+
+    def test_hit_miss(self):
+        cache = SigningKeyCache()
+        key = cache.get('fp', '20160101', 'region', 'service', 'aws4_request', derive)
+        tools.assert_equal(key, b'key-20160101')
+        tools.assert_equal((cache.hits, cache.misses), (0, 1))
+
+        key = cache.get('fp', '20160101', 'region', 'service', 'aws4_request', derive)
+        tools.assert_equal(key, b'key-20160101')
+        tools.assert_equal((cache.hits, cache.misses), (1, 1))
+
+        cache.get('fp', '20160101', 'region', 'other-service', 'aws4_request', derive)
+        tools.assert_equal((cache.hits, cache.misses), (1, 2))
+        tools.assert_equal(len(cache), 2)
+
+    def test_lru_eviction(self):
+        cache = SigningKeyCache(max_size=2)
+        cache.get('fp', '20160101', 'a', 'service', 'aws4_request', derive)
+        cache.get('fp', '20160101', 'b', 'service', 'aws4_request', derive)
+
+        # Touch 'a' so 'b' becomes least recently used
+        cache.get('fp', '20160101', 'a', 'service', 'aws4_request', derive)
+        cache.get('fp', '20160101', 'c', 'service', 'aws4_request', derive)
+
+        tools.assert_equal(len(cache), 2)
+        tools.assert_true(('fp', '20160101', 'a', 'service', 'aws4_request') in cache)
+        tools.assert_false(('fp', '20160101', 'b', 'service', 'aws4_request') in cache)
+
+    def test_date_rollover(self):
+        cache = SigningKeyCache()
+        cache.get('fp', '20160101', 'a', 'service', 'aws4_request', derive)
+        cache.get('fp', '20160101', 'b', 'service', 'aws4_request', derive)
+        cache.get('fp', '20160102', 'a', 'service', 'aws4_request', derive)
+
+        tools.assert_equal(len(cache), 1)
+        tools.assert_true(('fp', '20160102', 'a', 'service', 'aws4_request') in cache)
+
+    def test_shared_between_instances(self):
+        cache = SigningKeyCache()
+        consts = get_constants()
+        a = auth.Authorization(consts, Credentials('foo', 'bar'), key_cache=cache)
+        b = auth.Authorization(consts, Credentials('baz', 'bar'), key_cache=cache)
+        c = auth.Authorization(consts, Credentials('foo', 'qux'), key_cache=cache)
+
+        tools.assert_equal(a.signature_key('20160101'), b.signature_key('20160101'))
+        tools.assert_equal((cache.hits, cache.misses), (1, 1))
+
+        tools.assert_not_equal(a.signature_key('20160101'), c.signature_key('20160101'))
+        tools.assert_equal(cache.misses, 2)
+
+    def test_secret_not_retained(self):
+        cache = SigningKeyCache()
+        awth = auth.Authorization(get_constants(), Credentials('foo', 'bar'), key_cache=cache)
+        awth.signature_key('20160101')
+        tools.assert_true((fingerprint('bar'), '20160101', 'bar-region', 'foo-service', 'aws4_request') in cache)
+        tools.assert_equal(awth.signature_key('20160101'), awth.derive_signature_key('20160101'))
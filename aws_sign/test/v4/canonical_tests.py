@@ -1,5 +1,13 @@
-from aws_sign.v4.canonical import ArgumentBuilder
-from aws_sign.v4 import Sigv4ServiceConstants
+import hashlib
+import io
+import os
+import mmap
+import tempfile
+
+from aws_sign.v4 import canonical
+from aws_sign.v4.canonical import ArgumentBuilder, UNSIGNED_PAYLOAD
+from aws_sign.headers import Headers
+from aws_sign.v4 import S3ServiceConstants, Sigv4ServiceConstants
 from nose import tools
 
 def get_constants():
@@ -96,4 +104,146 @@ class TestCanonical(object):
         tools.assert_equal(qs, 'bar=2&baz=3&foo=1')
 
         qs = ArgumentBuilder.canonical_query_string({'foo bar': 1, 'baz': 2})
-        tools.assert_equal(qs, 'baz=2&foo+bar=1')
+        tools.assert_equal(qs, 'baz=2&foo%20bar=1')
+
+    def test_query_string_rfc3986(self):
+        # Sorted by encoded name, then value
+        qs = ArgumentBuilder.canonical_query_string([('b', '2'), ('B', '1'), ('a', 'z'), ('a', 'y')])
+        tools.assert_equal(qs, 'B=1&a=y&a=z&b=2')
+
+        qs = ArgumentBuilder.canonical_query_string({'foo': ['b', 'a'], 'bar': None})
+        tools.assert_equal(qs, 'bar=&foo=a&foo=b')
+
+        qs = ArgumentBuilder.canonical_query_string({'key': u'a/b c+d~e*\u00e9'})
+        tools.assert_equal(qs, 'key=a%2Fb%20c%2Bd~e%2A%C3%A9')
+
+        # Pre-encoded input is normalized
+        qs = ArgumentBuilder.canonical_query_string('z=1&a=b%20c&prefix&a=%7Ex')
+        tools.assert_equal(qs, 'a=b%20c&a=~x&prefix=&z=1')
+
+    def test_quote_cache(self):
+        tools.assert_equal(canonical.quote('foo bar'), 'foo%20bar')
+        tools.assert_equal(canonical.quote('foo bar'), 'foo%20bar')
+        tools.assert_true('foo bar' in canonical._quote_cache)
+
+        # Non-string values are formatted before lookup so equal keys don't collide
+        tools.assert_equal(canonical.quote(True), 'True')
+        tools.assert_equal(canonical.quote(1), '1')
+
+    def test_build(self):
+        c = get_constants()
+        canon = get_builder(c)
+        amzdate = '20160101T000000Z'
+
+        headers = {'X-Amz-Foo': 'foo', 'Host': 'override'}
+        request = canon.build(amzdate, '/', 'GET', '', headers)
+
+        tools.assert_equal(request.signed_headers, 'host;x-amz-date;x-amz-foo')
+        tools.assert_equal(request.canonical_headers,
+                           'host:override\nx-amz-date:%s\nx-amz-foo:foo\n' % amzdate)
+        tools.assert_equal(request.payload_hash,
+                           'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
+        tools.assert_equal(request.string, canon.canonical_request(amzdate, '/', 'GET', '', headers))
+
+    def test_incremental_hexdigest(self):
+        c = get_constants()
+        amzdate = '20160101T000000Z'
+        headers = {'x-amz-Foo': 'foo', 'x-amz-bar': 'bar'}
+
+        request = ArgumentBuilder(c).build(amzdate, '/foo', 'POST', 'a=1', headers, 'payload')
+        incremental = ArgumentBuilder(c, incremental=True).build(amzdate, '/foo', 'POST', 'a=1', headers, 'payload')
+
+        tools.assert_equal(incremental.hexdigest(), request.hexdigest())
+        tools.assert_equal(incremental.string, request.string)
+
+    def test_payload_hash_streams(self):
+        expected = hashlib.sha256(b'foo-bar' * 20000).hexdigest()
+
+        tools.assert_equal(ArgumentBuilder.payload_hash(b'foo-bar' * 20000), expected)
+        tools.assert_equal(ArgumentBuilder.payload_hash(u'foo-bar' * 20000), expected)
+        tools.assert_equal(ArgumentBuilder.payload_hash(bytearray(b'foo-bar' * 20000)), expected)
+        tools.assert_equal(ArgumentBuilder.payload_hash(memoryview(b'foo-bar' * 20000)), expected)
+        tools.assert_equal(ArgumentBuilder.payload_hash(iter([b'foo-bar'] * 20000)), expected)
+
+        # File position is restored so the payload can still be sent
+        stream = io.BytesIO(b'xxx' + b'foo-bar' * 20000)
+        stream.seek(3)
+        tools.assert_equal(ArgumentBuilder.payload_hash(stream), expected)
+        tools.assert_equal(stream.tell(), 3)
+
+        # Non-seekable files are consumed like iterables
+        r, w = os.pipe()
+        os.write(w, b'foo-bar' * 2000)
+        os.close(w)
+        with os.fdopen(r, 'rb') as pipe:
+            tools.assert_equal(ArgumentBuilder.payload_hash(pipe),
+                               hashlib.sha256(b'foo-bar' * 2000).hexdigest())
+
+        tmp = tempfile.TemporaryFile()
+        try:
+            tmp.write(b'foo-bar' * 20000)
+            tmp.flush()
+            tmp.seek(0)
+            tools.assert_equal(ArgumentBuilder.payload_hash(mmap.mmap(tmp.fileno(), 0)), expected)
+        finally:
+            tmp.close()
+
+    def test_content_sha256(self):
+        c = get_constants()
+        canon = get_builder(c)
+        amzdate = '20160101T000000Z'
+
+        # Payload isn't read when hash is supplied
+        payload = iter([b'not-consumed'])
+        request = canon.build(amzdate, '/', 'PUT', '', {'X-Amz-Content-Sha256': UNSIGNED_PAYLOAD}, payload)
+        tools.assert_equal(request.payload_hash, 'UNSIGNED-PAYLOAD')
+        tools.assert_equal(request.signed_headers, 'host;x-amz-content-sha256;x-amz-date')
+        tools.assert_equal(list(payload), [b'not-consumed'])
+
+        digest = hashlib.sha256(b'foo').hexdigest()
+        request = canon.build(amzdate, '/', 'PUT', '', {'x-amz-content-sha256': digest}, b'foo')
+        tools.assert_equal(request.payload_hash, digest)
+
+    def test_canonical_header_values(self):
+        c = get_constants()
+        canon = get_builder(c)
+        amzdate = '20160101T000000Z'
+
+        headers = Headers({'X-Amz-Foo': '  a   b  '})
+        headers.add('x-amz-bar', 'c')
+        headers.add('X-Amz-Bar', 'd')
+        request = canon.build(amzdate, '/', 'GET', '', headers)
+
+        tools.assert_equal(request.canonical_headers,
+                           'host:%s\nx-amz-bar:c,d\nx-amz-date:%s\nx-amz-foo:a b\n' % (c.host, amzdate))
+
+    def test_canonical_uri(self):
+        # Unreserved paths are canonical as is
+        for path in ('/', '/foo', '/foo/', '/-._~0123456789AZaz', '/.hidden'):
+            tools.assert_equal(canonical.canonical_uri(path), path)
+        tools.assert_equal(canonical.canonical_uri(''), '/')
+
+        # Normalization
+        tools.assert_equal(canonical.canonical_uri('//example//'), '/example/')
+        tools.assert_equal(canonical.canonical_uri('/example/..'), '/')
+        tools.assert_equal(canonical.canonical_uri('/a/./b/../c/'), '/a/c/')
+        tools.assert_equal(canonical.canonical_uri('/a/.'), '/a/')
+
+        # Encoded path is encoded again
+        tools.assert_equal(canonical.canonical_uri('/example space/'), '/example%2520space/')
+        tools.assert_equal(canonical.canonical_uri(u'/\u1234'), '/%25E1%2588%25B4')
+
+        # Encoded once, dot and empty segments kept
+        tools.assert_equal(canonical.canonical_uri('/example space/', False, False), '/example%20space/')
+        tools.assert_equal(canonical.canonical_uri('//a/../b', False, False), '//a/../b')
+        tools.assert_equal(canonical.encode_path(u'/\u1234/a+b'), '/%E1%88%B4/a%2Bb')
+
+    def test_canonical_uri_service_rules(self):
+        amzdate = '20160101T000000Z'
+
+        request = get_builder(get_constants()).build(amzdate, '/foo bar/./baz', 'GET', '')
+        tools.assert_equal(request.uri, '/foo%2520bar/baz')
+
+        s3 = S3ServiceConstants.from_url('https://s3.us-east-1.amazonaws.com')
+        request = get_builder(s3).build(amzdate, '/foo bar/./baz', 'GET', '')
+        tools.assert_equal(request.uri, '/foo%20bar/./baz')
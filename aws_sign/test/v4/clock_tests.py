@@ -0,0 +1,57 @@
+from aws_sign.v4.clock import Clock
+from nose import tools
+
+
+class FakeTime(object):
+    def __init__(self, now):
+        self.now   = now
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.now
+
+
+class TestClock(object):
+
+    def test_timestamps(self):
+        now = FakeTime(1451606400.25)
+        clock = Clock(now=now)
+
+        tools.assert_equal(clock.timestamps(), ('20160101T000000Z', '20160101'))
+
+        # Cached within the second
+        now.now = 1451606400.99
+        tools.assert_equal(clock.timestamps(), ('20160101T000000Z', '20160101'))
+        tools.assert_equal(now.calls, 2)
+
+        now.now = 1451692799
+        tools.assert_equal(clock.timestamps(), ('20160101T235959Z', '20160101'))
+
+        now.now = 1451692800
+        tools.assert_equal(clock.timestamps(), ('20160102T000000Z', '20160102'))
+
+    def test_default(self):
+        amzdate, datestamp = Clock().timestamps()
+        tools.assert_equal(len(amzdate), 16)
+        tools.assert_equal(amzdate[:8], datestamp)
+
+    def test_correct(self):
+        now = FakeTime(1451606400.5)
+        clock = Clock(now=now)
+
+        # Server an hour ahead
+        tools.assert_true(clock.correct('Fri, 01 Jan 2016 01:00:00 GMT'))
+        tools.assert_equal(clock.offset, 3600)
+        tools.assert_equal(clock.timestamps(), ('20160101T010000Z', '20160101'))
+
+        # Differences below threshold are ignored
+        tools.assert_false(clock.correct('Fri, 01 Jan 2016 01:00:30 GMT'))
+        tools.assert_equal(clock.offset, 3600)
+
+        tools.assert_true(clock.correct('Thu, 31 Dec 2015 23:55:00 GMT'))
+        tools.assert_equal(clock.offset, -300)
+
+        tools.assert_false(clock.correct(None))
+        tools.assert_false(clock.correct('garbage'))
+        tools.assert_equal(clock.offset, -300)
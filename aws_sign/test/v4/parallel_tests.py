@@ -0,0 +1,78 @@
+import time
+
+from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4 import auth, parallel, presign
+from aws_sign.v4.clock import Clock
+from nose import tools
+
+AMZDATE   = '20160101T000000Z'
+DATESTAMP = '20160101'
+
+class Credentials(object):
+    def __init__(self, access, secret, token=None):
+        self.access_key = access
+        self.secret_key = secret
+        self.token      = token
+
+def get_auth():
+    consts = Sigv4ServiceConstants.from_url('https://foo-service.bar-region.amazonaws.com')
+    return auth.Authorization(consts, Credentials('foo', 'bar', 'baz'))
+
+def get_requests(n):
+    return [('GET', '/foo/%d' % i, '', {'x-amz-foo': str(i)}, None) for i in range(n)]
+
+
+class TestParallelSigner(object):
+
+    def test_sign(self):
+        awth   = get_auth()
+        signer = parallel.ParallelSigner(awth, processes=2, chunksize=7)
+
+        results  = list(signer.sign(iter(get_requests(50)), AMZDATE))
+        expected = awth.sign_batch(get_requests(50), AMZDATE)
+        tools.assert_equal(results, expected)
+
+    def test_presign(self):
+        awth     = get_auth()
+        signer   = parallel.ParallelSigner(awth, processes=2, chunksize=3, window=1)
+        requests = [('/foo/%d' % i, 'GET', None, None, 60) for i in range(10)]
+
+        results  = list(signer.presign(requests, AMZDATE))
+        expected = [presign.Presigner(awth).url(AMZDATE, DATESTAMP, *r) for r in requests]
+        tools.assert_equal(results, expected)
+
+    def test_keyed_authorization(self):
+        awth  = get_auth()
+        keyed = parallel.KeyedAuthorization(awth.constants, 'foo', None, DATESTAMP,
+                                            awth.signature_key(DATESTAMP))
+        tools.assert_equal(keyed.header(AMZDATE, DATESTAMP, '/'), awth.header(AMZDATE, DATESTAMP, '/'))
+        tools.assert_raises(ValueError, keyed.header, '20160102T000000Z', '20160102', '/')
+
+    def test_sign_current_time(self):
+        awth   = get_auth()
+        signer = parallel.ParallelSigner(awth, processes=2, chunksize=4)
+
+        start   = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        results = list(signer.sign(get_requests(10)))
+        end     = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        for request, headers in zip(get_requests(10), results):
+            amzdate = headers['x-amz-date']
+            tools.assert_true(start <= amzdate <= end)
+            tools.assert_equal(headers, awth.sign_batch([request], amzdate)[0])
+
+    def test_worker_rollover(self):
+        awth   = get_auth()
+        worker = parallel._Worker(awth.constants, 'foo', 'baz', 0, False)
+        worker.clock = Clock(now=lambda: 1451606400 + 86400)  # 2016-01-02
+
+        # Batch keyed before midnight signs at the key's last second
+        tools.assert_equal(worker.timestamps(None, DATESTAMP), ('20160101T235959Z', DATESTAMP))
+        tools.assert_equal(worker.timestamps(None, '20160102'), ('20160102T000000Z', '20160102'))
+        tools.assert_equal(worker.timestamps(AMZDATE, DATESTAMP), (AMZDATE, DATESTAMP))
+
+        first, _ = worker.keyed(DATESTAMP, awth.signature_key(DATESTAMP))
+        tools.assert_is(worker.keyed(DATESTAMP, awth.signature_key(DATESTAMP))[0], first)
+        second, _ = worker.keyed('20160102', awth.signature_key('20160102'))
+        tools.assert_equal(second.datestamp, '20160102')
+        tools.assert_equal(second.header('20160102T000000Z', '20160102', '/'),
+                           awth.header('20160102T000000Z', '20160102', '/'))
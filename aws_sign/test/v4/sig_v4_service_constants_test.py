@@ -1,6 +1,6 @@
 from __future__ import print_function
 
-from aws_sign.v4 import Sigv4ServiceConstants
+from aws_sign.v4 import S3ServiceConstants, Sigv4ServiceConstants
 
 from nose import tools
 
@@ -60,3 +60,13 @@ class TestServiceConstants(object):
                                              'x-amz-date': None,
                                              'content-type': None,
                                              'x-amz-target': None})
+
+    def test_path_rules(self):
+        consts = default_service_constants()
+        tools.assert_true(consts.DOUBLE_ENCODE_PATH)
+        tools.assert_true(consts.NORMALIZE_PATH)
+
+        consts = S3ServiceConstants.from_url('https://s3.us-east-1.amazonaws.com')
+        tools.assert_false(consts.DOUBLE_ENCODE_PATH)
+        tools.assert_false(consts.NORMALIZE_PATH)
+        tools.assert_equals(consts.headers, {'host': 's3.us-east-1.amazonaws.com', 'x-amz-date': None})
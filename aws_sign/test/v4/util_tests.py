@@ -1,6 +1,10 @@
+import io
+import os
+
+from datetime import datetime
 from nose import tools
 
-from aws_sign.v4.util import safe_encode
+from aws_sign.v4.util import iter_blocks, rewindable, safe_encode, timestamps
 
 
 class TestSafeEncode(object):
@@ -25,3 +29,44 @@ class TestSafeEncode(object):
         expected = b'howdy'
         tools.assert_equal(after, expected)
         tools.assert_equal(type(after), type(expected))
+
+
+class TestIterBlocks(object):
+
+    def test_buffer(self):
+        blocks = list(iter_blocks(bytearray(b'abcdefg'), 3))
+        tools.assert_equal([bytes(b) for b in blocks], [b'abc', b'def', b'g'])
+
+    def test_file(self):
+        blocks = list(iter_blocks(io.BytesIO(b'abcdefg'), 3))
+        tools.assert_equal(blocks, [b'abc', b'def', b'g'])
+
+    def test_iterable(self):
+        blocks = list(iter_blocks([u'abc', b'def'], 1))
+        tools.assert_equal(blocks, [b'abc', b'def'])
+
+    def test_none(self):
+        tools.assert_equal(list(iter_blocks(None)), [])
+
+
+class TestRewindable(object):
+
+    def test_rewindable(self):
+        tools.assert_true(rewindable(None))
+        tools.assert_true(rewindable(u'foo'))
+        tools.assert_true(rewindable(bytearray(b'foo')))
+        tools.assert_true(rewindable(io.BytesIO(b'foo')))
+        tools.assert_false(rewindable(iter([b'foo'])))
+        tools.assert_false(rewindable(b'foo' for _ in range(1)))
+
+    def test_pipe(self):
+        r, w = os.pipe()
+        os.close(w)
+        with os.fdopen(r, 'rb') as pipe:
+            tools.assert_false(rewindable(pipe))
+
+
+class TestTimestamps(object):
+
+    def test_timestamps(self):
+        tools.assert_equal(timestamps(datetime(2016, 1, 2, 3, 4, 5)), ('20160102T030405Z', '20160102'))
@@ -30,5 +30,13 @@ class Sigv4ServiceConstants(ServiceConstants):
     @property
     def headers(self):
         return self.__headers
-    
-    
+
+
+class S3ServiceConstants(Sigv4ServiceConstants):
+    """Signature Version 4 service constants for S3
+
+    S3 signs the URI path as sent: segments are encoded once and dot segments are
+    significant.
+    """
+    DOUBLE_ENCODE_PATH = False
+    NORMALIZE_PATH     = False
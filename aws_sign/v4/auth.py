@@ -2,7 +2,10 @@ import hmac
 import hashlib
 
 from . import canonical
-from .util import safe_encode
+from .cache import SIGNING_KEY_CACHE, fingerprint
+from .util import safe_encode, timestamps
+
+from datetime import datetime
 
 class Authorization(object):
     """Class for signing AWS HTTP requests adhering to Signature Version 4 specification
@@ -15,16 +18,20 @@ class Authorization(object):
       * querystring parameter
       * HTTP request header
     """
-    def __init__(self, constants, creds):
+    def __init__(self, constants, creds, key_cache=None, incremental=False):
         """Initializes auth
         
         Parameters:
            constants: ServiceConstants
            creds:     AWS Credentials
+           key_cache: SigningKeyCache, defaults to process-wide cache
+           incremental: hash canonical requests without materializing them
         """
         self.constants = constants
-        self.canonical_builder = canonical.ArgumentBuilder(constants)
+        self.canonical_builder = canonical.ArgumentBuilder(constants, incremental)
         self.creds = creds
+        self.key_cache = key_cache if key_cache is not None else SIGNING_KEY_CACHE
+        self.__fingerprint = (None, None)
 
     @staticmethod
     def sign(key, msg):
@@ -56,14 +63,32 @@ class Authorization(object):
         Parameters:
             amzdate: '%Y%m%dT%H%M%SZ' timestamp
             credential_scope: Signature v4 credential scope string
-            canonical_request: Signature v4 canonical request string
+            canonical_request: Signature v4 canonical request string or CanonicalRequest
 
         Return string to sign"""
+        if isinstance(canonical_request, canonical.CanonicalRequest):
+            canonical_hash = canonical_request.hexdigest().decode('ascii')
+        else:
+            canonical_hash = hashlib.sha256(safe_encode(canonical_request)).hexdigest()
         return '%s\n%s\n%s\n%s' % \
             (self.constants.algorithm, 
              amzdate, 
              credential_scope, 
-             hashlib.sha256(safe_encode(canonical_request)).hexdigest())
+             canonical_hash)
+
+    def _string_to_sign(self, amzdate, credential_scope, canonical_hash):
+        """Creates encoded string to sign
+
+        Parameters:
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp
+            credential_scope: Signature v4 credential scope string
+            canonical_hash: hex encoded canonical request digest bytes
+
+        Return string to sign bytes"""
+        return b'\n'.join((safe_encode(self.constants.algorithm),
+                           safe_encode(amzdate),
+                           safe_encode(credential_scope),
+                           canonical_hash))
 
     def signature(self, datestamp, string_to_sign):
         """Creates signature of HTTP request
@@ -73,9 +98,75 @@ class Authorization(object):
             string_to_string: hash input string
             
         Returns string signature"""
-        return hmac.new(self.signature_key(datestamp), safe_encode(string_to_sign), hashlib.sha256).hexdigest()
+        return self.sign_string_to_sign(datestamp, safe_encode(string_to_sign))
+
+    def sign_string_to_sign(self, datestamp, string_to_sign):
+        """Creates signature of encoded string to sign
+
+        Copies the pre-keyed HMAC for the signing key so key padding and inner/outer
+        digest setup happen once per signing key rather than once per request.
+
+        Parameters:
+            datestamp: '%Y%m%d' stamp
+            string_to_sign: hash input bytes
+
+        Returns string signature"""
+        mac = self.keyed_hmac(datestamp).copy()
+        mac.update(string_to_sign)
+        return mac.hexdigest()
+
+    def _fingerprint(self):
+        """Returns fingerprint of current secret key
+
+        Credentials may be refreshed in place so the fingerprint is recomputed
+        whenever the secret key changes.
+        """
+        secret = self.creds.secret_key
+        cached, fp = self.__fingerprint
+        if secret != cached:
+            fp = fingerprint(secret)
+            self.__fingerprint = (secret, fp)
+        return fp
+
+    def _signing_entry(self, date_stamp):
+        """Returns cached (signing key, keyed HMAC) pair
+
+        Parameters:
+            date_stamp: '%Y%m%d' stamp
+
+        Returns tuple"""
+        return self.key_cache.get(self._fingerprint(),
+                                  date_stamp,
+                                  self.constants.region,
+                                  self.constants.service,
+                                  self.constants.signing,
+                                  self._derive_entry)
+
+    def _derive_entry(self, date_stamp):
+        key = self.derive_signature_key(date_stamp)
+        return key, hmac.new(key, digestmod=hashlib.sha256)
 
     def signature_key(self, date_stamp):
+        """Returns signing key, derived at most once per cache lifetime
+
+        Parameters:
+            date_stamp: '%Y%m%d' stamp
+
+        Returns signing key string"""
+        return self._signing_entry(date_stamp)[0]
+
+    def keyed_hmac(self, date_stamp):
+        """Returns HMAC object keyed with the signing key
+
+        The returned object is shared and must not be updated; `copy` it first.
+
+        Parameters:
+            date_stamp: '%Y%m%d' stamp
+
+        Returns hmac object"""
+        return self._signing_entry(date_stamp)[1]
+
+    def derive_signature_key(self, date_stamp):
         """Creates signing key
         
         Parameters:
@@ -88,7 +179,7 @@ class Authorization(object):
         signing = Authorization.sign(service, self.constants.signing)
         return signing
 
-    def header(self, amzdate, datestamp, uri, method='GET', qs='', headers=None, payload=''):
+    def header(self, amzdate, datestamp, uri, method='GET', qs='', headers=None, payload='', content_sha256=None):
         """Creates HTTP Authorization header
         
         Parameters:
@@ -99,28 +190,93 @@ class Authorization(object):
             qs: url querystring
             headers: additional HTTP request headers
             payload: 'POST' payload
+            content_sha256: precomputed payload hex digest or 'UNSIGNED-PAYLOAD'; signed as
+                            'x-amz-content-sha256' header, which must also be sent
 
         Returns HTTP header
         """
-        headers = headers if headers else {}
+        if content_sha256:
+            headers = dict(headers, **{canonical.CONTENT_SHA256_HEADER: content_sha256}) if headers else \
+                {canonical.CONTENT_SHA256_HEADER: content_sha256}
+        return self._header(*self.sign_request(amzdate, datestamp, uri, method, qs, headers, payload))
+
+    def sign_request(self, amzdate, datestamp, uri, method='GET', qs='', headers=None, payload=''):
+        """Signs HTTP request
+
+        Parameters:
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp
+            datestamp: '%Y%m%d' date
+            uri: /foo/bar
+            method: HTTP method, e.g. 'GET', 'POST, etc
+            qs: url querystring
+            headers: additional HTTP request headers
+            payload: 'POST' payload
+
+        Returns tuple of (credential scope, signed headers, signature)
+        """
         credential_scope  = self.canonical_builder.credential_scope(datestamp)
-        canonical_request = self.canonical_builder.canonical_request(amzdate, uri, method, qs, headers, payload)
-        signed_headers    = self.canonical_builder.signed_headers(list(headers.keys()))
-        string_to_sign    = self.string_to_sign(amzdate, credential_scope, canonical_request)
-        signature         = self.signature(datestamp, string_to_sign)
+        canonical_request = self.canonical_builder.build(amzdate, uri, method, qs, headers, payload)
+        string_to_sign    = self._string_to_sign(amzdate, credential_scope, canonical_request.hexdigest())
+        signature         = self.sign_string_to_sign(datestamp, string_to_sign)
+
+        return credential_scope, canonical_request.signed_headers, signature
+
+    def sign_batch(self, requests, amzdate=None, datestamp=None):
+        """Creates signing headers for many requests at once
+
+        Timestamps, credential scope, keyed HMAC, default headers and the string to sign
+        prefix are computed once for the whole batch.
+
+        Parameters:
+            requests: iterable of (method, uri, qs, headers, payload) tuples
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp, defaults to current time
+            datestamp: '%Y%m%d' date, derived from amzdate by default
 
-        return self._header(credential_scope, signed_headers, signature)
+        Returns list of headers dicts, each including 'x-amz-date'
+        """
+        if amzdate is None:
+            amzdate, datestamp = timestamps(datetime.utcnow())
+        elif datestamp is None:
+            datestamp = amzdate[:8]
+
+        builder  = self.canonical_builder
+        scope    = builder.credential_scope(datestamp)
+        mac      = self.keyed_hmac(datestamp)
+        prefix   = self._string_to_sign(amzdate, scope, b'')
+        defaults = builder.default_headers.copy()
+        defaults['x-amz-date'] = amzdate
+        auth     = '%s Credential=%s/%s, SignedHeaders=' % (self.constants.algorithm, self.creds.access_key, scope)
+
+        base = {'x-amz-date': amzdate}
+        if self.creds.token:
+            base['X-Amz-Security-Token'] = self.creds.token
+
+        ret = []
+        for method, uri, qs, headers, payload in requests:
+            path    = builder.canonical_uri(uri)
+            request = canonical.CanonicalRequest(defaults, amzdate, path, method, qs or '', headers,
+                                                 payload, builder.incremental)
+            signature = mac.copy()
+            signature.update(prefix + request.hexdigest())
+
+            hdrs = dict(base)
+            hdrs['Authorization'] = '%s%s, Signature=%s' % (auth, request.signed_headers, signature.hexdigest())
+            ret.append(hdrs)
+        return ret
 
     def headers(self, *args, **kwargs):
         """Returns all headers for signing
 
         Assumed AWS roles must also set the 'X-Amz-Security-Token' header in addition to 
-        the 'Authorization' header.
+        the 'Authorization' header.  The 'x-amz-content-sha256' header is included when
+        `content_sha256` is provided.
 
         Returns headers dict
         """
         ret = {}
         if self.creds.token:
             ret['X-Amz-Security-Token'] = self.creds.token
+        if kwargs.get('content_sha256'):
+            ret[canonical.CONTENT_SHA256_HEADER] = kwargs['content_sha256']
         ret['Authorization'] = self.header(*args, **kwargs)
         return ret
@@ -0,0 +1,120 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from .util import safe_encode
+
+#
+# Constants
+#
+DEFAULT_MAX_SIZE = 256
+
+
+def fingerprint(secret_key):
+    """Creates a stable, non-reversible identifier for a secret key
+
+    Parameters:
+        secret_key: AWS secret access key
+
+    Returns hex digest string
+    """
+    return hashlib.sha256(safe_encode(secret_key)).hexdigest()
+
+
+class SigningKeyCache(object):
+    """Thread-safe LRU cache of derived Signature Version 4 signing keys
+
+    Deriving a signing key takes four chained HMACs, yet the result only
+    changes with the secret, date, region, service or signing terminator.
+    Entries are keyed by
+
+      (secret fingerprint, datestamp, region, service, signing)
+
+    so raw secrets are never held by the cache.  Entries are evicted
+    least-recently-used once `max_size` is exceeded and every entry for an
+    older datestamp is dropped as soon as a newer datestamp is seen.
+
+    Example:
+      cache = SigningKeyCache(max_size=16)
+      key = cache.get(fp, '20160101', 'us-west-2', 'execute-api', 'aws4_request', derive)
+
+      # derive(datestamp) is only called on a miss
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """Initializes cache
+
+        Parameters:
+            max_size: maximum number of signing keys retained
+        """
+        self.max_size  = max_size
+        self.hits      = 0
+        self.misses    = 0
+        self.__entries = OrderedDict()
+        self.__date    = None
+        self.__lock    = threading.Lock()
+
+    def _rollover(self, datestamp):
+        """Drops entries for datestamps older than `datestamp`
+
+        Must be called with lock held.
+        """
+        if self.__date is None or datestamp > self.__date:
+            self.__date = datestamp
+            for k in [k for k in self.__entries if k[1] < datestamp]:
+                del self.__entries[k]
+
+    def get(self, fp, datestamp, region, service, signing, derive):
+        """Returns cached signing key, deriving and storing it on a miss
+
+        Parameters:
+            fp: secret key fingerprint
+            datestamp: '%Y%m%d' stamp
+            region: service region
+            service: service name
+            signing: signing terminator, e.g. 'aws4_request'
+            derive: callable accepting datestamp and returning the signing key
+
+        Returns signing key
+        """
+        k = (fp, datestamp, region, service, signing)
+        with self.__lock:
+            value = self.__entries.get(k)
+            if value is not None:
+                self.hits += 1
+                self.__entries[k] = self.__entries.pop(k)
+                return value
+            self.misses += 1
+
+        # Derive outside of lock; concurrent misses for the same key produce
+        # identical values so last writer wins.
+        value = derive(datestamp)
+
+        with self.__lock:
+            self._rollover(datestamp)
+            self.__entries[k] = value
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Removes all entries and resets counters"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__date = None
+            self.hits   = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, k):
+        return k in self.__entries
+
+    def __str__(self):
+        return 'size=%d\nmax_size=%d\nhits=%d\nmisses=%d' % \
+            (len(self), self.max_size, self.hits, self.misses)
+
+
+# Process-wide cache shared by all Authorization instances
+SIGNING_KEY_CACHE = SigningKeyCache()
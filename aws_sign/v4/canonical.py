@@ -1,58 +1,312 @@
-import copy
+import binascii
 import hashlib
+import re
+import six
 from six.moves.urllib import parse
 
-from .util import safe_encode
+from .util import iter_blocks, rewindable, safe_encode
+from ..headers import Headers
+
+#
+# Constants
+#
+CONTENT_SHA256_HEADER = 'x-amz-content-sha256'
+
+# Payload hash accepted by services that don't require signed payloads, e.g. S3 over TLS
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+
+# RFC 3986 unreserved characters, apart from alphanumerics
+UNRESERVED = '-_.~'
+
+# Maximum number of memoized encodings; the memo is reset once exceeded
+QUOTE_CACHE_SIZE = 4096
+
+_quote_cache = {}
+
+def quote(value):
+    """RFC 3986 percent-encodes value
+
+    Every character but unreserved ones is encoded, spaces as '%20'.  Results are
+    memoized since query parameter names and values tend to repeat.
+
+    Parameters:
+        value: string or value formatted with '%s'
+
+    Returns encoded string
+    """
+    if not isinstance(value, (six.text_type, bytes)):
+        value = '%s' % value
+    try:
+        return _quote_cache[value]
+    except KeyError:
+        pass
+    ret = parse.quote(safe_encode(value), safe=UNRESERVED)
+    if len(_quote_cache) >= QUOTE_CACHE_SIZE:
+        _quote_cache.clear()
+    _quote_cache[value] = ret
+    return ret
+
+# Maximum number of memoized canonical paths; the memo is reset once exceeded
+URI_CACHE_SIZE = 1024
+
+# Paths made up of unreserved characters, free of empty and dot segments, are canonical as is
+_CANONICAL_PATH = re.compile(r'^(?:/(?!\.\.?(?:/|$))[A-Za-z0-9\-_.~]+)*/?$')
+
+_uri_cache = {}
+
+def _remove_dot_segments(path):
+    """Resolves '.' and '..' segments and collapses empty segments, keeping a trailing slash"""
+    segments = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if segments:
+                segments.pop()
+        elif segment and segment != '.':
+            segments.append(segment)
+    ret = '/' + '/'.join(segments)
+    if segments and path.endswith(('/', '/.', '/..')):
+        ret += '/'
+    return ret
+
+def canonical_uri(path, double_encode=True, normalize=True):
+    """Canonicalizes URI path for signing
+
+    `path` is the decoded path.  Each segment is RFC 3986 encoded -- twice when
+    `double_encode` is set, as all services but S3 canonicalize the already encoded
+    request path.  Plain ASCII paths without reserved characters or dot segments are
+    returned as is; other results are memoized.
+
+    Parameters:
+        path: decoded URI path, e.g. /foo bar/baz
+        double_encode: encode segments twice
+        normalize: resolve dot segments and collapse empty segments
+
+    Returns canonical URI path
+    """
+    if not path:
+        return '/'
+    if _CANONICAL_PATH.match(path):
+        return path
+
+    k = (path, double_encode, normalize)
+    try:
+        return _uri_cache[k]
+    except KeyError:
+        pass
+
+    ret = _remove_dot_segments(path) if normalize else path
+    ret = '/'.join([quote(segment) for segment in ret.split('/')])
+    if double_encode:
+        ret = '/'.join([quote(segment) for segment in ret.split('/')])
+    if not ret.startswith('/'):
+        ret = '/' + ret
+
+    if len(_uri_cache) >= URI_CACHE_SIZE:
+        _uri_cache.clear()
+    _uri_cache[k] = ret
+    return ret
+
+def encode_path(path):
+    """Encodes decoded URI path for the request line"""
+    return canonical_uri(path, double_encode=False, normalize=False)
+
+def _query_items(query_args):
+    """Returns (name, value) pairs from dict, pair list or pre-encoded querystring"""
+    if isinstance(query_args, (six.text_type, bytes)):
+        if not isinstance(query_args, str):
+            query_args = query_args.decode('utf-8')
+        for param in query_args.split('&'):
+            if param:
+                k, _, v = param.partition('=')
+                yield parse.unquote(k), parse.unquote(v)
+        return
+    items = six.iteritems(query_args) if hasattr(query_args, 'keys') else query_args
+    for k, v in items:
+        if isinstance(v, (list, tuple)):
+            for i in v:
+                yield k, i
+        else:
+            yield k, v
+
+class CanonicalRequest(object):
+    """Signature version 4 canonical request
+
+    Header names are normalized, merged with defaults, sorted and joined, header
+    values trimmed and repeated values comma-joined, and the payload hashed exactly
+    once; all derived values are kept as attributes for reuse when building the
+    string to sign and the Authorization header.
+
+    The canonical string is only materialized on demand.  When `incremental` is set,
+    `hexdigest` feeds each component straight into the hash so the full canonical
+    request is never held in memory -- worthwhile for requests with many headers or
+    long querystrings, slower than hashing the joined string for small requests.
+
+    If an 'x-amz-content-sha256' header is supplied its value, e.g. a precomputed hex
+    digest or UNSIGNED_PAYLOAD, is used as payload hash and the payload isn't read.
+    """
+    def __init__(self, defaults, amzdate, uri, method, qs, headers=None, payload='', incremental=False,
+                 payload_hash=None):
+        """Builds canonical request
+
+        Parameters:
+            defaults: Headers or dict of default headers
+            amzdate:  '%Y%m%dT%H%M%sZ' timestamp, 'x-amz-date' header is omitted if None
+            uri:      HTTP uri, e.g. /foo/bar
+            method:   HTTP method, e.g. 'GET', 'POST', etc
+            qs:       url querystring
+            headers:  optional Headers or dict of additional headers
+            payload:  optional payload -- relevant in 'POST' requests
+            incremental: hash components incrementally
+            payload_hash: payload hash override, e.g. UNSIGNED_PAYLOAD for presigned urls
+        """
+        hdrs = defaults.copy() if isinstance(defaults, Headers) else Headers(defaults)
+        if headers:
+            hdrs.update(headers)
+        if amzdate is not None:
+            hdrs['x-amz-date'] = amzdate
+        pairs = hdrs.canonical()
+
+        self.method         = method
+        self.uri            = uri
+        self.qs             = qs
+        self.headers        = hdrs
+        self.pairs          = pairs
+        self.names          = [k for k, _ in pairs]
+        self.signed_headers = ';'.join(self.names)
+        self.payload_hash   = payload_hash or hdrs.get(CONTENT_SHA256_HEADER) or \
+            ArgumentBuilder.payload_hash(payload)
+        self.incremental    = incremental
+        self.__string       = None
+
+    @property
+    def canonical_headers(self):
+        return ''.join(['%s:%s\n' % pair for pair in self.pairs])
+
+    @property
+    def string(self):
+        if self.__string is None:
+            self.__string = '\n'.join((self.method,
+                                       self.uri,
+                                       self.qs,
+                                       self.canonical_headers,
+                                       self.signed_headers,
+                                       self.payload_hash))
+        return self.__string
+
+    def hexdigest(self):
+        """Hashes canonical request
+
+        Returns hex encoded SHA256 digest bytes
+        """
+        if not self.incremental:
+            return binascii.hexlify(hashlib.sha256(safe_encode(self.string)).digest())
+
+        h = hashlib.sha256()
+        update = h.update
+        for part in (self.method, self.uri, self.qs):
+            update(safe_encode(part))
+            update(b'\n')
+        for pair in self.pairs:
+            update(safe_encode('%s:%s\n' % pair))
+        update(b'\n')
+        update(safe_encode(self.signed_headers))
+        update(b'\n')
+        update(safe_encode(self.payload_hash))
+        return binascii.hexlify(h.digest())
+
+    def __str__(self):
+        return self.string
+
 
 class ArgumentBuilder(object):
     """Constructs requiste arguments for Signature version 4 signing.
 
     ServiceConstants are used in part to build the various arguments.
     """
-    def __init__(self, constants):
+    def __init__(self, constants, incremental=False):
+        """Initializes builder
+
+        Parameters:
+            constants: ServiceConstants
+            incremental: hash canonical requests incrementally, see CanonicalRequest
+        """
         self.constants = constants
+        self.incremental = incremental
+        self.default_headers = Headers(constants.headers)
+        self.double_encode = constants.DOUBLE_ENCODE_PATH
+        self.normalize = constants.NORMALIZE_PATH
 
     @staticmethod
     def payload_hash(payload):
-        """Hashes input string
+        """Hashes payload
         
+        Strings and buffers (bytearray, memoryview, mmap) are hashed in place.  Seekable
+        file-like objects are hashed in fixed-size blocks from their current position, which
+        is restored afterwards so the payload can still be sent.  Iterables of chunks and
+        non-seekable files (pipes, sockets) are consumed, see `util.rewindable`.
+
         Parameter:
-            payload: String to hash
+            payload: String, buffer, file-like object or iterable of chunks to hash
 
         Returns hashed string
         """
-        return hashlib.sha256(payload).hexdigest()
+        if isinstance(payload, six.text_type):
+            payload = payload.encode('utf-8')
+        if isinstance(payload, bytes):
+            return hashlib.sha256(payload).hexdigest()
+
+        h = hashlib.sha256()
+        if hasattr(payload, 'read') and rewindable(payload):
+            pos = payload.tell()
+            for block in iter_blocks(payload):
+                h.update(block)
+            payload.seek(pos)
+        else:
+            for block in iter_blocks(payload):
+                h.update(block)
+        return h.hexdigest()
 
     @staticmethod
     def canonical_query_string(query_args=None):
         """Preprocess query string for signing
         
         foo = CLS.canonical_query_string({'amz-Foo': 'FOO', 'amz-bar': 'BAR'})
-          where foo = 'amz-bar=BAR&amz-Foo=FOO'
+          where foo = 'amz-Foo=FOO&amz-bar=BAR'
+
+        Names and values are RFC 3986 encoded ('%20' for spaces) and pairs sorted by
+        encoded name, then encoded value.  Lists or tuples of values produce repeated
+        parameters; pre-encoded querystrings are decoded and re-encoded.
           
         Parameters:
-            query_args: query parameters dict
+            query_args: query parameters dict, list of (name, value) pairs or querystring
     
         Returns sorted, urlencoded querystring in string format
         """
-        if query_args is None:
+        if not query_args:
             return ''
-        else:
-            items = sorted(query_args.items(), key=lambda i: i[0])
-            return parse.urlencode(items, True)
+        pairs = sorted([(quote(k), quote('' if v is None else v)) for k, v in _query_items(query_args)])
+        return '&'.join(['%s=%s' % pair for pair in pairs])
 
-    def _merge_headers(self, headers):
-        """Merges input headers with default headers 
+    def build(self, amzdate, uri, method, qs, headers=None, payload=''):
+        """Constructs canonical request object
 
         Parameters:
-           headers: dict of (header, value)
+            amzdate: '%Y%m%dT%H%M%sZ' timestamp
+            uri:     decoded HTTP uri, e.g. /foo/bar
+            method:  HTTP method, e.g. 'GET', 'POST', etc
+            qs:      url querystring
+            headers: optional dict of additional headers used for signing
+            payload: optional payload -- relevant in 'POST' requests
 
-        Returns dict of merged headers
+        Returns CanonicalRequest
         """
-        tmp = copy.copy(self.constants.headers)
-        tmp.update(headers)
-        return tmp
-        
+        return CanonicalRequest(self.default_headers, amzdate, self.canonical_uri(uri), method, qs,
+                                headers, payload, self.incremental)
+
+    def canonical_uri(self, uri):
+        """Canonicalizes URI path according to service constants, see `canonical_uri`"""
+        return canonical_uri(uri, self.double_encode, self.normalize)
+
     def signed_headers(self, headers=None):
         """ Returns ; delimited list of all headers comprising signature 
 
@@ -62,10 +316,8 @@ class ArgumentBuilder(object):
 
         Returns sorted list of header names that is merge of input list and 
         default headers"""
-        if not headers:
-            headers = []
-        return ';'.join(sorted([name.lower() for name in 
-                                set(list(self.constants.headers.keys()) + headers)]))
+        hdrs = dict.fromkeys(headers) if headers else None
+        return self.build(None, '', '', '', hdrs).signed_headers
 
     def canonical_headers(self, amzdate, headers=None):
         """Constructs canonical headers
@@ -76,10 +328,7 @@ class ArgumentBuilder(object):
             
         Return sorted list of canonical headers for signing proces
         """
-        amzd = {'x-amz-date': amzdate}
-        hdrs = self._merge_headers(dict(headers, **amzd) if headers else amzd)
-        pairs = sorted([(k.lower(), k) for k in hdrs.keys()])
-        return ''.join('%s:%s\n' % (k, hdrs[raw]) for k, raw in pairs)
+        return self.build(amzdate, '', '', '', headers).canonical_headers
 
     def canonical_request(self, amzdate, uri, method, qs, headers=None, payload=''):
         """Constructs canonical request
@@ -94,13 +343,7 @@ class ArgumentBuilder(object):
             
         Returns canonical request string
         """
-        return '\n'.join(['%s']*6) % \
-            (method, 
-             uri, 
-             qs, 
-             self.canonical_headers(amzdate, headers), 
-             self.signed_headers(list(headers.keys()) if headers else None),
-             ArgumentBuilder.payload_hash(safe_encode(payload)))
+        return self.build(amzdate, uri, method, qs, headers, payload).string
 
     def credential_scope(self, datestamp):
         """Constructs signing credential scope 
@@ -0,0 +1,156 @@
+import hashlib
+
+from .canonical import CONTENT_SHA256_HEADER
+from .util import iter_blocks, safe_encode
+
+#
+# Constants
+#
+STREAMING_PAYLOAD = 'STREAMING-AWS4-HMAC-SHA256-PAYLOAD'
+CHUNK_ALGORITHM   = 'AWS4-HMAC-SHA256-PAYLOAD'
+
+# S3 requires at least 8KB for every chunk but the last
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+EMPTY_HASH = hashlib.sha256(b'').hexdigest()
+
+# len(';chunk-signature=') + signature length + 2 * len('\r\n')
+_FRAME_OVERHEAD = 17 + 64 + 4
+
+
+def _frame_length(size):
+    return len('%x' % size) + _FRAME_OVERHEAD + size
+
+def encoded_length(decoded_length, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Computes 'content-length' of aws-chunked encoded payload
+
+    Parameters:
+        decoded_length: payload length in bytes
+        chunk_size: chunk size in bytes
+
+    Returns encoded length
+    """
+    full, rest = divmod(decoded_length, chunk_size)
+    length = full * _frame_length(chunk_size) + _frame_length(0)
+    if rest:
+        length += _frame_length(rest)
+    return length
+
+def fixed_blocks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Re-blocks payload so every block but the last is exactly `chunk_size` bytes
+
+    Parameters:
+        source: payload accepted by `util.iter_blocks`
+        chunk_size: chunk size in bytes
+
+    Returns generator of blocks
+    """
+    buf = bytearray()
+    for block in iter_blocks(source, chunk_size):
+        if not buf and len(block) == chunk_size:
+            yield block
+            continue
+        buf += block
+        while len(buf) >= chunk_size:
+            yield bytes(buf[:chunk_size])
+            del buf[:chunk_size]
+    if buf:
+        yield bytes(buf)
+
+
+class ChunkSigner(object):
+    """Signs aws-chunked payload chunks
+
+    Each chunk signature is chained from the previous one, starting with the seed
+    request signature.  Chunks must be signed in order, ending with `final`.
+    """
+    def __init__(self, auth, amzdate, datestamp, seed_signature):
+        """Initializes signer
+
+        Parameters:
+            auth: Authorization
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp of seed request
+            datestamp: '%Y%m%d' date of seed request
+            seed_signature: signature of seed request
+        """
+        self.auth      = auth
+        self.datestamp = datestamp
+        self.previous  = seed_signature
+        self.__prefix  = safe_encode('%s\n%s\n%s\n' % (CHUNK_ALGORITHM,
+                                                       amzdate,
+                                                       auth.canonical_builder.credential_scope(datestamp)))
+        self.__suffix  = safe_encode('\n%s\n' % EMPTY_HASH)
+
+    def sign(self, chunk):
+        """Signs chunk
+
+        Parameters:
+            chunk: chunk bytes
+
+        Returns chunk signature
+        """
+        string_to_sign = b''.join((self.__prefix,
+                                   safe_encode(self.previous),
+                                   self.__suffix,
+                                   safe_encode(hashlib.sha256(chunk).hexdigest())))
+        self.previous = self.auth.sign_string_to_sign(self.datestamp, string_to_sign)
+        return self.previous
+
+    def frame(self, chunk):
+        """Signs and encodes chunk
+
+        Parameters:
+            chunk: chunk bytes
+
+        Returns aws-chunked encoded chunk
+        """
+        header = safe_encode('%x;chunk-signature=%s\r\n' % (len(chunk), self.sign(chunk)))
+        return b''.join((header, chunk, b'\r\n'))
+
+    def final(self):
+        """Returns terminating zero-length chunk"""
+        return self.frame(b'')
+
+    def frames(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Signs and encodes payload
+
+        Parameters:
+            source: payload accepted by `util.iter_blocks`
+            chunk_size: chunk size in bytes
+
+        Returns generator of encoded chunks, including the terminating chunk
+        """
+        for block in fixed_blocks(source, chunk_size):
+            yield self.frame(block)
+        yield self.final()
+
+
+def seed(auth, amzdate, datestamp, uri, method, qs, headers, decoded_length, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Signs seed request of aws-chunked upload
+
+    Parameters:
+        auth: Authorization
+        amzdate: '%Y%m%dT%H%M%SZ' timestamp
+        datestamp: '%Y%m%d' date
+        uri: /foo/bar
+        method: HTTP method, e.g. 'PUT'
+        qs: url querystring
+        headers: additional HTTP request headers
+        decoded_length: payload length in bytes
+        chunk_size: chunk size in bytes
+
+    Returns tuple of (request headers, ChunkSigner)
+    """
+    hdrs = dict(headers) if headers else {}
+    hdrs.update({
+        CONTENT_SHA256_HEADER: STREAMING_PAYLOAD,
+        'content-encoding': 'aws-chunked',
+        'content-length': str(encoded_length(decoded_length, chunk_size)),
+        'x-amz-decoded-content-length': str(decoded_length)})
+
+    scope, signed_headers, signature = auth.sign_request(amzdate, datestamp, uri, method, qs, hdrs)
+
+    ret = dict(hdrs, **{'x-amz-date': amzdate, 'Authorization': auth._header(scope, signed_headers, signature)})
+    if auth.creds.token:
+        ret['X-Amz-Security-Token'] = auth.creds.token
+    return ret, ChunkSigner(auth, amzdate, datestamp, signature)
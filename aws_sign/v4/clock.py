@@ -0,0 +1,68 @@
+import time
+
+from email.utils import mktime_tz, parsedate_tz
+
+#
+# Constants
+#
+AMZDATE_FORMAT = '%Y%m%dT%H%M%SZ'
+
+# Minimum change in estimated offset, in seconds, worth correcting.  Skew errors are
+# only returned past several minutes so smaller differences are 'Date' header noise.
+SKEW_THRESHOLD = 60
+
+
+class Clock(object):
+    """Signature Version 4 timestamp source
+
+    Signing timestamps have one second resolution, so the formatted amzdate and
+    datestamp are cached for the current second and only reformatted when it changes.
+
+    `offset` is added to local time; it is estimated from server 'Date' headers with
+    `correct` to compensate for local clock skew.
+
+    Example:
+      clock = Clock()
+      amzdate, datestamp = clock.timestamps()
+
+      # Fixed time for tests
+      clock = Clock(now=lambda: 1451606400)
+    """
+    def __init__(self, now=time.time, offset=0):
+        """Initializes clock
+
+        Parameters:
+            now: callable returning seconds since the epoch
+            offset: seconds added to local time
+        """
+        self.now     = now
+        self.offset  = offset
+        self.__cache = (None, None, None)
+
+    def correct(self, date, threshold=SKEW_THRESHOLD):
+        """Estimates offset from server time
+
+        Parameters:
+            date: server RFC 1123 'Date' header value, e.g. 'Fri, 01 Jan 2016 00:00:00 GMT'
+            threshold: minimum offset change in seconds
+
+        Returns True if offset was adjusted
+        """
+        parsed = parsedate_tz(date) if date else None
+        if parsed is None:
+            return False
+        offset = mktime_tz(parsed) - int(self.now())
+        if abs(offset - self.offset) < threshold:
+            return False
+        self.offset = offset
+        return True
+
+    def timestamps(self):
+        """Returns tuple of ('%Y%m%dT%H%M%SZ' timestamp, '%Y%m%d' date stamp) for current time"""
+        second = int(self.now() + self.offset)
+        cached, amzdate, datestamp = self.__cache
+        if second != cached:
+            amzdate   = time.strftime(AMZDATE_FORMAT, time.gmtime(second))
+            datestamp = amzdate[:8]
+            self.__cache = (second, amzdate, datestamp)
+        return amzdate, datestamp
@@ -0,0 +1,204 @@
+import hashlib
+import hmac
+import itertools
+import multiprocessing
+
+from collections import deque
+
+from .auth import Authorization
+from .clock import Clock
+from .presign import Presigner
+
+#
+# Constants
+#
+DEFAULT_CHUNKSIZE = 1000
+
+# Worker process state, set by pool initializer
+_worker = None
+
+
+class _SigningCredentials(object):
+    """Credentials stand-in carrying no secret key"""
+    def __init__(self, access_key, token):
+        self.access_key = access_key
+        self.secret_key = None
+        self.token      = token
+
+
+class KeyedAuthorization(Authorization):
+    """Authorization signing with a derived signing key instead of a secret key
+
+    The signing key is scoped to a single date, region and service, so handing it to
+    worker processes exposes far less than the raw secret.
+    """
+    def __init__(self, constants, access_key, token, datestamp, key, incremental=False):
+        """Initializes auth
+
+        Parameters:
+           constants: ServiceConstants
+           access_key: AWS access key id
+           token: AWS session token or None
+           datestamp: '%Y%m%d' date the signing key was derived for
+           key: signing key
+           incremental: hash canonical requests without materializing them
+        """
+        super(KeyedAuthorization, self).__init__(constants,
+                                                 _SigningCredentials(access_key, token),
+                                                 incremental=incremental)
+        self.datestamp = datestamp
+        self.__entry = (key, hmac.new(key, digestmod=hashlib.sha256))
+
+    def _signing_entry(self, date_stamp):
+        if date_stamp != self.datestamp:
+            raise ValueError('Signing key is only valid for %s: %s' % (self.datestamp, date_stamp))
+        return self.__entry
+
+
+class _Worker(object):
+    """Per-process signing state
+
+    Batches carry the signing key for their date.  Unless the job has a fixed
+    timestamp, every batch is stamped with the worker's own clock when it's signed, so
+    long-running jobs never sign with stale timestamps.
+    """
+    def __init__(self, constants, access_key, token, offset, incremental):
+        self.constants   = constants
+        self.access_key  = access_key
+        self.token       = token
+        self.incremental = incremental
+        self.clock       = Clock(offset=offset)
+        self.auth        = None
+        self.presigner   = None
+
+    def keyed(self, datestamp, key):
+        """Returns (KeyedAuthorization, Presigner), replaced when the date rolls over"""
+        if self.auth is None or self.auth.datestamp != datestamp:
+            self.auth = KeyedAuthorization(self.constants, self.access_key, self.token, datestamp, key,
+                                           self.incremental)
+            self.presigner = Presigner(self.auth)
+        return self.auth, self.presigner
+
+    def timestamps(self, amzdate, datestamp):
+        """Returns (amzdate, datestamp) for a batch keyed for `datestamp`"""
+        if amzdate is not None:
+            return amzdate, datestamp
+        amzdate, today = self.clock.timestamps()
+        if today != datestamp:
+            # Batch dispatched before midnight; sign at the last second its key is valid
+            amzdate = datestamp + 'T235959Z'
+        return amzdate, datestamp
+
+
+def _init_worker(constants, access_key, token, offset, incremental):
+    global _worker
+    _worker = _Worker(constants, access_key, token, offset, incremental)
+
+def _sign(task):
+    batch, amzdate, datestamp, key = task
+    auth, _ = _worker.keyed(datestamp, key)
+    return auth.sign_batch(batch, *_worker.timestamps(amzdate, datestamp))
+
+def _presign(task):
+    batch, amzdate, datestamp, key = task
+    _, presigner = _worker.keyed(datestamp, key)
+    amzdate, datestamp = _worker.timestamps(amzdate, datestamp)
+    return [presigner.url(amzdate, datestamp, *args) for args in batch]
+
+def _batches(items, size):
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ParallelSigner(object):
+    """Signs large request sets across a pool of worker processes
+
+    Signing keys are derived in the parent and handed to the workers with each batch,
+    so workers never see the secret key; a new key is derived when the date rolls over.
+    Unless a fixed `amzdate` is given, workers stamp every batch with the current time,
+    keeping signatures of long-running jobs within the request time window and
+    presigned urls valid for their full lifetime.  Requests are sent to the pool in
+    batches and results are streamed back in input order; at most `window` batches are
+    in flight so arbitrarily long request iterables run in bounded memory.
+
+    Example:
+      signer = ParallelSigner(Authorization(constants, creds), processes=8)
+      for headers in signer.sign(requests):
+          ...
+    """
+    def __init__(self, auth, processes=None, chunksize=DEFAULT_CHUNKSIZE, window=None, clock=None):
+        """Initializes signer
+
+        Parameters:
+            auth: Authorization
+            processes: number of worker processes, defaults to cpu count
+            chunksize: number of requests per batch
+            window: maximum number of batches in flight, defaults to twice the process count
+            clock: Clock whose offset workers apply to local time
+        """
+        self.auth      = auth
+        self.clock     = clock if clock else Clock()
+        self.processes = processes if processes else multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self.window    = window if window else 2 * self.processes
+
+    def _map(self, func, items, amzdate, datestamp):
+        if amzdate is not None and datestamp is None:
+            datestamp = amzdate[:8]
+
+        creds = self.auth.creds
+        pool = multiprocessing.Pool(self.processes,
+                                    initializer=_init_worker,
+                                    initargs=(self.auth.constants,
+                                              creds.access_key,
+                                              creds.token,
+                                              self.clock.offset,
+                                              self.auth.canonical_builder.incremental))
+        try:
+            pending = deque()
+            for batch in _batches(items, self.chunksize):
+                if amzdate is None:
+                    datestamp = self.clock.timestamps()[1]
+                task = (batch, amzdate, datestamp, self.auth.signature_key(datestamp))
+                pending.append(pool.apply_async(func, (task,)))
+                if len(pending) >= self.window:
+                    for result in pending.popleft().get():
+                        yield result
+            while pending:
+                for result in pending.popleft().get():
+                    yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def sign(self, requests, amzdate=None, datestamp=None):
+        """Creates signing headers for requests
+
+        Parameters:
+            requests: iterable of (method, uri, qs, headers, payload) tuples
+            amzdate: fixed '%Y%m%dT%H%M%SZ' timestamp; by default each batch is
+                     stamped with the current time
+            datestamp: '%Y%m%d' date, derived from amzdate by default
+
+        Returns generator of headers dicts, see `Authorization.sign_batch`
+        """
+        return self._map(_sign, requests, amzdate, datestamp)
+
+    def presign(self, requests, amzdate=None, datestamp=None):
+        """Creates presigned urls
+
+        Parameters:
+            requests: iterable of `Presigner.url` argument tuples following the
+                      timestamps, e.g. (uri, method, query_args, headers, expires)
+            amzdate: fixed '%Y%m%dT%H%M%SZ' timestamp; by default each batch is
+                     stamped with the current time
+            datestamp: '%Y%m%d' date, derived from amzdate by default
+
+        Returns generator of url strings
+        """
+        return self._map(_presign, requests, amzdate, datestamp)
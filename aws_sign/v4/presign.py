@@ -0,0 +1,118 @@
+import hashlib
+
+from .canonical import ArgumentBuilder, CanonicalRequest, encode_path
+
+#
+# Constants
+#
+DEFAULT_EXPIRES = 3600
+
+# Maximum lifetime of a Signature Version 4 presigned url (7 days)
+MAX_EXPIRES = 7 * 24 * 3600
+
+EMPTY_HASH = hashlib.sha256(b'').hexdigest()
+
+
+class Presigner(object):
+    """Signs requests with querystring parameters (presigned urls)
+
+    The signature and its inputs are encoded as 'X-Amz-*' querystring parameters
+    rather than an 'Authorization' header, so urls can be handed to clients without
+    credentials.  Only the 'host' header is signed by default; 'x-amz-date' travels in
+    the querystring.
+
+    Credential scope, credential string and keyed HMAC are reused for every url that
+    shares a datestamp, so presigning many urls costs one canonical request hash and
+    one HMAC each.
+
+    Example:
+      presigner = Presigner(Authorization(constants, creds))
+      url = presigner.url('20160101T000000Z', '20160101', '/bucket/key', expires=300,
+                          payload_hash=UNSIGNED_PAYLOAD)
+    """
+    def __init__(self, auth, expires=DEFAULT_EXPIRES):
+        """Initializes presigner
+
+        Parameters:
+            auth: Authorization
+            expires: default url lifetime in seconds
+        """
+        self.auth     = auth
+        self.expires  = expires
+        self.defaults = auth.canonical_builder.default_headers.copy()
+        self.defaults.pop('x-amz-date', None)
+        self.__scope  = (None, None, None, None, None, None)
+
+    def _scope(self, datestamp):
+        """Returns (credential scope, credential, keyed HMAC) for datestamp
+
+        Recomputed only when the datestamp or credentials change.
+        """
+        creds = self.auth.creds
+        stamp, access, secret, scope, credential, mac = self.__scope
+        if stamp != datestamp or access != creds.access_key or secret != creds.secret_key:
+            access     = creds.access_key
+            secret     = creds.secret_key
+            scope      = self.auth.canonical_builder.credential_scope(datestamp)
+            credential = '%s/%s' % (access, scope)
+            mac        = self.auth.keyed_hmac(datestamp)
+            self.__scope = (datestamp, access, secret, scope, credential, mac)
+        return scope, credential, mac
+
+    def query_string(self, amzdate, datestamp, uri, method='GET', query_args=None, headers=None,
+                     expires=None, payload_hash=EMPTY_HASH):
+        """Creates signed querystring
+
+        Parameters:
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp
+            datestamp: '%Y%m%d' date
+            uri: decoded uri, e.g. /foo/bar
+            method: HTTP method, e.g. 'GET', 'PUT', etc
+            query_args: additional query parameters dict
+            headers: additional HTTP request headers to sign; must be sent with the request
+            expires: url lifetime in seconds, defaults to instance setting
+            payload_hash: payload hash, UNSIGNED_PAYLOAD for S3
+
+        Returns querystring including 'X-Amz-Signature'
+        """
+        expires = self.expires if expires is None else expires
+        if not 0 < expires <= MAX_EXPIRES:
+            raise ValueError('expires must be between 1 and %d seconds: %s' % (MAX_EXPIRES, expires))
+
+        scope, credential, mac = self._scope(datestamp)
+        names = set(self.defaults)
+        if headers:
+            names.update(k.lower() for k in headers)
+
+        params = dict(query_args) if query_args else {}
+        params['X-Amz-Algorithm']     = self.auth.constants.algorithm
+        params['X-Amz-Credential']    = credential
+        params['X-Amz-Date']          = amzdate
+        params['X-Amz-Expires']       = str(expires)
+        params['X-Amz-SignedHeaders'] = ';'.join(sorted(names))
+        if self.auth.creds.token:
+            params['X-Amz-Security-Token'] = self.auth.creds.token
+
+        qs      = ArgumentBuilder.canonical_query_string(params)
+        path    = self.auth.canonical_builder.canonical_uri(uri)
+        request = CanonicalRequest(self.defaults, None, path, method, qs, headers,
+                                   payload_hash=payload_hash)
+
+        mac = mac.copy()
+        mac.update(self.auth._string_to_sign(amzdate, scope, request.hexdigest()))
+        return '%s&X-Amz-Signature=%s' % (qs, mac.hexdigest())
+
+    def url(self, amzdate, datestamp, uri, *args, **kwargs):
+        """Creates presigned url
+
+        Parameters:
+            amzdate: '%Y%m%dT%H%M%SZ' timestamp
+            datestamp: '%Y%m%d' date
+            uri: /foo/bar
+            args: passthru arguments for `query_string`
+            kwargs: passthru keyword arguments for `query_string`
+
+        Returns url string
+        """
+        return '%s%s?%s' % (self.auth.constants.url, encode_path(uri),
+                            self.query_string(amzdate, datestamp, uri, *args, **kwargs))
@@ -1,4 +1,5 @@
 """Utility functions for aws-sign"""
+import six
 
 def safe_encode(s):
     """
@@ -15,3 +16,81 @@ def safe_encode(s):
         return s.encode('utf-8')
     except (AttributeError, UnicodeDecodeError):
         return s
+
+# Block size used when hashing or streaming payloads
+BLOCK_SIZE = 64 * 1024
+
+def iter_blocks(payload, block_size=BLOCK_SIZE):
+    """
+    Iterate over a payload in blocks of at most `block_size` bytes without copying it as a whole.
+
+    Supported payloads are strings, objects supporting the buffer protocol (`bytes`, `bytearray`,
+    `memoryview`, `mmap`), file-like objects with a `read` method and iterables of string chunks.
+    Buffers are sliced through a `memoryview`; file-like objects are read from their current
+    position.  Iterables are yielded chunk by chunk and are consumed in the process.
+
+    :param payload: payload to iterate
+    :param block_size: maximum block size for buffers and file-like objects
+    :return: generator of byte strings or memoryviews
+    """
+    if payload is None:
+        return
+    if isinstance(payload, six.text_type):
+        payload = payload.encode('utf-8')
+    try:
+        view = memoryview(payload)
+    except TypeError:
+        view = None
+
+    if view is not None:
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast('B')
+        for i in six.moves.range(0, len(view), block_size):
+            yield view[i:i + block_size]
+    elif hasattr(payload, 'read'):
+        while True:
+            block = payload.read(block_size)
+            if not block:
+                break
+            yield safe_encode(block)
+    else:
+        for chunk in payload:
+            yield safe_encode(chunk)
+
+def rewindable(payload):
+    """
+    Whether a payload can be read again after hashing it.
+
+    Strings and buffers can always be re-read; file-like objects only if they are seekable.  Iterables
+    and non-seekable files (pipes, sockets, `sys.stdin`) are one-shot: hashing them consumes them.
+
+    :param payload: payload accepted by `iter_blocks`
+    :return: bool
+    """
+    if payload is None or isinstance(payload, (six.binary_type, six.text_type)):
+        return True
+    try:
+        memoryview(payload)
+        return True
+    except TypeError:
+        pass
+    if not hasattr(payload, 'read'):
+        return False
+    seekable = getattr(payload, 'seekable', None)
+    if seekable is not None:
+        return seekable()
+    try:
+        payload.tell()
+        return hasattr(payload, 'seek')
+    except (AttributeError, IOError, OSError):
+        return False
+
+def timestamps(dt):
+    """
+    Format a datetime as Signature Version 4 timestamp and date stamp.
+
+    :param dt: UTC datetime
+    :return: tuple of ('%Y%m%dT%H%M%SZ' timestamp, '%Y%m%d' date stamp)
+    """
+    amzdate = dt.strftime('%Y%m%dT%H%M%SZ')
+    return amzdate, amzdate[:8]
@@ -13,9 +13,13 @@ setup(
         'Intended Audience :: Developers',
         'Topic :: Software Development :: API Tools',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2.6',
+        'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.7',
         ],
+    # `aws_sign.client.aio` requires Python 3.7+
+    python_requires = '>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*',
     test_suite = 'nose.collector',
     packages = [
         'aws_sign',
@@ -28,5 +32,5 @@ setup(
         ],
     install_requires = [
         'six >= 1.7.0',
-        'tornado >= 4.0'
+        'tornado >= 5.0'
         ])